@@ -0,0 +1,211 @@
+"""
+Server-side price alerts evaluated on every quote refresh
+
+Active alerts are indexed per symbol in two sorted arrays: "above" alerts fire
+once the price reaches their threshold, "below" alerts once it falls to
+theirs. Alerts already satisfied by the last known price fire as soon as they
+are added, so every remaining "above" threshold is over the last price and
+every "below" threshold under it. "below" is kept in ascending and "above" in
+descending threshold order (stored negated, so both bisect the same way), which
+puts the alerts a move can fire at the tail of either array. A quote update
+therefore only has to bisect and cut a suffix: the cost is O(log n) plus the
+alerts that actually fired, however many alerts exist.
+
+Alerts live in the SQLite ``price_alerts`` table. Each worker keeps its own
+index and picks up alerts added by other workers every ``sync_interval``
+seconds; triggering goes through the table, so an alert is delivered once even
+when several workers see the crossing.
+"""
+
+import bisect
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ABOVE = "above"
+BELOW = "below"
+DIRECTIONS = (ABOVE, BELOW)
+
+
+class SymbolAlerts:
+    """Untriggered alerts for one symbol, kept as parallel sort key/id arrays.
+
+    The "above" keys are negated thresholds, so thresholds come off its tail.
+    """
+
+    __slots__ = ("above", "above_ids", "below", "below_ids", "last_price")
+
+    def __init__(self):
+        self.above = array("d")
+        self.above_ids = array("q")
+        self.below = array("d")
+        self.below_ids = array("q")
+        self.last_price = None
+
+    def __len__(self):
+        return len(self.above) + len(self.below)
+
+    def _arrays(self, direction, threshold):
+        if direction == ABOVE:
+            return self.above, self.above_ids, -threshold
+        return self.below, self.below_ids, threshold
+
+    def satisfied(self, direction, threshold):
+        if self.last_price is None:
+            return False
+        return self.last_price >= threshold if direction == ABOVE else self.last_price <= threshold
+
+    def add(self, alert_id, direction, threshold):
+        keys, ids, key = self._arrays(direction, threshold)
+        i = bisect.bisect_right(keys, key)
+        keys.insert(i, key)
+        ids.insert(i, alert_id)
+
+    def append_sorted(self, alert_id, direction, threshold):
+        """Add an alert known to sort after every alert already indexed in its direction (bulk load)."""
+        keys, ids, key = self._arrays(direction, threshold)
+        keys.append(key)
+        ids.append(alert_id)
+
+    def remove(self, alert_id, direction, threshold):
+        keys, ids, key = self._arrays(direction, threshold)
+        for i in range(bisect.bisect_left(keys, key), bisect.bisect_right(keys, key)):
+            if ids[i] == alert_id:
+                del keys[i]
+                del ids[i]
+                return True
+        return False
+
+    def update(self, price):
+        """Record a new price and return the ids of alerts it fires."""
+        fired = []
+        i = bisect.bisect_left(self.above, -price)
+        if i < len(self.above):
+            fired.extend(reversed(self.above_ids[i:]))
+            del self.above[i:]
+            del self.above_ids[i:]
+        j = bisect.bisect_left(self.below, price)
+        if j < len(self.below):
+            fired.extend(self.below_ids[j:])
+            del self.below[j:]
+            del self.below_ids[j:]
+        self.last_price = price
+        return fired
+
+
+class LogSink:
+    """Default sink: write triggered alerts to the application log."""
+
+    def __call__(self, events):
+        for event in events:
+            print(f"[DEBUG] Alert {event['id']} triggered: {event['symbol']} {event['direction']} "
+                  f"{event['threshold']} at {event['triggered_price']}")
+
+
+class WebhookSink:
+    """POST triggered alerts as JSON to ``url`` from a background thread."""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-webhook")
+
+    def __call__(self, events):
+        self._executor.submit(self._post, events)
+
+    def _post(self, events):
+        try:
+            self._session.post(self.url, json={"alerts": events}, timeout=self.timeout).raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"[ERROR] Alert webhook delivery failed for {len(events)} alerts: {e}")
+
+
+class AlertEngine:
+    """In-memory alert index over an AlertStore, delivering triggers to ``sink``."""
+
+    def __init__(self, store, sink=None, sync_interval=5):
+        self.store = store
+        self.sink = sink or LogSink()
+        self.sync_interval = sync_interval
+        self._symbols = {}
+        self._lock = threading.Lock()
+        self._max_id = 0
+        self._synced_at = 0.0
+
+    def __len__(self):
+        return sum(len(alerts) for alerts in self._symbols.values())
+
+    def _alerts(self, symbol):
+        alerts = self._symbols.get(symbol)
+        if alerts is None:
+            alerts = self._symbols[symbol] = SymbolAlerts()
+        return alerts
+
+    def load(self):
+        """Index every active alert in the store; returns how many were loaded."""
+        loaded = 0
+        with self._lock:
+            self._symbols = {}
+            # Rows arrive in index order, so they can be appended without shifting
+            for alert_id, symbol, direction, threshold in self.store.iter_active():
+                self._alerts(symbol).append_sorted(alert_id, direction, threshold)
+                self._max_id = max(self._max_id, alert_id)
+                loaded += 1
+            self._synced_at = time.monotonic()
+        return loaded
+
+    def sync(self):
+        """Index alerts added to the store since the last load or sync (e.g. by other workers)."""
+        with self._lock:
+            self._synced_at = time.monotonic()
+            rows = list(self.store.iter_active(after_id=self._max_id))
+            for alert_id, symbol, direction, threshold in rows:
+                self._alerts(symbol).add(alert_id, direction, threshold)
+                self._max_id = max(self._max_id, alert_id)
+        return len(rows)
+
+    def add(self, symbol, direction, threshold):
+        """Persist and index an alert; one already satisfied by the last price fires immediately."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}")
+        threshold = float(threshold)
+        alert_id = self.store.add(symbol, direction, threshold)
+        # Syncing (rather than indexing just this id) keeps ids below it from other workers
+        self.sync()
+        with self._lock:
+            alerts = self._alerts(symbol)
+            if not alerts.satisfied(direction, threshold):
+                return self.store.get(alert_id)
+            alerts.remove(alert_id, direction, threshold)
+            price = alerts.last_price
+        self._trigger([alert_id], price)
+        return self.store.get(alert_id)
+
+    def remove(self, alert_id):
+        """Delete an alert; returns it, or None if it did not exist."""
+        alert = self.store.delete(alert_id)
+        if alert and alert["triggered_at"] is None:
+            with self._lock:
+                self._alerts(alert["symbol"]).remove(alert_id, alert["direction"], alert["threshold"])
+        return alert
+
+    def on_quote(self, symbol, price):
+        """Evaluate a refreshed quote; returns the alerts it triggered."""
+        if time.monotonic() - self._synced_at >= self.sync_interval:
+            self.sync()
+        with self._lock:
+            fired = self._alerts(symbol).update(price)
+        return self._trigger(fired, price) if fired else []
+
+    def _trigger(self, alert_ids, price):
+        events = self.store.mark_triggered(alert_ids, price)
+        if events:
+            try:
+                self.sink(events)
+            except Exception as e:
+                print(f"[ERROR] Alert sink failed for {len(events)} alerts: {e}")
+        return events
@@ -1,159 +1,952 @@
 import os
+import hashlib
+import json
+import sqlite3
+import threading
 import requests
-from flask import Flask, render_template, request, jsonify
+from flask import Blueprint, Flask, render_template, request, jsonify, g, current_app
 from flask_cors import CORS
 from flask_caching import Cache
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor
 import time
+from urllib.parse import urlencode
+from symbols import SymbolIndex, SYMBOL_PATTERN
+from news import symbol_terms, build_news_query, merge_symbol_news, NewsIngestor
+from database import (NewsArticleStore, StockDataCache, AlertStore, KeyUsageStore, QuoteHistoryStore,
+                      MaintenanceStore)
+from maintenance import DAY, MaintenanceJob, RetentionPolicy
+from export import DATASETS, FORMATS, ExportError, dataset_rows, encode, parse_time
+from cache_snapshot import CacheSnapshot
+from assets import StaticAssets
+from health import InFlightGauge, CircuitBreaker, CircuitOpenError, AdmissionController, OverloadedError
+from cluster import Cluster, FORWARDED_HEADER
+from upstream import ResponseTooLarge, SelectiveDecoder, limit_body
+from key_pool import KeyPool, KeyThrottled, parse_keys, parse_quota
+from market_calendar import cache_ttl, calendar_for
+from watchlist import TokenBucket, RefreshQueue
+from alerts import AlertEngine, LogSink, WebhookSink, DIRECTIONS
+from providers import AlphaVantageProvider, FinnhubProvider, HedgedQuoteFetcher, QuoteUnavailable
 
-print("[DEBUG] Loading environment variables...")
 load_dotenv()
 
-app = Flask(__name__, static_folder='static', template_folder='templates')
-CORS(app)
+ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+NEWS_API_KEY = os.getenv("NEWS_API_KEY")
+
+# Each *_API_KEY may list several comma-separated keys. Calls rotate across them
+# within a per-key quota of "<calls>/<window>", e.g. "25/day" or "5/60" (empty:
+# only keys the provider reports as throttled are skipped); see key_pool.py
+ALPHA_VANTAGE_KEY_QUOTA = os.getenv("ALPHA_VANTAGE_KEY_QUOTA", "")
+NEWS_API_KEY_QUOTA = os.getenv("NEWS_API_KEY_QUOTA", "")
+FINNHUB_KEY_QUOTA = os.getenv("FINNHUB_KEY_QUOTA", "")
+
+# Upstream endpoints can be pointed at a mock server for benchmarks
+ALPHA_VANTAGE_BASE_URL = os.getenv("ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co").rstrip('/')
+NEWS_API_BASE_URL = os.getenv("NEWS_API_BASE_URL", "https://newsapi.org").rstrip('/')
+
+# Optional record/replay of upstream traffic for offline performance runs
+UPSTREAM_MODE = os.getenv("UPSTREAM_MODE", "").lower()
+UPSTREAM_CASSETTE = os.getenv("UPSTREAM_CASSETTE", "upstream_cassette.jsonl")
+
+# "strict" also requires symbols to be in the listing. The bundled data/symbols.csv
+# is only a sample of it, so strict is the default only with SYMBOL_LISTING_PATH set
+SYMBOL_VALIDATION = os.getenv("SYMBOL_VALIDATION",
+                              "strict" if os.getenv("SYMBOL_LISTING_PATH") else "syntax").lower()
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "stock_cache.db")
+
+# The index page inlines whatever is cached for these symbols and the general
+# news feed, so first paint needs no API round-trip
+INDEX_SNAPSHOT = os.getenv("INDEX_SNAPSHOT", "true").lower() != "false"
+DEFAULT_WATCHLIST = os.getenv("DEFAULT_WATCHLIST", "AAPL,MSFT,GOOGL,AMZN,NVDA")
+INDEX_RENDER_TIMEOUT = 60
+
+# Quotes are cached for CACHE_DEFAULT_TIMEOUT while their exchange trades and until
+# its next open otherwise; news keeps flowing off-hours, so it is held at most
+# NEWS_CLOSED_TTL seconds then (see market_calendar.py)
+MARKET_HOURS_TTL = os.getenv("MARKET_HOURS_TTL", "true").lower() != "false"
+NEWS_CLOSED_TTL = int(os.getenv("NEWS_CLOSED_TTL", 3600))
+
+# How long browsers may reuse a /get_stock_data result per symbol (0 disables)
+CLIENT_CACHE_MAX_AGE = int(os.getenv("CLIENT_CACHE_MAX_AGE", 60))
+
+# Serve CSS/JS minified under content-hashed, immutable URLs (see assets.py)
+STATIC_FINGERPRINT = os.getenv("STATIC_FINGERPRINT", "true").lower() != "false"
+
+# Hot quotes and news feeds are snapshotted to SQLite so restarted workers boot warm (0 disables)
+CACHE_SNAPSHOT_INTERVAL = int(os.getenv("CACHE_SNAPSHOT_INTERVAL", 0))
+CACHE_SNAPSHOT_MAX_ENTRIES = int(os.getenv("CACHE_SNAPSHOT_MAX_ENTRIES", 500))
+
+# Every fetched quote is recorded; points older than QUOTE_POINT_RETENTION_DAYS
+# are folded into daily OHLCV bars (see maintenance.py; 0 keeps them as is)
+QUOTE_HISTORY = os.getenv("QUOTE_HISTORY", "true").lower() != "false"
+QUOTE_POINT_RETENTION_DAYS = float(os.getenv("QUOTE_POINT_RETENTION_DAYS", 7))
+QUOTE_BAR_RETENTION_DAYS = float(os.getenv("QUOTE_BAR_RETENTION_DAYS", 0))
+NEWS_RETENTION_DAYS = float(os.getenv("NEWS_RETENTION_DAYS", 180))
+# Seconds between retention/compaction runs, taken by one worker at a time (0 disables)
+STORE_MAINTENANCE_INTERVAL = int(os.getenv("STORE_MAINTENANCE_INTERVAL", 3600))
+
+# Bulk exports stream this many rows per chunk (see export.py); a worker serves
+# only a few at once so long downloads never take all of its threads
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", 2))
+export_slots = threading.BoundedSemaphore(EXPORT_MAX_CONCURRENT)
+
+# Large watchlists: cache misses are refreshed in the background, in chunks,
+# within this share of the Alpha Vantage budget (per worker)
+WATCHLIST_MAX_SYMBOLS = int(os.getenv("WATCHLIST_MAX_SYMBOLS", 500))
+WATCHLIST_RATE_PER_MINUTE = float(os.getenv("WATCHLIST_RATE_PER_MINUTE", 30))
+WATCHLIST_CHUNK_SIZE = int(os.getenv("WATCHLIST_CHUNK_SIZE", 5))
+
+# Price alerts are evaluated on every quote refresh; triggers go to the log,
+# or are POSTed as JSON to ALERT_WEBHOOK_URL when set
+ALERT_WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL")
+ALERT_SYNC_INTERVAL = float(os.getenv("ALERT_SYNC_INTERVAL", 5))
+
+# Readiness reports a node as saturated once this many upstream calls are in flight
+UPSTREAM_MAX_IN_FLIGHT = int(os.getenv("UPSTREAM_MAX_IN_FLIGHT", 64))
+upstream_in_flight = InFlightGauge(UPSTREAM_MAX_IN_FLIGHT)
+
+# Upstream bodies larger than this are abandoned while reading (see upstream.py)
+UPSTREAM_MAX_BODY_BYTES = int(os.getenv("UPSTREAM_MAX_BODY_BYTES", 1024 * 1024))
+
+# Stop calling an upstream after repeated connection failures/timeouts
+alpha_vantage_breaker = CircuitBreaker("alpha_vantage", int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5)),
+                                       int(os.getenv("CIRCUIT_RESET_TIMEOUT", 30)))
+news_api_breaker = CircuitBreaker("news_api", alpha_vantage_breaker.failure_threshold,
+                                  alpha_vantage_breaker.reset_timeout)
+
+# Requests that need upstream work are admitted up to this many per worker and
+# shed with 503 + Retry-After once they would queue past the budget; requests
+# answerable from cache skip admission
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", 16))
+ADMISSION_QUEUE_BUDGET_MS = int(os.getenv("ADMISSION_QUEUE_BUDGET_MS", 1000))
+admission = AdmissionController(ADMISSION_MAX_IN_FLIGHT, ADMISSION_QUEUE_BUDGET_MS / 1000)
+# Longer X-Request-Start queue times are clock skew or a client-set header, not queueing
+ADMISSION_MAX_QUEUED_SECONDS = 60
+
+# Optional secondary quote source, hedged when Alpha Vantage is slower than its p95
+SECONDARY_QUOTE_PROVIDER = os.getenv("SECONDARY_QUOTE_PROVIDER", "").lower()
+FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
+FINNHUB_BASE_URL = os.getenv("FINNHUB_BASE_URL", "https://finnhub.io").rstrip('/')
+QUOTE_HEDGE_RATIO = float(os.getenv("QUOTE_HEDGE_RATIO", 0.05))
+finnhub_breaker = CircuitBreaker("finnhub", alpha_vantage_breaker.failure_threshold,
+                                 alpha_vantage_breaker.reset_timeout)
+
+def reset_circuits():
+    alpha_vantage_breaker.reset()
+    news_api_breaker.reset()
+    finnhub_breaker.reset()
 
-# Configure caching (5 minute timeout)
-cache = Cache(app, config={
+# Symbols are owned by one node each so their cache entries are not duplicated (None: single node)
+cluster = Cluster.from_env()
+CLUSTER_FORWARD_TIMEOUT = float(os.getenv("CLUSTER_FORWARD_TIMEOUT", 5))
+
+# Configure caching (5 minute timeout); bound to each app in create_app()
+cache = Cache(config={
     'CACHE_TYPE': 'SimpleCache',
-    'CACHE_DEFAULT_TIMEOUT': 300
+    'CACHE_DEFAULT_TIMEOUT': 300,
+    'CACHE_THRESHOLD': 500
 })
 
-print("[DEBUG] Flask app initialized.")
+bp = Blueprint('stock', __name__)
 
-ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
-NEWS_API_KEY = os.getenv("NEWS_API_KEY")
+# Shared resources are built on first use rather than at import, so importing
+# the module, forking gunicorn workers and building test apps stay cheap.
+# Each one lives in a module global of the same name so it can be replaced.
+_init_lock = threading.RLock()
+
+def _lazy(name, factory):
+    value = globals().get(name)
+    if value is None:
+        with _init_lock:
+            value = globals().get(name)
+            if value is None:
+                value = globals()[name] = factory()
+    return value
+
+def _create_session():
+    # Shared HTTP session for connection pooling
+    http = requests.Session()
+    if UPSTREAM_MODE:
+        import cassette
+        cassette.install(http, UPSTREAM_MODE, UPSTREAM_CASSETTE, float(os.getenv("UPSTREAM_LATENCY_SCALE", 1.0)))
+        print(f"[DEBUG] Upstream {UPSTREAM_MODE} mode using {UPSTREAM_CASSETTE}")
+    return http
+
+def _create_cluster_executor():
+    # Sized for one in-flight forward per peer per request thread
+    return ThreadPoolExecutor(max_workers=4 * len(cluster.ring.nodes), thread_name_prefix="cluster")
+
+def upstream_get(breaker, url, timeout=3, max_bytes=None):
+    """GET an upstream URL through its circuit breaker, counted in the in-flight gauge.
+
+    The body is read up front and capped at ``max_bytes`` (UPSTREAM_MAX_BODY_BYTES
+    by default); decode it with ``response.json(cls=SelectiveDecoder, ...)``.
+    """
+    if not breaker.allow():
+        raise CircuitOpenError(f"{breaker.name} temporarily unavailable")
+    try:
+        with upstream_in_flight:
+            response = get_session().get(url, timeout=timeout,
+                                         hooks={"response": limit_body(max_bytes or UPSTREAM_MAX_BODY_BYTES)})
+    except ResponseTooLarge:
+        # The upstream answered; an oversized body is not an outage
+        breaker.record_success()
+        raise
+    except requests.exceptions.RequestException:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return response
+
+def _load_symbol_index():
+    # Local symbol universe used to validate input before spending upstream calls
+    index = SymbolIndex.load_default()
+    print(f"[DEBUG] Loaded {len(index)} symbols (validation: {SYMBOL_VALIDATION})")
+    return index
+
+def get_session():
+    return _lazy("session", _create_session)
+
+def get_symbol_index():
+    return _lazy("symbol_index", _load_symbol_index)
+
+def _create_alert_engine():
+    sink = WebhookSink(ALERT_WEBHOOK_URL) if ALERT_WEBHOOK_URL else LogSink()
+    engine = AlertEngine(AlertStore(DATABASE_PATH), sink, ALERT_SYNC_INTERVAL)
+    print(f"[DEBUG] Loaded {engine.load()} active price alerts")
+    return engine
+
+def _create_key_pools():
+    # Usage is counted in the shared database so every worker draws on the same quotas
+    store = KeyUsageStore(DATABASE_PATH)
+    pools = {}
+    for provider, keys, quota in (("alpha_vantage", ALPHA_VANTAGE_API_KEY, ALPHA_VANTAGE_KEY_QUOTA),
+                                  ("news_api", NEWS_API_KEY, NEWS_API_KEY_QUOTA),
+                                  ("finnhub", FINNHUB_API_KEY, FINNHUB_KEY_QUOTA)):
+        keys = parse_keys(keys)
+        if keys:
+            limit, window = parse_quota(quota)
+            pools[provider] = KeyPool(provider, keys, store, limit, window)
+            print(f"[DEBUG] {provider}: {len(keys)} API keys, quota {quota or 'unlimited'}")
+    return pools
+
+def get_key_pool(provider):
+    return _lazy("key_pools", _create_key_pools)[provider]
+
+def _create_quote_fetcher():
+    # Breakers are looked up per call so tests can swap them
+    primary = AlphaVantageProvider(lambda url: upstream_get(alpha_vantage_breaker, url),
+                                   ALPHA_VANTAGE_BASE_URL, get_key_pool("alpha_vantage"))
+    if SECONDARY_QUOTE_PROVIDER != "finnhub":
+        return HedgedQuoteFetcher(primary)
+    if not FINNHUB_API_KEY:
+        raise ValueError("SECONDARY_QUOTE_PROVIDER=finnhub needs FINNHUB_API_KEY")
+    secondary = FinnhubProvider(lambda url: upstream_get(finnhub_breaker, url), FINNHUB_BASE_URL,
+                                get_key_pool("finnhub"))
+    executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="quote")
+    print(f"[DEBUG] Hedging quotes to {secondary.name} (ratio {QUOTE_HEDGE_RATIO})")
+    return HedgedQuoteFetcher(primary, secondary, executor, QUOTE_HEDGE_RATIO)
+
+def get_quote_fetcher():
+    return _lazy("quote_fetcher", _create_quote_fetcher)
+
+def get_alert_engine():
+    return _lazy("alert_engine", _create_alert_engine)
+
+def get_cluster_session():
+    # Separate from the upstream session so cassette replay never intercepts node-to-node calls
+    return _lazy("cluster_session", requests.Session)
+
+def get_cluster_executor():
+    return _lazy("cluster_executor", _create_cluster_executor)
+
+def get_article_store():
+    # Feeds are served from the local store, which the ingestor tops up with only newer articles
+    return _lazy("article_store", lambda: NewsArticleStore(DATABASE_PATH))
+
+def get_news_ingestor():
+    return _lazy("news_ingestor", lambda: NewsIngestor(get_article_store(), fetch_news_articles))
+
+def get_quote_history():
+    return _lazy("quote_history", lambda: QuoteHistoryStore(DATABASE_PATH))
+
+def create_maintenance_job():
+    def days(value):
+        return value * DAY if value > 0 else None
+
+    policy = RetentionPolicy(quote_points=days(QUOTE_POINT_RETENTION_DAYS),
+                             quote_bars=days(QUOTE_BAR_RETENTION_DAYS),
+                             articles=days(NEWS_RETENTION_DAYS))
+    # Created before the other stores so a new database starts with incremental vacuum
+    store = MaintenanceStore(DATABASE_PATH)
+    return MaintenanceJob(store, get_quote_history(), policy, STORE_MAINTENANCE_INTERVAL)
+
+def create_app(config=None):
+    """Build a Flask app serving the stock and news routes.
+
+    Every app gets its own cache, so tests can create isolated instances. The
+    first app created also serves cache calls made outside a request.
+    """
+    if not ALPHA_VANTAGE_API_KEY or not NEWS_API_KEY:
+        raise ValueError("Missing required API keys. Please check your .env file.")
+
+    flask_app = Flask(__name__, static_folder='static', template_folder='templates')
+    flask_app.config.update(config or {})
+    CORS(flask_app)
+    first_app = getattr(cache, "app", None)
+    cache.init_app(flask_app)
+    if first_app is not None:
+        # init_app rebinds the fallback to the newest app; keep the first one
+        cache.app = first_app
+    flask_app.register_blueprint(bp)
+    if STATIC_FINGERPRINT:
+        StaticAssets(flask_app)
+
+    if STORE_MAINTENANCE_INTERVAL > 0:
+        # Started with the first request, like the snapshot writer
+        flask_app.extensions['maintenance'] = create_maintenance_job()
+
+    if CACHE_SNAPSHOT_INTERVAL > 0:
+        # Loading more entries than the cache holds would only churn its pruning
+        max_entries = min(CACHE_SNAPSHOT_MAX_ENTRIES, cache.config['CACHE_THRESHOLD'])
+        snapshot = CacheSnapshot(flask_app, cache, StockDataCache(DATABASE_PATH), CACHE_SNAPSHOT_INTERVAL,
+                                 max_entries, cache.config['CACHE_DEFAULT_TIMEOUT'])
+        flask_app.extensions['cache_snapshot'] = snapshot
+        # The writer thread starts with the first request, so a preloading master never runs it
+        print(f"[DEBUG] Warmed cache with {snapshot.load()} snapshot entries")
+
+    flask_app.extensions['watchlist'] = RefreshQueue(
+        lambda symbols: refresh_quotes(flask_app, symbols),
+        TokenBucket(WATCHLIST_RATE_PER_MINUTE / 60, WATCHLIST_CHUNK_SIZE),
+        WATCHLIST_CHUNK_SIZE
+    )
+
+    print("[DEBUG] Flask app initialized.")
+    return flask_app
+
+def quote_ttl(symbol):
+    """Cache timeout for a quote (None: the cache default)."""
+    if not MARKET_HOURS_TTL:
+        return None
+    return cache_ttl(calendar_for(symbol), cache.config['CACHE_DEFAULT_TIMEOUT'])
+
+def news_ttl(symbol=""):
+    """Cache timeout for a symbol's (or the general) news feed."""
+    if not MARKET_HOURS_TTL:
+        return None
+    return cache_ttl(calendar_for(symbol), cache.config['CACHE_DEFAULT_TIMEOUT'], NEWS_CLOSED_TTL)
+
+def cache_put(key, value, timeout=None):
+    """cache.set for entries worth keeping across restarts (quotes and news feeds)."""
+    cache.set(key, value, timeout=timeout)
+    snapshot = current_app.extensions.get('cache_snapshot')
+    if snapshot:
+        snapshot.track(key, timeout)
+
+# Set once a worker has built its shared resources (see gunicorn.conf.py)
+worker_ready = threading.Event()
+
+def warm_up():
+    """Build the lazily created resources ahead of the first request."""
+    get_session()
+    get_symbol_index()
+    get_news_ingestor()
+    worker_ready.set()
+
+def reinit_after_fork():
+    """Drop state inherited from a preloading master so each worker owns its own."""
+    global _init_lock
+    _init_lock = threading.RLock()
+    worker_ready.clear()
+    # Pooled upstream connections must not be shared between processes
+    for name in ("session", "cluster_session"):
+        inherited = globals().pop(name, None)
+        if inherited is not None:
+            inherited.close()
+    # Executor threads do not survive the fork
+    globals().pop("cluster_executor", None)
+    globals().pop("alert_engine", None)
+    globals().pop("quote_fetcher", None)
+    default_app = globals().get("app")
+    for name in ('cache_snapshot', 'watchlist', 'maintenance'):
+        extension = default_app.extensions.get(name) if default_app else None
+        if extension:
+            extension.after_fork()
+
+_LAZY_ATTRIBUTES = {
+    "app": lambda: _lazy("app", create_app),
+    "session": get_session,
+    "symbol_index": get_symbol_index,
+    "article_store": get_article_store,
+    "news_ingestor": get_news_ingestor,
+    "alert_engine": get_alert_engine,
+    "key_pools": lambda: _lazy("key_pools", _create_key_pools),
+    "quote_history": get_quote_history,
+}
+
+def __getattr__(name):
+    # `from app import app` and `gunicorn app:app` build the default app on first access
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def is_valid_symbol(symbol):
+    if not SYMBOL_PATTERN.match(symbol):
+        return False
+    if SYMBOL_VALIDATION == "strict":
+        return symbol in get_symbol_index()
+    return True
+
+def parse_symbols(symbols_str):
+    """Split comma-separated input into unique upper-cased symbols, keeping input order."""
+    return list(dict.fromkeys(s.strip().upper() for s in symbols_str.split(',') if s.strip()))
+
+def forward_to_owner(symbol):
+    """Proxy a single-symbol request to the node owning ``symbol``.
+
+    Returns None when this node should answer itself: no cluster, already
+    forwarded, owned here, or the owner could not be reached.
+    """
+    if cluster is None or request.headers.get(FORWARDED_HEADER) or cluster.is_local(symbol):
+        return None
+    node = cluster.owner(symbol)
+    try:
+        response = get_cluster_session().get(cluster.url(node, request.full_path.rstrip('?')),
+                                             headers={FORWARDED_HEADER: cluster.node_id},
+                                             timeout=CLUSTER_FORWARD_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        print(f"[ERROR] Forwarding {symbol} to {node} failed, serving locally: {e}")
+        return None
+    forwarded = current_app.response_class(response.content, response.status_code,
+                                           content_type=response.headers.get("Content-Type"))
+    forwarded.headers["X-Cluster-Node"] = node
+    if "X-Cache" in response.headers:
+        forwarded.headers["X-Cache"] = response.headers["X-Cache"]
+    return forwarded
+
+def forward_stock_data(node, symbols):
+    """POST a symbol group to its owner; returns its quotes and per-symbol news."""
+    response = get_cluster_session().post(cluster.url(node, "/get_stock_data"),
+                                          json={"symbols": ",".join(symbols)},
+                                          headers={FORWARDED_HEADER: cluster.node_id},
+                                          timeout=CLUSTER_FORWARD_TIMEOUT)
+    response.raise_for_status()
+    return response.json()["cluster"]
+
+def store_quote(symbol, quote):
+    """Cache a fresh quote and evaluate price alerts against it."""
+    cache_put(f"stock_{symbol}", quote, timeout=quote_ttl(symbol))
+    try:
+        price = float(quote.get("price"))
+    except (TypeError, ValueError):
+        return
+    if QUOTE_HISTORY:
+        try:
+            volume = quote.get("volume")
+            get_quote_history().record(symbol, price, int(volume) if str(volume or "").isdigit() else None)
+        except sqlite3.Error as e:
+            print(f"[ERROR] Recording quote history for {symbol} failed: {e}")
+    try:
+        get_alert_engine().on_quote(symbol, price)
+    except Exception as e:
+        # Alerts must never fail the quote request
+        print(f"[ERROR] Alert evaluation failed for {symbol}: {e}")
+
+def fetch_quote(symbol):
+    """Fetch and cache one quote; raises QuoteUnavailable when no provider has one."""
+    quote, provider = get_quote_fetcher().fetch(symbol)
+    print(f"[DEBUG] Quote for {symbol} from {provider}: {quote}")
+    store_quote(symbol, quote)
+    return quote
+
+def refresh_quotes(flask_app, symbols):
+    """Fetch one watchlist chunk in parallel, outside any request."""
+    def refresh(symbol):
+        with flask_app.app_context():
+            try:
+                fetch_quote(symbol)
+            except (requests.exceptions.RequestException, CircuitOpenError, QuoteUnavailable, ValueError) as e:
+                # Left uncached; the next poll of the watchlist queues it again
+                print(f"[ERROR] Watchlist refresh failed for {symbol}: {e}")
+
+    with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+        list(executor.map(refresh, symbols))
+    print(f"[DEBUG] Watchlist refreshed {symbols}")
+
+def note_cache(hit):
+    """Record a cache lookup outcome for the X-Cache response header."""
+    g.setdefault("cache_results", []).append(bool(hit))
+
+@bp.before_app_request
+def start_background_jobs():
+    # Workers forked from a preloaded master need their own snapshot and maintenance threads
+    for name in ('cache_snapshot', 'maintenance'):
+        extension = current_app.extensions.get(name)
+        if extension:
+            extension.start()
+
+def queued_seconds():
+    """Time spent queued before this worker, from the balancer's X-Request-Start header.
+
+    Accepts ``t=<seconds>.<ms>`` (nginx ``$msec``) or ``t=<milliseconds>``
+    (HAProxy ``%Ts%ms``); missing, malformed or implausibly old headers
+    count as zero.
+    """
+    header = request.headers.get("X-Request-Start", "")
+    try:
+        started = float(header.removeprefix("t="))
+    except ValueError:
+        return 0.0
+    if started > 1e11:
+        started /= 1000
+    queued = time.time() - started
+    if queued > ADMISSION_MAX_QUEUED_SECONDS:
+        return 0.0
+    return max(0.0, queued)
+
+def served_from_cache():
+    """Whether the request can be answered without any upstream call."""
+    args = request.view_args or {}
+    if request.endpoint == 'stock.get_single_stock':
+        return cache.has(f"stock_{args['symbol'].upper().strip()}")
+    if request.endpoint == 'stock.get_symbol_news':
+        return cache.has(f"news_{args['symbol'].upper().strip()}")
+    if request.endpoint == 'stock.get_general_news':
+        return cache.has("general_news")
+    if request.endpoint == 'stock.get_stock_data':
+        body = request.get_json(silent=True) or {}
+        symbols = parse_symbols(str(body.get('symbols', '')))
+        return bool(symbols) and all(cache.has(f"stock_{s}") and cache.has(f"news_{s}") for s in symbols)
+    return False
+
+ADMITTED_ENDPOINTS = {'stock.get_single_stock', 'stock.get_symbol_news', 'stock.get_general_news',
+                      'stock.search_news', 'stock.get_stock_data'}
+
+@bp.before_app_request
+def admit_request():
+    if request.endpoint not in ADMITTED_ENDPOINTS or served_from_cache():
+        return None
+    try:
+        admission.acquire(queued_seconds())
+    except OverloadedError as e:
+        print(f"[ERROR] Shedding {request.path}: {e}")
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 503
+    g.admitted = True
+    return None
+
+@bp.teardown_app_request
+def release_admission(exc):
+    if g.pop("admitted", False):
+        admission.release()
 
-print(f"[DEBUG] ALPHA_VANTAGE_API_KEY: {bool(ALPHA_VANTAGE_API_KEY)}")
-print(f"[DEBUG] NEWS_API_KEY: {bool(NEWS_API_KEY)}")
+@bp.after_app_request
+def add_cache_header(response):
+    # Lets access logs (HAProxy captures X-Cache) and replay runs measure hit ratios
+    results = g.get("cache_results")
+    if results:
+        response.headers["X-Cache"] = "HIT" if all(results) else "MISS" if not any(results) else "PARTIAL"
+    return response
 
-if not ALPHA_VANTAGE_API_KEY or not NEWS_API_KEY:
-    raise ValueError("Missing required API keys. Please check your .env file.")
+# The only article fields the app reads; everything else is dropped while decoding
+ARTICLE_FIELDS = ("title", "description", "url", "publishedAt")
 
-# Shared HTTP session for connection pooling
-session = requests.Session()
+def build_article(article):
+    return {
+        "title": article.get("title"),
+        "description": article.get("description"),
+        "url": article.get("url"),
+        "publishedAt": article.get("publishedAt")
+    }
 
-@app.route('/')
+NEWS_BATCH_FETCH = os.getenv("NEWS_BATCH_FETCH", "true").lower() != "false"
+NEWS_PER_SYMBOL = 10
+NEWS_TOPUP_INTERVAL = int(os.getenv("NEWS_TOPUP_INTERVAL", 900))
+
+GENERAL_NEWS_QUERY = "finance stock market"
+
+class NewsAPIError(Exception):
+    pass
+
+def fetch_news_articles(query, page_size, since=None, search_in="title,description"):
+    """Fetch normalized articles, newest first and only published from ``since`` when given."""
+    params = {"q": query}
+    if search_in:
+        params["searchIn"] = search_in
+    if since:
+        params["from"] = since
+    params.update(language="en", sortBy="publishedAt", pageSize=page_size)
+
+    def fetch(api_key):
+        # Encoded, so '&', '#' or quotes in company names and search text stay inside q
+        news_api_url = f"{NEWS_API_BASE_URL}/v2/everything?{urlencode({**params, 'apiKey': api_key})}"
+        print(f"[DEBUG] News API URL: {news_api_url}")
+
+        news_response = upstream_get(news_api_breaker, news_api_url).json(
+            cls=SelectiveDecoder,
+            fields={"status": None, "code": None, "message": None, "articles": ARTICLE_FIELDS},
+            limits={"articles": page_size}
+        )
+        print(f"[DEBUG] News API response code: {news_response.get('status')}")
+
+        if news_response.get("code") in ("rateLimited", "apiKeyExhausted"):
+            raise KeyThrottled(news_response.get("message", "News API rate limit reached"))
+        if news_response.get("status") != "ok":
+            raise NewsAPIError(news_response.get("message", "Unknown error"))
+        return [build_article(article) for article in news_response.get("articles", [])[:page_size]]
+
+    return get_key_pool("news_api").call(fetch)
+
+def get_symbol_news_cached(symbols):
+    """Return {symbol: articles}, ingesting news only for symbols missing from the cache."""
+    symbol_news = {}
+    missing = []
+    for symbol in symbols:
+        cached = cache.get(f"news_{symbol}")
+        note_cache(cached is not None)
+        if cached is None:
+            missing.append(symbol)
+        else:
+            symbol_news[symbol] = cached
+
+    if not missing:
+        print(f"[DEBUG] Using cached news for {symbols}")
+        return symbol_news
+
+    print(f"[DEBUG] Ingesting news for uncached symbols: {missing}")
+    article_store = get_article_store()
+    news_ingestor = get_news_ingestor()
+    terms = {symbol: symbol_terms(symbol, get_symbol_index()) for symbol in missing}
+    try:
+        if NEWS_BATCH_FETCH or len(missing) == 1:
+            # One upstream query for all missing symbols, attributed back per symbol
+            news_ingestor.ingest_symbols(terms, NEWS_PER_SYMBOL)
+        else:
+            with ThreadPoolExecutor() as executor:
+                list(executor.map(
+                    lambda symbol: news_ingestor.ingest_symbols({symbol: terms[symbol]}, NEWS_PER_SYMBOL),
+                    missing
+                ))
+    except Exception as e:
+        # Serve what the store already holds; only fail if there is nothing to show
+        print(f"[ERROR] News ingestion failed: {e}")
+        stored = {symbol: article_store.latest(symbol=symbol, limit=NEWS_PER_SYMBOL) for symbol in missing}
+        if not any(stored.values()):
+            raise
+        symbol_news.update(stored)
+        return symbol_news
+
+    for symbol in missing:
+        symbol_news[symbol] = article_store.latest(symbol=symbol, limit=NEWS_PER_SYMBOL)
+        cache_put(f"news_{symbol}", symbol_news[symbol], timeout=news_ttl(symbol))
+    return symbol_news
+
+def market_snapshot():
+    """Cached default-watchlist quotes and general news; never calls upstream."""
+    symbols = parse_symbols(DEFAULT_WATCHLIST)
+    quotes = cache.get_many(*(f"stock_{s}" for s in symbols)) if symbols else []
+    return {
+        "stock_data": [quote for quote in quotes if quote],
+        "news_data": cache.get("general_news") or []
+    }
+
+@bp.route('/')
 def index():
     print("[DEBUG] Serving index.html")
-    return render_template('index.html')
+    if not INDEX_SNAPSHOT:
+        return render_template('index.html')
+
+    # The page only changes with the snapshot (and asset fingerprints), so
+    # renders are cached and revalidated by that version
+    snapshot = market_snapshot()
+    assets = current_app.extensions.get('static_assets')
+    fingerprints = sorted(asset.digest for asset in assets.assets.values()) if assets else []
+    version = hashlib.sha1(json.dumps([snapshot, fingerprints], sort_keys=True).encode()).hexdigest()[:16]
+    page_key = f"index_page_{version}"
+    html = cache.get(page_key)
+    if html is None:
+        html = render_template('index.html', snapshot=snapshot)
+        cache.set(page_key, html, timeout=INDEX_RENDER_TIMEOUT)
+
+    response = current_app.make_response(html)
+    response.set_etag(version)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+@bp.route('/health')
+def health():
+    # Liveness only: the process is up and serving requests
+    return jsonify({"status": "ok"})
 
-@app.route('/api/stock/<symbol>')
+@bp.route('/ready')
+def ready():
+    """Readiness for load balancer checks, built from local state only (no upstream calls).
+
+    Returns 503 when the cache is unreachable or upstream calls are saturated,
+    so the balancer drains the node. An open circuit is reported as degraded
+    but stays in rotation: every node shares the same upstreams, and cached
+    data can still be served.
+    """
+    checks = {}
+    try:
+        cache.set("ready_probe", True, timeout=5)
+        checks["cache"] = cache.get("ready_probe") is True
+    except Exception as e:
+        print(f"[ERROR] Cache readiness probe failed: {e}")
+        checks["cache"] = False
+
+    checks["upstream_in_flight"] = {
+        "value": upstream_in_flight.value,
+        "limit": upstream_in_flight.limit,
+        "saturated": upstream_in_flight.saturated
+    }
+    breakers = (alpha_vantage_breaker, news_api_breaker) + ((finnhub_breaker,) if SECONDARY_QUOTE_PROVIDER else ())
+    checks["circuits"] = {breaker.name: breaker.snapshot() for breaker in breakers}
+    checks["admission"] = admission.snapshot()
+    quote_fetcher = globals().get("quote_fetcher")
+    if quote_fetcher is not None and quote_fetcher.secondary is not None:
+        checks["quote_hedging"] = quote_fetcher.snapshot()
+    checks["warmed"] = worker_ready.is_set()
+
+    if not checks["cache"] or upstream_in_flight.saturated:
+        status, code = "unavailable", 503
+    elif any(c["state"] != CircuitBreaker.CLOSED for c in checks["circuits"].values()):
+        status, code = "degraded", 200
+    else:
+        status, code = "ready", 200
+    return jsonify({"status": status, "checks": checks}), code
+
+@bp.route('/api/stock/<symbol>')
 def get_single_stock(symbol):
     print(f"[DEBUG] Fetching stock data for symbol: {symbol}")
     try:
         symbol = symbol.upper().strip()
+        if not is_valid_symbol(symbol):
+            print(f"[ERROR] Unknown symbol: {symbol}")
+            return jsonify({"error": f"No data found for {symbol}"}), 404
+
+        forwarded = forward_to_owner(symbol)
+        if forwarded is not None:
+            return forwarded
+
         cache_key = f"stock_{symbol}"
         
         # Check cache first
-        if cached := cache.get(cache_key):
+        cached = cache.get(cache_key)
+        note_cache(cached)
+        if cached:
             print(f"[DEBUG] Returning cached stock data for {symbol}")
             return jsonify(cached)
 
-        alpha_vantage_url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={ALPHA_VANTAGE_API_KEY}"
-        print(f"[DEBUG] Alpha Vantage URL: {alpha_vantage_url}")
-
-        response = session.get(alpha_vantage_url, timeout=3)
-        print(f"[DEBUG] Alpha Vantage response status: {response.status_code}")
-        response.raise_for_status()
-        data = response.json()
-        print(f"[DEBUG] Alpha Vantage response data: {data}")
-
-        if "Global Quote" in data:
-            quote = data["Global Quote"]
-            result = {
-                "symbol": quote.get("01. symbol"),
-                "price": quote.get("05. price"),
-                "change": quote.get("09. change"),
-                "volume": quote.get("06. volume")
-            }
-            cache.set(cache_key, result)
-            return jsonify(result)
-        else:
-            print(f"[DEBUG] No Global Quote data for symbol: {symbol}")
+        try:
+            return jsonify(fetch_quote(symbol))
+        except QuoteUnavailable as e:
+            print(f"[DEBUG] {e}")
             return jsonify({"error": f"No data found for {symbol}"}), 404
 
+    except CircuitOpenError as e:
+        print(f"[ERROR] Skipping Alpha Vantage call for {symbol}: {e}")
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         print(f"[ERROR] Exception fetching stock: {e}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/news')
+@bp.route('/api/cluster/owner/<symbol>')
+def get_symbol_owner(symbol):
+    # Lets operators and balancers check placement without knowing the ring
+    symbol = symbol.upper().strip()
+    node = cluster.owner(symbol) if cluster else None
+    return jsonify({"symbol": symbol, "node": node, "local": cluster is None or node == cluster.node_id})
+
+@bp.route('/api/watchlist', methods=['POST'])
+def get_watchlist():
+    """Quotes for up to WATCHLIST_MAX_SYMBOLS symbols, paged with ?offset=&limit=.
+
+    Cached quotes are returned at once and every uncached symbol in the list
+    is queued for a background refresh; poll again after ``retry_after``
+    seconds to pick them up. Never calls upstream within the request.
+    """
+    body = request.get_json(silent=True) or {}
+    raw = body.get('symbols', '')
+    symbols = parse_symbols(",".join(raw) if isinstance(raw, list) else str(raw))
+    if not symbols:
+        return jsonify({"error": "No symbols provided"}), 400
+    if len(symbols) > WATCHLIST_MAX_SYMBOLS:
+        return jsonify({"error": f"Too many symbols. Maximum {WATCHLIST_MAX_SYMBOLS} allowed."}), 400
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', 100)), 1), WATCHLIST_MAX_SYMBOLS)
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+
+    unknown = [s for s in symbols if not is_valid_symbol(s)]
+    symbols = [s for s in symbols if s not in unknown]
+
+    quotes = dict(zip(symbols, cache.get_many(*(f"stock_{s}" for s in symbols))))
+    missing = [s for s in symbols if not quotes[s]]
+    for s in symbols:
+        note_cache(bool(quotes[s]))
+    refresher = current_app.extensions['watchlist']
+    refresher.submit(missing)
+
+    page = symbols[offset:offset + limit]
+    pending = [s for s in page if not quotes[s]]
+    next_offset = offset + limit if offset + limit < len(symbols) else None
+    return jsonify({
+        "quotes": [quotes[s] for s in page if quotes[s]],
+        "pending": pending,
+        "unknown": unknown,
+        "total": len(symbols),
+        "offset": offset,
+        "next_offset": next_offset,
+        "retry_after": round(refresher.eta(), 1) if missing else None
+    })
+
+@bp.route('/api/alerts', methods=['POST'])
+def create_alert():
+    """Create an alert: {"symbol": "AAPL", "direction": "above", "threshold": 200}."""
+    body = request.get_json(silent=True) or {}
+    symbol = str(body.get('symbol', '')).upper().strip()
+    direction = str(body.get('direction', '')).lower()
+    if not is_valid_symbol(symbol):
+        return jsonify({"error": f"Unknown symbol: {symbol}"}), 400
+    if direction not in DIRECTIONS:
+        return jsonify({"error": f"direction must be one of {', '.join(DIRECTIONS)}"}), 400
+    try:
+        threshold = float(body.get('threshold'))
+    except (TypeError, ValueError):
+        return jsonify({"error": "threshold must be a number"}), 400
+
+    alert = get_alert_engine().add(symbol, direction, threshold)
+    print(f"[DEBUG] Created alert {alert['id']}: {symbol} {direction} {threshold}")
+    return jsonify(alert), 201
+
+@bp.route('/api/alerts')
+def list_alerts():
+    symbol = request.args.get('symbol', '').upper().strip() or None
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+    except ValueError:
+        limit = 100
+    return jsonify({"alerts": get_alert_engine().store.list_active(symbol, limit)})
+
+@bp.route('/api/alerts/<int:alert_id>', methods=['DELETE'])
+def delete_alert(alert_id):
+    alert = get_alert_engine().remove(alert_id)
+    if alert is None:
+        return jsonify({"error": f"No alert {alert_id}"}), 404
+    return jsonify(alert)
+
+@bp.route('/api/symbols')
+def search_symbols():
+    prefix = request.args.get('prefix', '')
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+    return jsonify({"symbols": get_symbol_index().search(prefix, limit)})
+
+@bp.route('/api/news')
 def get_general_news():
     print("[DEBUG] Fetching general news")
     try:
         cache_key = "general_news"
-        if cached := cache.get(cache_key):
+        cached = cache.get(cache_key)
+        note_cache(cached)
+        if cached:
             print("[DEBUG] Returning cached general news")
             return jsonify({"articles": cached})
 
-        news_api_url = f"https://newsapi.org/v2/everything?q=finance stock market&apiKey={NEWS_API_KEY}&language=en&sortBy=relevancy&pageSize=10"
-        print(f"[DEBUG] News API URL: {news_api_url}")
-
-        response = session.get(news_api_url, timeout=3)
-        print(f"[DEBUG] News API response status: {response.status_code}")
-        response.raise_for_status()
-        news_response = response.json()
-        print(f"[DEBUG] News API response: {news_response}")
-
-        if news_response.get("status") == "ok":
-            articles = []
-            for article in news_response.get("articles", [])[:10]:
-                articles.append({
-                    "title": article.get("title"),
-                    "description": article.get("description"),
-                    "url": article.get("url"),
-                    "publishedAt": article.get("publishedAt")
-                })
-            cache.set(cache_key, articles)
+        article_store = get_article_store()
+        try:
+            added = get_news_ingestor().ingest("general", GENERAL_NEWS_QUERY, page_size=10, search_in=None)
+            print(f"[DEBUG] Ingested {added} new general news articles")
+        except Exception as e:
+            print(f"[ERROR] General news ingestion failed: {e}")
+            articles = article_store.latest(feed="general", limit=10)
+            if not articles:
+                print("[ERROR] Failed to fetch news")
+                return jsonify({"error": "Failed to fetch news"}), 500
             return jsonify({"articles": articles})
-        else:
-            print("[ERROR] Failed to fetch news")
-            return jsonify({"error": "Failed to fetch news"}), 500
+
+        articles = article_store.latest(feed="general", limit=10)
+        cache_put(cache_key, articles, timeout=news_ttl())
+        return jsonify({"articles": articles})
 
     except Exception as e:
         print(f"[ERROR] Exception fetching general news: {e}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/news/<symbol>')
+@bp.route('/api/news/search')
+def search_news():
+    query = request.args.get('q', '').strip()
+    symbol = request.args.get('symbol', '').upper().strip() or None
+    print(f"[DEBUG] Searching news for {query!r} (symbol: {symbol})")
+
+    if not query and not symbol:
+        return jsonify({"error": "No search query provided"}), 400
+
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+
+    try:
+        article_store = get_article_store()
+        articles = article_store.search(query, symbol, limit)
+        source = "local"
+
+        # Top up from NewsAPI at most once per interval, and only if local results are thin or stale
+        topup_key = f"news_topup_{symbol}_{query.lower()}"
+        newest = max((a["publishedAt"] or '' for a in articles), default='')
+        stale_before = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - NEWS_TOPUP_INTERVAL))
+        if cache.get(topup_key) is None and (len(articles) < limit or newest < stale_before):
+            terms = {symbol: symbol_terms(symbol, get_symbol_index())} if symbol else {}
+            upstream_query = build_news_query(terms) if terms else query
+            if terms and query:
+                upstream_query = f"{upstream_query} {query}"
+            try:
+                get_news_ingestor().ingest(f"search:{symbol or ''}:{query.lower()}", upstream_query,
+                                     NEWS_PER_SYMBOL, [symbol] if symbol else ())
+                articles = article_store.search(query, symbol, limit)
+                source = "local+upstream"
+            except Exception as e:
+                print(f"[ERROR] News top-up failed, serving local results: {e}")
+            cache.set(topup_key, True, timeout=NEWS_TOPUP_INTERVAL)
+
+        return jsonify({"articles": articles, "source": source})
+
+    except Exception as e:
+        print(f"[ERROR] Exception searching news: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/news/<symbol>')
 def get_symbol_news(symbol):
     print(f"[DEBUG] Fetching news for symbol: {symbol}")
     try:
         symbol = symbol.upper().strip()
-        cache_key = f"news_{symbol}"
-        
-        if cached := cache.get(cache_key):
-            print(f"[DEBUG] Returning cached news for {symbol}")
-            return jsonify({"articles": cached})
+        if not is_valid_symbol(symbol):
+            print(f"[ERROR] Unknown symbol: {symbol}")
+            return jsonify({"error": f"Unknown symbol: {symbol}"}), 400
 
-        news_api_url = f"https://newsapi.org/v2/everything?q={symbol} stock&apiKey={NEWS_API_KEY}&language=en&sortBy=relevancy&pageSize=10"
-        print(f"[DEBUG] News API URL for symbol: {news_api_url}")
-
-        response = session.get(news_api_url, timeout=3)
-        print(f"[DEBUG] News API response status: {response.status_code}")
-        response.raise_for_status()
-        news_response = response.json()
-        print(f"[DEBUG] News API response for symbol: {news_response}")
-
-        if news_response.get("status") == "ok":
-            articles = []
-            for article in news_response.get("articles", [])[:10]:
-                articles.append({
-                    "title": article.get("title"),
-                    "description": article.get("description"),
-                    "url": article.get("url"),
-                    "publishedAt": article.get("publishedAt")
-                })
-            cache.set(cache_key, articles)
-            return jsonify({"articles": articles})
-        else:
-            print(f"[ERROR] No news found for {symbol}")
-            return jsonify({"error": f"No news found for {symbol}"}), 404
+        forwarded = forward_to_owner(symbol)
+        if forwarded is not None:
+            return forwarded
 
+        articles = get_symbol_news_cached([symbol])[symbol]
+        return jsonify({"articles": articles})
+
+    except NewsAPIError as e:
+        print(f"[ERROR] No news found for {symbol}: {e}")
+        return jsonify({"error": f"No news found for {symbol}"}), 404
     except Exception as e:
         print(f"[ERROR] Exception fetching symbol news: {e}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/get_stock_data', methods=['POST'])
+@bp.route('/get_stock_data', methods=['POST'])
 def get_stock_data():
     print("[DEBUG] Received POST to /get_stock_data")
     start_time = time.time()
@@ -170,104 +963,90 @@ def get_stock_data():
             print("[ERROR] No symbols provided")
             return jsonify({"error": "No symbols provided"}), 400
 
-        symbols = list({s.strip().upper() for s in symbols_str.split(',') if s.strip()})
+        symbols = parse_symbols(symbols_str)
         print(f"[DEBUG] Parsed symbols: {symbols}")
 
         if len(symbols) > 10:
             print("[ERROR] Too many symbols provided")
             return jsonify({"error": "Too many symbols. Maximum 10 allowed."}), 400
 
-        stock_data = []
-        news_data = []
-        errors = []
-
-        # Build expanded symbols list for news
-        symbols_expanded = []
-        for s in symbols:
-            symbols_expanded.append(s)
-            if '.' in s:
-                symbols_expanded.append(s.split('.')[0])  # Handle BRK.A -> BRK
-
-        # Optimized news query
-        news_query = f"({' OR '.join(symbols_expanded)}) (stock OR shares OR company OR market OR earnings)"
-        news_api_url = (
-            f"https://newsapi.org/v2/everything?"
-            f"q={news_query}&"
-            f"searchIn=title,description&"
-            f"language=en&"
-            f"sortBy=relevancy&"
-            f"pageSize=5&"
-            f"apiKey={NEWS_API_KEY}"
-        )
-        print(f"[DEBUG] News API URL: {news_api_url}")
+        unknown_symbols = [s for s in symbols if not is_valid_symbol(s)]
+        if unknown_symbols:
+            print(f"[ERROR] Unknown symbols: {unknown_symbols}")
+            symbols = [s for s in symbols if s not in unknown_symbols]
 
-        # Cache key for news
-        news_cache_key = f"combined_news_{'_'.join(sorted(symbols))}"
-        if cached_news := cache.get(news_cache_key):
-            print("[DEBUG] Using cached news results")
-            news_data = cached_news
-        else:
-            # Fetch news if not cached
+        errors = [f"Unknown symbol: {s}" for s in unknown_symbols]
+        quotes = {}
+        symbol_news = {}
+
+        # In a cluster, symbols owned by other nodes are fetched there (and cached
+        # there) while this node works on its own share
+        remote_groups = {}
+        if symbols and cluster is not None and not request.headers.get(FORWARDED_HEADER):
+            remote_groups = cluster.ring.group(symbols)
+            remote_groups.pop(cluster.node_id, None)
+        remote_futures = {node: get_cluster_executor().submit(forward_stock_data, node, group)
+                          for node, group in remote_groups.items()}
+        local_symbols = [s for s in symbols if not any(s in group for group in remote_groups.values())]
+
+        # Worker threads get this app's context for the cache, and their cache
+        # outcomes are recorded afterwards
+        stock_cache_results = []
+        flask_app = current_app._get_current_object()
+
+        def fetch_stock(symbol):
+            with flask_app.app_context():
+                cache_key = f"stock_{symbol}"
+                cached = cache.get(cache_key)
+                stock_cache_results.append(bool(cached))
+                if cached:
+                    return cached
+
+                try:
+                    return fetch_quote(symbol)
+                except QuoteUnavailable as e:
+                    print(f"[ERROR] {e}")
+                    errors.append(str(e))
+                except (requests.exceptions.RequestException, CircuitOpenError) as e:
+                    print(f"[ERROR] RequestException fetching stock for {symbol}: {e}")
+                    errors.append(f"Error fetching stock data for {symbol}: {e}")
+                return None
+
+        def serve_locally(group):
+            # News is cached per symbol and merged below, so overlapping symbol sets share hits
             try:
-                news_response = session.get(news_api_url, timeout=3).json()
-                print(f"[DEBUG] News API response code: {news_response.get('status')}")
-                print(f"[DEBUG] News API response: {news_response}")
-
-                if news_response.get("status") == "ok":
-                    news_data = [{
-                        "title": article.get("title"),
-                        "description": article.get("description"),
-                        "url": article.get("url")
-                    } for article in news_response.get("articles", [])[:5]]
-                    cache.set(news_cache_key, news_data)
-                else:
-                    print(f"[ERROR] News API error message: {news_response.get('message', 'Unknown error')}")
-                    errors.append(f"News API Error: {news_response.get('message', 'Unknown error')}")
+                symbol_news.update(get_symbol_news_cached(group))
+            except NewsAPIError as e:
+                print(f"[ERROR] News API error message: {e}")
+                errors.append(f"News API Error: {e}")
             except Exception as e:
                 print(f"[ERROR] Exception fetching news: {e}")
                 errors.append(f"Error fetching news: {e}")
 
-        # Fetch stock data in parallel
-        def fetch_stock(symbol):
-            cache_key = f"stock_{symbol}"
-            if cached := cache.get(cache_key):
-                return cached
+            # Execute stock fetches in parallel
+            with ThreadPoolExecutor() as executor:
+                quotes.update(zip(group, executor.map(fetch_stock, group)))
 
+        if not symbols:
+            print("[DEBUG] No valid symbols, skipping news fetch")
+        elif local_symbols:
+            serve_locally(local_symbols)
+
+        for node, future in remote_futures.items():
             try:
-                alpha_vantage_url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={ALPHA_VANTAGE_API_KEY}"
-                print(f"[DEBUG] Fetching stock data for {symbol} from: {alpha_vantage_url}")
-                
-                response = session.get(alpha_vantage_url, timeout=3)
-                print(f"[DEBUG] Response status for {symbol}: {response.status_code}")
-                response.raise_for_status()
-                data = response.json()
-                print(f"[DEBUG] Response data for {symbol}: {data}")
-
-                if "Global Quote" in data:
-                    quote = data["Global Quote"]
-                    result = {
-                        "symbol": quote.get("01. symbol"),
-                        "price": quote.get("05. price"),
-                        "change": quote.get("09. change"),
-                        "volume": quote.get("06. volume")
-                    }
-                    cache.set(cache_key, result)
-                    return result
-                elif "Error Message" in data:
-                    print(f"[ERROR] Alpha Vantage error for {symbol}: {data['Error Message']}")
-                    errors.append(f"Alpha Vantage Error for {symbol}: {data['Error Message']}")
-                else:
-                    print(f"[ERROR] No Global Quote found for {symbol}")
-                    errors.append(f"No data found for {symbol} from Alpha Vantage.")
-            except requests.exceptions.RequestException as e:
-                print(f"[ERROR] RequestException fetching stock for {symbol}: {e}")
-                errors.append(f"Error fetching stock data for {symbol}: {e}")
-            return None
-
-        # Execute stock fetches in parallel
-        with ThreadPoolExecutor() as executor:
-            stock_results = list(executor.map(fetch_stock, symbols))
-            stock_data = [result for result in stock_results if result]
+                owned = future.result()
+                quotes.update(owned["quotes"])
+                symbol_news.update(owned["news"])
+                errors.extend(owned["errors"])
+            except Exception as e:
+                # The owner is unreachable; serve its symbols here rather than failing them
+                print(f"[ERROR] Forwarding {remote_groups[node]} to {node} failed, serving locally: {e}")
+                serve_locally(remote_groups[node])
+
+        for hit in stock_cache_results:
+            note_cache(hit)
+        stock_data = [quotes[s] for s in symbols if quotes.get(s)]
+        news_data = merge_symbol_news([symbol_news[s] for s in symbols if s in symbol_news], limit=5)
 
         result = {
             "stock_data": stock_data,
@@ -275,24 +1054,64 @@ def get_stock_data():
             "errors": errors,
             "response_time": f"{(time.time() - start_time):.2f}s"
         }
+        if request.headers.get(FORWARDED_HEADER):
+            # Raw per-symbol results let the forwarding node merge them in request order
+            result["cluster"] = {"quotes": quotes, "news": symbol_news, "errors": errors}
+        if request.json.get('symbol_news'):
+            # The browser caches results per symbol and merges news itself
+            result["symbol_news"] = {s: symbol_news[s] for s in symbols if s in symbol_news}
         print(f"[DEBUG] Final result: {result}")
-        return jsonify(result)
+        response = jsonify(result)
+        if CLIENT_CACHE_MAX_AGE:
+            response.headers["Cache-Control"] = f"private, max-age={CLIENT_CACHE_MAX_AGE}"
+        return response
 
     except Exception as e:
         print(f"[ERROR] Exception during request processing: {e}")
         return jsonify({"error": "Server error processing request"}), 500
 
-@app.errorhandler(404)
+@bp.route('/api/export/<dataset>')
+def export_dataset(dataset):
+    """Stream stored quotes, bars or news: ?format=csv|jsonl|arrow|parquet&symbols=&start=&end=.
+
+    Rows are read and encoded a batch at a time as the client consumes the
+    response, so memory stays flat however large the range.
+    """
+    fmt = request.args.get('format', 'csv').lower()
+    try:
+        rows = dataset_rows(dataset, get_quote_history(), get_article_store(),
+                            parse_symbols(request.args.get('symbols', '')),
+                            parse_time(request.args.get('start')), parse_time(request.args.get('end')),
+                            EXPORT_BATCH_SIZE)
+        chunks = encode(rows, DATASETS[dataset], fmt, EXPORT_BATCH_SIZE)
+    except ExportError as e:
+        return jsonify({"error": str(e)}), 400
+    if not export_slots.acquire(blocking=False):
+        print(f"[ERROR] Rejecting export of {dataset}: {EXPORT_MAX_CONCURRENT} already running")
+        response = jsonify({"error": "Too many exports in progress"})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+
+    content_type, extension = FORMATS[fmt]
+    print(f"[DEBUG] Exporting {dataset} as {fmt}")
+    response = current_app.response_class(chunks, content_type=content_type)
+    response.headers["Content-Disposition"] = f'attachment; filename="{dataset}.{extension}"'
+    # Released when the server closes the response, including on client disconnects
+    response.call_on_close(export_slots.release)
+    return response
+
+@bp.app_errorhandler(404)
 def not_found(error):
     print(f"[ERROR] 404 - Not Found: {error}")
     return jsonify({"error": "Endpoint not found"}), 404
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_error(error):
     print(f"[ERROR] 500 - Internal Server Error: {error}")
     return jsonify({"error": "Internal server error"}), 500
 
 if __name__ == '__main__':
+    app = create_app()
     port = int(os.getenv('PORT', 10000))
     print(f"[DEBUG] Starting app on port {port}")
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
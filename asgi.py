@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for uvicorn workers (GUNICORN_WORKER_CLASS=uvicorn)
+"""
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app as wsgi_app
+
+app = WsgiToAsgi(wsgi_app)
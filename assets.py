@@ -0,0 +1,127 @@
+"""
+Fingerprinted, precompressed static assets
+
+At app creation the CSS and JS under ``static/`` are minified, hashed and
+compressed once, in memory. ``url_for('static', filename='css/style.css')``
+then resolves to ``/static/css/style.<hash>.css``, which is served with
+``Cache-Control: immutable`` and a gzip (or brotli, when installed) body
+chosen from Accept-Encoding. A changed file gets a new hash and URL, so
+browsers never revalidate an asset they already hold. Unversioned paths keep
+working through Flask's normal static view.
+
+Disable with STATIC_FINGERPRINT=false (e.g. while editing assets).
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FINGERPRINT_EXTENSIONS = (".css", ".js")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def minify_css(source):
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    source = re.sub(r"\s+", " ", source)
+    # Spaces before ':' are left alone: "a :hover" and "a:hover" differ
+    source = re.sub(r"\s*([{};,])\s*", r"\1", source)
+    source = re.sub(r":\s+", ":", source)
+    return source.replace(";}", "}").strip()
+
+
+def minify_js(source):
+    """Drop indentation, blank lines and whole-line comments, keeping line breaks for ASI."""
+    lines = []
+    for line in source.splitlines():
+        line = line.strip()
+        if not line or line.startswith("//") or (line.startswith("/*") and line.endswith("*/")):
+            continue
+        lines.append(line)
+    return "\n".join(lines)
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+class Asset:
+    """One fingerprinted file with its encoded variants."""
+
+    __slots__ = ("url", "mimetype", "digest", "variants")
+
+    def __init__(self, filename, body):
+        stem, ext = os.path.splitext(filename)
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.url = f"{stem}.{self.digest}{ext}"
+        self.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        self.variants = {"identity": body, "gzip": gzip.compress(body, 9, mtime=0)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body)
+
+    def negotiate(self, accept_encodings):
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accept_encodings[encoding]:
+                return encoding
+        return "identity"
+
+
+class StaticAssets:
+    """Flask extension serving fingerprinted copies of ``app.static_folder``."""
+
+    def __init__(self, app=None):
+        self.assets = {}
+        self._by_url = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.assets = self.build(app.static_folder)
+        self._by_url = {asset.url: asset for asset in self.assets.values()}
+        app.extensions['static_assets'] = self
+        app.url_defaults(self._rewrite_url)
+        self._static_view = app.view_functions['static']
+        app.view_functions['static'] = self._serve
+
+    @staticmethod
+    def build(static_folder):
+        """Return {relative filename: Asset} for the fingerprinted files in ``static_folder``."""
+        assets = {}
+        for root, _, files in os.walk(static_folder):
+            for name in sorted(files):
+                ext = os.path.splitext(name)[1]
+                if ext not in FINGERPRINT_EXTENSIONS:
+                    continue
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, static_folder).replace(os.sep, "/")
+                with open(path, encoding="utf-8") as f:
+                    body = MINIFIERS[ext](f.read()).encode()
+                assets[filename] = Asset(filename, body)
+        return assets
+
+    def _rewrite_url(self, endpoint, values):
+        if endpoint == 'static':
+            asset = self.assets.get(values.get('filename'))
+            if asset is not None:
+                values['filename'] = asset.url
+
+    def _serve(self, filename):
+        asset = self._by_url.get(filename)
+        if asset is None:
+            return self._static_view(filename=filename)
+
+        encoding = asset.negotiate(request.accept_encodings)
+        response = current_app.response_class(asset.variants[encoding], mimetype=asset.mimetype)
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Cache-Control"] = IMMUTABLE
+        response.headers["Vary"] = "Accept-Encoding"
+        response.set_etag(f"{asset.digest}-{encoding}")
+        return response.make_conditional(request)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for the Stock Market Data & News Aggregator
+
+Starts the mock upstream and the app under gunicorn, drives /get_stock_data,
+/api/stock/<symbol> and /api/news at a fixed concurrency, then reports
+throughput, p50/p95/p99 latency and upstream call counts. Every run is saved
+under benchmarks/results/ and compared with the previous run that used the
+same configuration, so regressions show up between runs.
+
+Usage:
+    python -m benchmarks.load_test --profile realistic --concurrency 16 --duration 30
+    python -m benchmarks.load_test --target http://localhost:8080 --mock-url http://localhost:9100
+    python -m benchmarks.load_test --cassette cassettes/prod.jsonl --latency-scale 1.0
+"""
+
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks.mock_upstream import MockUpstream, PROFILES
+from benchmarks.results import summarize_latencies, save_result, load_previous, compare, print_comparison
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Share of requests going to each endpoint
+ENDPOINT_MIX = {
+    "get_stock_data": 0.5,
+    "api_stock": 0.35,
+    "api_news": 0.15,
+}
+
+
+def popular_symbols(count=100, skew=1.1):
+    """Return (symbols, weights) with Zipf-distributed popularity over the bundled listing."""
+    sys.path.insert(0, ROOT_DIR)
+    from symbols import SymbolIndex
+
+    symbols = list(SymbolIndex.load_default())
+    rng = random.Random(42)
+    rng.shuffle(symbols)
+    symbols = symbols[:count]
+    weights = [1 / (rank + 1) ** skew for rank in range(len(symbols))]
+    return symbols, weights
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code < 500:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def start_app_server(port, upstream_url, workers=2, worker_class="sync", threads=1, extra_args=(), env=None,
+                     log_path=None, app_path="app:app"):
+    """Launch the app under gunicorn pointed at ``upstream_url`` and wait until it serves."""
+    data_dir = tempfile.mkdtemp(prefix="stock-bench-")
+    server_env = dict(os.environ)
+    server_env.update({
+        "ALPHA_VANTAGE_API_KEY": "bench",
+        "NEWS_API_KEY": "bench",
+        "DATABASE_PATH": os.path.join(data_dir, "bench.db"),
+    })
+    if upstream_url:
+        server_env.update({"ALPHA_VANTAGE_BASE_URL": upstream_url, "NEWS_API_BASE_URL": upstream_url,
+                           "FINNHUB_BASE_URL": upstream_url})
+    server_env.update(env or {})
+
+    log = open(log_path or os.path.join(data_dir, "gunicorn.log"), "w")
+    cmd = [
+        sys.executable, "-m", "gunicorn", app_path,
+        "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers),
+        "--worker-class", worker_class,
+        "--threads", str(threads),
+        *extra_args,
+    ]
+    process = subprocess.Popen(cmd, cwd=ROOT_DIR, env=server_env, stdout=log, stderr=subprocess.STDOUT)
+    if not wait_for(f"http://127.0.0.1:{port}/api/symbols?prefix=A"):
+        process.terminate()
+        raise RuntimeError(f"App server failed to start, see {log.name}")
+    return process
+
+
+def pick_request(rng, symbols, weights):
+    endpoint = rng.choices(list(ENDPOINT_MIX), weights=list(ENDPOINT_MIX.values()))[0]
+    if endpoint == "get_stock_data":
+        chosen = set(rng.choices(symbols, weights=weights, k=rng.randint(1, 5)))
+        return endpoint, "POST", "/get_stock_data", {"symbols": ",".join(chosen)}
+    if endpoint == "api_stock":
+        return endpoint, "GET", f"/api/stock/{rng.choices(symbols, weights=weights)[0]}", None
+    return endpoint, "GET", "/api/news", None
+
+
+def run_load(base_url, concurrency, duration, symbols, weights, seed=0):
+    """Drive the target with ``concurrency`` closed-loop clients for ``duration`` seconds."""
+    samples = []
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def client(worker_id):
+        rng = random.Random(seed * 1000 + worker_id)
+        http = requests.Session()
+        local = []
+        while time.time() < deadline:
+            endpoint, method, path, body = pick_request(rng, symbols, weights)
+            start = time.perf_counter()
+            try:
+                response = http.request(method, base_url + path, json=body, timeout=60)
+                status = response.status_code
+            except requests.RequestException:
+                status = 0
+            local.append((endpoint, status, (time.perf_counter() - start) * 1000))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.time() - started
+
+
+def build_report(samples, elapsed, upstream_stats):
+    report = {"endpoints": {}, "upstream": upstream_stats}
+    for endpoint in [*ENDPOINT_MIX, "all"]:
+        rows = samples if endpoint == "all" else [s for s in samples if s[0] == endpoint]
+        latencies = [s[2] for s in rows]
+        summary = summarize_latencies(latencies)
+        summary["rps"] = round(len(rows) / elapsed, 2) if elapsed else 0.0
+        summary["errors"] = sum(1 for s in rows if s[1] == 0 or s[1] >= 500)
+        report["endpoints"][endpoint] = summary
+
+    total = len(samples) or 1
+    upstream_calls = sum(sum(v for k, v in stats.items() if k != "bytes") for stats in upstream_stats.values())
+    report["upstream_calls_per_request"] = round(upstream_calls / total, 3)
+    return report
+
+
+def flatten(report):
+    flat = {"upstream_calls_per_request": report["upstream_calls_per_request"]}
+    for endpoint, summary in report["endpoints"].items():
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            flat[f"{endpoint}.{key}"] = summary[key]
+    return flat
+
+
+def print_report(report, elapsed):
+    print(f"\nResults over {elapsed:.1f}s")
+    print(f"{'endpoint':<16} {'requests':>9} {'rps':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, s in report["endpoints"].items():
+        print(f"{endpoint:<16} {s['count']:>9} {s['rps']:>9.1f} {s['errors']:>7} "
+              f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}")
+    print("\nUpstream calls")
+    for provider, stats in report["upstream"].items():
+        print(f"  {provider:<14} calls={stats.get('calls', 0)} errors={stats.get('errors', 0)} "
+              f"throttled={stats.get('throttled', 0)} bytes={stats.get('bytes', 0)}")
+    print(f"  per app request: {report['upstream_calls_per_request']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the app against a mock upstream")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--worker-class", default="sync")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--symbols", type=int, default=100, help="size of the symbol universe to draw from")
+    parser.add_argument("--target", help="benchmark an already running app instead of starting gunicorn")
+    parser.add_argument("--mock-url", help="stats URL of an external mock upstream (with --target)")
+    parser.add_argument("--cassette", help="replay recorded upstream traffic instead of the mock")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="scale replayed upstream latencies")
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change flagged as regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    symbols, weights = popular_symbols(args.symbols)
+    mock = None
+    server = None
+    try:
+        if args.target:
+            base_url = args.target.rstrip("/")
+        elif args.cassette:
+            port = free_port()
+            print(f"Starting gunicorn ({args.workers}x {args.worker_class}, {args.threads} threads) "
+                  f"replaying {args.cassette} at {args.latency_scale}x latency")
+            server = start_app_server(port, None, args.workers, args.worker_class, args.threads, env={
+                "UPSTREAM_MODE": "replay",
+                "UPSTREAM_CASSETTE": os.path.abspath(args.cassette),
+                "UPSTREAM_LATENCY_SCALE": str(args.latency_scale),
+            })
+            base_url = f"http://127.0.0.1:{port}"
+        else:
+            mock = MockUpstream(args.profile).start()
+            port = free_port()
+            print(f"Starting gunicorn ({args.workers}x {args.worker_class}, {args.threads} threads) "
+                  f"against mock upstream '{args.profile}' at {mock.url}")
+            server = start_app_server(port, mock.url, args.workers, args.worker_class, args.threads)
+            base_url = f"http://127.0.0.1:{port}"
+
+        if mock:
+            mock.reset()
+        print(f"Driving {base_url} with {args.concurrency} clients for {args.duration}s")
+        samples, elapsed = run_load(base_url, args.concurrency, args.duration, symbols, weights)
+
+        if mock:
+            upstream_stats = mock.stats()
+        elif args.mock_url:
+            upstream_stats = requests.get(f"{args.mock_url.rstrip('/')}/__stats", timeout=5).json()
+        else:
+            upstream_stats = {}
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+        if mock:
+            mock.stop()
+
+    report = build_report(samples, elapsed, upstream_stats)
+    print_report(report, elapsed)
+
+    if args.target:
+        profile = "external"
+    elif args.cassette:
+        profile = f"replay:{os.path.basename(args.cassette)}"
+    else:
+        profile = args.profile
+    config = {
+        "profile": profile,
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "worker_class": args.worker_class,
+        "threads": args.threads,
+    }
+    path = save_result("load", args.label, {"config": config, "duration": elapsed, "report": report,
+                                            "metrics": flatten(report)})
+    print(f"\nSaved results to {path}")
+
+    previous = load_previous("load", match=config, exclude=path)
+    if previous:
+        metrics = {name: ("higher" if name.endswith("rps") else "lower") for name in flatten(report)}
+        rows = compare(flatten(report), previous["metrics"], metrics, args.threshold)
+        regressed = print_comparison(rows, os.path.basename(previous["path"]))
+        if regressed and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the per-request CPU work in app.py
+
+Covers symbol parsing/validation, quote and article dict construction,
+jsonify of typical payloads, SimpleCache get/set and SQLite cache/store
+round-trips, price-alert evaluation and upstream response decoding. Runs
+offline in a few seconds. Each benchmark reports CPU time per call and the
+peak memory one call allocates. Benchmarks follow the pytest-benchmark
+calling convention (``benchmark(fn, *args)``) so each one is a plain function
+of a ``benchmark`` callable.
+
+Usage:
+    python -m benchmarks.micro                    # run and compare with the baseline
+    python -m benchmarks.micro --save-baseline    # record the current numbers as baseline
+    python -m benchmarks.micro -k cache           # only benchmarks whose name contains "cache"
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.results import RESULTS_DIR, save_result, load_previous, compare, print_comparison
+
+BASELINE_PATH = os.path.join(RESULTS_DIR, "micro-baseline.json")
+
+SYMBOLS_INPUT = " aapl, MSFT ,googl,AMZN, tsla,NVDA , meta,aapl, JPM,V "
+
+GLOBAL_QUOTE = {
+    "01. symbol": "AAPL",
+    "02. open": "189.3300",
+    "03. high": "191.0500",
+    "04. low": "188.1900",
+    "05. price": "190.6400",
+    "06. volume": "53665543",
+    "07. latest trading day": "2024-01-05",
+    "08. previous close": "189.4100",
+    "09. change": "1.2300",
+    "10. change percent": "0.6494%"
+}
+
+RAW_ARTICLE = {
+    "source": {"id": "reuters", "name": "Reuters"},
+    "author": "Staff Writer",
+    "title": "Apple shares climb as iPhone demand steadies ahead of earnings",
+    "description": "Apple Inc shares rose on Friday after analysts said iPhone demand had stabilised.",
+    "url": "https://www.reuters.com/technology/apple-shares-climb-2024-01-05/",
+    "urlToImage": "https://www.reuters.com/resizer/apple.jpg",
+    "publishedAt": "2024-01-05T14:32:00Z",
+    "content": "Apple Inc shares rose on Friday... [+2300 chars]"
+}
+
+
+def _app_module():
+    os.environ.setdefault("ALPHA_VANTAGE_API_KEY", "bench")
+    os.environ.setdefault("NEWS_API_KEY", "bench")
+    os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(prefix="stock-micro-"), "micro.db"))
+    import app
+    return app
+
+
+def bench_parse_symbols(benchmark):
+    app = _app_module()
+    benchmark(app.parse_symbols, SYMBOLS_INPUT)
+
+
+def bench_validate_symbols(benchmark):
+    app = _app_module()
+    symbols = app.parse_symbols(SYMBOLS_INPUT)
+    benchmark(lambda: [s for s in symbols if app.is_valid_symbol(s)])
+
+
+def bench_build_quote(benchmark):
+    from providers import build_quote
+
+    benchmark(build_quote, GLOBAL_QUOTE)
+
+
+def bench_build_articles(benchmark):
+    app = _app_module()
+    articles = [RAW_ARTICLE] * 10
+    benchmark(lambda: [app.build_article(a) for a in articles])
+
+
+def bench_jsonify_stock_data(benchmark):
+    from providers import build_quote
+
+    app = _app_module()
+    payload = {
+        "stock_data": [build_quote(GLOBAL_QUOTE)] * 10,
+        "news_data": [app.build_article(RAW_ARTICLE)] * 5,
+        "errors": [],
+        "response_time": "0.12s"
+    }
+    with app.app.app_context():
+        benchmark(app.jsonify, payload)
+
+
+def bench_jsonify_news(benchmark):
+    app = _app_module()
+    payload = {"articles": [app.build_article(RAW_ARTICLE)] * 10}
+    with app.app.app_context():
+        benchmark(app.jsonify, payload)
+
+
+def bench_simple_cache_get_hit(benchmark):
+    from providers import build_quote
+
+    app = _app_module()
+    app.cache.set("stock_BENCH", build_quote(GLOBAL_QUOTE))
+    benchmark(app.cache.get, "stock_BENCH")
+
+
+def bench_simple_cache_get_miss(benchmark):
+    app = _app_module()
+    benchmark(app.cache.get, "stock_MISSING")
+
+
+def bench_simple_cache_set(benchmark):
+    from providers import build_quote
+
+    app = _app_module()
+    quote = build_quote(GLOBAL_QUOTE)
+    benchmark(app.cache.set, "stock_BENCH", quote)
+
+
+def bench_stock_data_cache_roundtrip(benchmark):
+    from database import StockDataCache
+    from providers import build_quote
+
+    store = StockDataCache(os.path.join(tempfile.mkdtemp(prefix="stock-micro-"), "cache.db"))
+    quote = build_quote(GLOBAL_QUOTE)
+
+    def roundtrip():
+        store.cache_stock_data("AAPL", quote)
+        return store.get_stock_data("AAPL")
+
+    benchmark(roundtrip)
+
+
+def bench_article_store_search(benchmark):
+    from database import NewsArticleStore
+
+    store = NewsArticleStore(os.path.join(tempfile.mkdtemp(prefix="stock-micro-"), "news.db"))
+    store.save_articles([
+        dict(RAW_ARTICLE, url=f"{RAW_ARTICLE['url']}{i}", title=f"{RAW_ARTICLE['title']} {i}")
+        for i in range(1000)
+    ], ["AAPL"])
+    benchmark(store.search, "iphone demand", "AAPL", 10)
+
+
+def bench_cache_snapshot_load(benchmark):
+    import time
+    from cache_snapshot import CacheSnapshot
+    from database import StockDataCache
+    from providers import build_quote
+
+    app = _app_module()
+    store = StockDataCache(os.path.join(tempfile.mkdtemp(prefix="stock-micro-"), "snapshot.db"))
+    now = time.time()
+    quote = build_quote(GLOBAL_QUOTE)
+    store.save_snapshot((f"stock_S{i}", quote, now, now + 3600) for i in range(500))
+    snapshot = CacheSnapshot(app.app, app.cache, store, interval=0)
+    benchmark(snapshot.load)
+
+
+def bench_alert_evaluation_1m(benchmark):
+    import itertools
+    from alerts import AlertEngine, ABOVE, BELOW
+    from database import AlertStore
+
+    # One million alerts over 1000 symbols, none crossed by the benchmarked quotes
+    store = AlertStore(os.path.join(tempfile.mkdtemp(prefix="stock-micro-"), "alerts.db"))
+    engine = AlertEngine(store, sync_interval=float("inf"))
+    for s in range(1000):
+        alerts = engine._alerts(f"S{s}")
+        for i in range(500):
+            alerts.append_sorted(s * 1000 + i, BELOW, 1 + i * 0.1)
+        for i in reversed(range(500)):
+            alerts.append_sorted(s * 1000 + 500 + i, ABOVE, 200 + i * 0.1)
+    prices = itertools.cycle([150.0, 150.5])
+    benchmark(lambda: engine.on_quote("S500", next(prices)))
+
+
+def bench_alert_firing_1m(benchmark):
+    from alerts import SymbolAlerts, ABOVE, BELOW
+
+    # One million alerts on one symbol; every quote fires the alert nearest the
+    # price and it is re-armed there, as new alerts cluster around the price.
+    # Measured on the index alone: delivery goes through SQLite
+    alerts = SymbolAlerts()
+    for i in range(500_000):
+        alerts.append_sorted(i, BELOW, 100.0 + i * 1e-4)
+    for i in reversed(range(500_000)):
+        alerts.append_sorted(500_000 + i, ABOVE, 200.0 + i * 1e-4)
+    alerts.update(150.0)
+    top_below = alerts.below[-1]
+
+    def swing():
+        for alert_id in alerts.update(200.0):
+            alerts.add(alert_id, ABOVE, 200.0)
+        for alert_id in alerts.update(top_below):
+            alerts.add(alert_id, BELOW, top_below)
+
+    benchmark(swing)
+
+
+def _news_page_body(count=100):
+    # A full-size NewsAPI page: long content snippets on every article
+    article = dict(RAW_ARTICLE, content="Apple Inc shares rose on Friday. " * 60)
+    page = {"status": "ok", "totalResults": 4000,
+            "articles": [dict(article, url=f"{article['url']}{i}") for i in range(count)]}
+    return json.dumps(page)
+
+
+def bench_decode_news_full(benchmark):
+    app = _app_module()
+    body = _news_page_body()
+    benchmark(lambda: [app.build_article(a) for a in json.loads(body)["articles"][:10]])
+
+
+def bench_decode_news_selective(benchmark):
+    from upstream import SelectiveDecoder
+
+    app = _app_module()
+    body = _news_page_body()
+    fields = {"status": None, "message": None, "articles": app.ARTICLE_FIELDS}
+    benchmark(lambda: [app.build_article(a) for a in json.loads(
+        body, cls=SelectiveDecoder, fields=fields, limits={"articles": 10})["articles"]])
+
+
+def bench_decode_quote_selective(benchmark):
+    from providers import QUOTE_FIELDS, build_quote
+    from upstream import SelectiveDecoder
+
+    body = json.dumps({"Global Quote": GLOBAL_QUOTE})
+    fields = {"Global Quote": QUOTE_FIELDS, "Error Message": None}
+    benchmark(lambda: build_quote(json.loads(body, cls=SelectiveDecoder, fields=fields)["Global Quote"]))
+
+
+BENCHMARKS = {name[len("bench_"):]: fn for name, fn in sorted(globals().items()) if name.startswith("bench_")}
+
+
+class Benchmark:
+    """Minimal stand-in for pytest-benchmark's fixture: times ``fn(*args)`` per call."""
+
+    def __init__(self, repeat=5, min_time=0.2):
+        self.repeat = repeat
+        self.min_time = min_time
+        self.stats = None
+
+    def __call__(self, fn, *args, **kwargs):
+        timer = timeit.Timer(lambda: fn(*args, **kwargs))
+        number, elapsed = timer.autorange()
+        while elapsed < self.min_time:
+            number *= 2
+            elapsed = timer.timeit(number)
+        runs = [elapsed / number] + [t / number for t in timer.repeat(self.repeat - 1, number)]
+        self.stats = {
+            "min_us": round(min(runs) * 1e6, 3),
+            "median_us": round(statistics.median(runs) * 1e6, 3),
+            "peak_kib": round(self.peak_memory(fn, *args, **kwargs) / 1024, 1),
+            "rounds": self.repeat,
+            "iterations": number,
+        }
+
+    @staticmethod
+    def peak_memory(fn, *args, **kwargs):
+        """Bytes allocated at the high-water mark of a single call."""
+        tracemalloc.start()
+        try:
+            fn(*args, **kwargs)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run micro-benchmarks for app hot paths")
+    parser.add_argument("-k", dest="keyword", default="", help="only run benchmarks containing this text")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {BASELINE_PATH}")
+    parser.add_argument("--baseline", help="baseline file to compare against (default: saved baseline or last run)")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--label", default="run")
+    args = parser.parse_args()
+
+    metrics = {}
+    print(f"{'benchmark':<32} {'min us':>10} {'median us':>10} {'peak KiB':>10} {'iterations':>11}")
+    for name, fn in BENCHMARKS.items():
+        if args.keyword not in name:
+            continue
+        bench = Benchmark()
+        fn(bench)
+        metrics[name] = bench.stats["median_us"]
+        metrics[f"{name}.peak_kib"] = bench.stats["peak_kib"]
+        print(f"{name:<32} {bench.stats['min_us']:>10.2f} {bench.stats['median_us']:>10.2f} "
+              f"{bench.stats['peak_kib']:>10.1f} {bench.stats['iterations']:>11}")
+
+    if args.save_baseline:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({"kind": "micro", "label": "baseline", "metrics": metrics}, f, indent=2)
+        print(f"\nSaved baseline to {BASELINE_PATH}")
+        return 0
+
+    path = save_result("micro", args.label, {"metrics": metrics})
+    if args.baseline or os.path.exists(BASELINE_PATH):
+        with open(args.baseline or BASELINE_PATH) as f:
+            baseline = json.load(f)
+        baseline_name = os.path.basename(args.baseline or BASELINE_PATH)
+    else:
+        baseline = load_previous("micro", exclude=path)
+        baseline_name = os.path.basename(baseline["path"]) if baseline else None
+
+    if baseline:
+        rows = compare(metrics, baseline["metrics"], {name: "lower" for name in metrics}, args.threshold)
+        if print_comparison(rows, baseline_name):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
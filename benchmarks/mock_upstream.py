@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Local mock of the Alpha Vantage, NewsAPI and Finnhub endpoints used by app.py
+
+Serves GLOBAL_QUOTE, /v2/everything and Finnhub /api/v1/quote responses with
+configurable latency, error and throttle profiles, and counts every call so
+benchmarks can report upstream usage. Point the app at it with
+ALPHA_VANTAGE_BASE_URL, NEWS_API_BASE_URL and FINNHUB_BASE_URL.
+
+Usage:
+    python -m benchmarks.mock_upstream --profile realistic --port 9100
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+PROFILES = {
+    "fast": {"latency_ms": 10, "jitter_ms": 5, "error_rate": 0.0, "throttle_rate": 0.0, "calls_per_minute": 0},
+    "realistic": {"latency_ms": 250, "jitter_ms": 150, "error_rate": 0.01, "throttle_rate": 0.0, "calls_per_minute": 0},
+    "slow": {"latency_ms": 1500, "jitter_ms": 1000, "error_rate": 0.02, "throttle_rate": 0.0, "calls_per_minute": 0},
+    "flaky": {"latency_ms": 250, "jitter_ms": 100, "error_rate": 0.15, "throttle_rate": 0.0, "calls_per_minute": 0},
+    "throttled": {"latency_ms": 100, "jitter_ms": 50, "error_rate": 0.0, "throttle_rate": 0.05, "calls_per_minute": 75},
+}
+
+# A new mock article is "published" for every query term this often
+NEWS_INTERVAL_SECONDS = 300
+
+
+class MockUpstream:
+    """Threaded HTTP server emulating the upstream APIs under a given profile."""
+
+    def __init__(self, profile="fast", host="127.0.0.1", port=0, **overrides):
+        self.profile = dict(PROFILES[profile] if isinstance(profile, str) else profile)
+        self.profile.update({k: v for k, v in overrides.items() if v is not None})
+        self._lock = threading.Lock()
+        self.reset()
+
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                upstream._handle(self)
+
+            def do_POST(self):
+                upstream._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        with self._lock:
+            self._stats = {
+                provider: {"calls": 0, "errors": 0, "throttled": 0, "bytes": 0}
+                for provider in ("alpha_vantage", "news_api", "finnhub")
+            }
+            self._call_times = {"alpha_vantage": {}, "news_api": {}, "finnhub": {}}
+
+    def stats(self):
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    def _record(self, provider, field, size=0):
+        with self._lock:
+            self._stats[provider][field] += 1
+            self._stats[provider]["bytes"] += size
+
+    def _rate_limited(self, provider, api_key):
+        # Like the real APIs, the per-minute limit applies to each key separately
+        limit = self.profile.get("calls_per_minute") or 0
+        if not limit:
+            return False
+        now = time.time()
+        with self._lock:
+            calls = self._call_times[provider]
+            recent = [t for t in calls.get(api_key, []) if now - t < 60]
+            recent.append(now)
+            calls[api_key] = recent
+            return len(recent) > limit
+
+    def _handle(self, handler):
+        parsed = urlparse(handler.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+        if parsed.path == "/__stats":
+            return self._send(handler, 200, self.stats())
+        if parsed.path == "/__reset":
+            self.reset()
+            return self._send(handler, 200, {"status": "ok"})
+
+        if parsed.path == "/query":
+            provider = "alpha_vantage"
+        elif parsed.path == "/v2/everything":
+            provider = "news_api"
+        elif parsed.path == "/api/v1/quote":
+            provider = "finnhub"
+        else:
+            return self._send(handler, 404, {"error": "not found"})
+
+        latency = max(0.0, random.gauss(self.profile["latency_ms"], self.profile["jitter_ms"])) / 1000
+        time.sleep(latency)
+
+        if random.random() < self.profile["error_rate"]:
+            return self._send(handler, 500, {"error": "mock upstream failure"}, (provider, "errors"))
+
+        api_key = params.get("apikey") or params.get("apiKey") or params.get("token")
+        if random.random() < self.profile["throttle_rate"] or self._rate_limited(provider, api_key):
+            if provider == "alpha_vantage":
+                status, body = 200, {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}
+            elif provider == "finnhub":
+                status, body = 429, {"error": "API limit reached. Please try again later."}
+            else:
+                status, body = 429, {"status": "error", "code": "rateLimited", "message": "You have made too many requests recently."}
+            return self._send(handler, status, body, (provider, "throttled"))
+
+        if provider == "alpha_vantage":
+            body = self._quote(params)
+        elif provider == "finnhub":
+            body = self._finnhub_quote(params)
+        else:
+            body = self._news(params)
+        self._send(handler, 200, body, (provider, "calls"))
+
+    def _send(self, handler, status, body, record=None):
+        """Write a JSON response; ``record`` is the (provider, field) to count it under.
+
+        The call is counted before the response goes out, so a client reading
+        the stats right after its response always sees it.
+        """
+        payload = json.dumps(body).encode()
+        if record:
+            self._record(*record, len(payload))
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+        return len(payload)
+
+    def _quote(self, params):
+        symbol = params.get("symbol", "").upper()
+        seed = zlib.crc32(symbol.encode())
+        base = 10 + seed % 490
+        minute = int(time.time() // 60)
+        price = base * (1 + 0.01 * ((minute * 7 + seed) % 21 - 10) / 10)
+        change = price - base
+        return {
+            "Global Quote": {
+                "01. symbol": symbol,
+                "02. open": f"{base:.4f}",
+                "05. price": f"{price:.4f}",
+                "06. volume": str(100000 + seed % 9000000),
+                "07. latest trading day": time.strftime("%Y-%m-%d"),
+                "08. previous close": f"{base:.4f}",
+                "09. change": f"{change:.4f}",
+                "10. change percent": f"{change / base * 100:.4f}%"
+            }
+        }
+
+    def _finnhub_quote(self, params):
+        quote = self._quote(params)["Global Quote"]
+        return {
+            "c": float(quote["05. price"]),
+            "d": float(quote["09. change"]),
+            "dp": float(quote["10. change percent"].rstrip("%")),
+            "o": float(quote["02. open"]),
+            "pc": float(quote["08. previous close"]),
+            "t": int(time.time())
+        }
+
+    def _news(self, params):
+        query = params.get("q", "")
+        head = query.split(")")[0].lstrip("(")
+        terms = [t.strip().strip('"') for t in re.split(r"\s+OR\s+", head) if t.strip()] or ["markets"]
+        page_size = int(params.get("pageSize", 10))
+        since = params.get("from")
+
+        now_slot = int(time.time() // NEWS_INTERVAL_SECONDS)
+        articles = []
+        for k in range(page_size):
+            term = terms[k % len(terms)]
+            slot = now_slot - k // len(terms)
+            published = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(slot * NEWS_INTERVAL_SECONDS))
+            if since and published < since:
+                break
+            articles.append({
+                "source": {"id": None, "name": "Mock Wire"},
+                "author": "Mock Reporter",
+                "title": f"{term} shares move as markets react (update {slot})",
+                "description": f"Mock coverage of {term} stock, company earnings and market news.",
+                "url": f"https://news.example.com/{term.lower().replace(' ', '-')}/{slot}",
+                "urlToImage": None,
+                "publishedAt": published,
+                "content": "Lorem ipsum " * 40
+            })
+        return {"status": "ok", "totalResults": len(articles), "articles": articles}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Alpha Vantage/NewsAPI upstream")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--jitter-ms", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--throttle-rate", type=float)
+    parser.add_argument("--calls-per-minute", type=int)
+    args = parser.parse_args()
+
+    mock = MockUpstream(args.profile, args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                        calls_per_minute=args.calls_per_minute)
+    print(f"Mock upstream ({args.profile}) listening on {mock.url}")
+    print(f"  ALPHA_VANTAGE_BASE_URL={mock.url}")
+    print(f"  NEWS_API_BASE_URL={mock.url}")
+    print(f"  FINNHUB_BASE_URL={mock.url}")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
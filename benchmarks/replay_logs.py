@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Replay production traffic from HAProxy/nginx access logs
+
+Extracts /get_stock_data, /api/stock/<symbol> and /api/news* requests from
+an access log (HAProxy ``option httplog`` or nginx combined, optionally with
+``$request_time`` appended as in nginx.conf) and replays them against a test
+deployment with their original spacing, compressed by ``--speed``. Requests
+are dispatched open-loop, so a slow target builds a backlog exactly as it
+would under the real arrival rate. Reports latency distributions per
+endpoint group and cache hit ratios from the app's X-Cache header.
+
+Access logs do not contain POST bodies, so the symbols for /get_stock_data
+requests are drawn from the symbol popularity observed in the same log.
+
+Usage:
+    python -m benchmarks.replay_logs /var/log/haproxy.log --target http://staging:8080
+    python -m benchmarks.replay_logs access.log --target http://staging:8080 --speed 10
+    python -m benchmarks.replay_logs access.log --dry-run
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit, unquote
+
+import requests
+
+from benchmarks.results import summarize_latencies, save_result, load_previous, compare, print_comparison
+
+GROUPS = ("get_stock_data", "api_stock", "api_news")
+CACHE_STATES = ("HIT", "MISS", "PARTIAL")
+
+# 10.0.1.2:33317 [06/Feb/2009:12:14:14.655] fe be/srv 10/0/30/69/109 200 2750 - - ---- 1/1/1/1/0 0/0 {..} {..} "GET / HTTP/1.1"
+HAPROXY_PATTERN = re.compile(
+    r'\[(?P<time>\d{2}/\w{3}/\d{4}:\d{2}:\d{2}:\d{2}(?:\.\d+)?)\] \S+ \S+ '
+    r'-?\d+/-?\d+/-?\d+/(?P<tr>-?\d+)/\+?(?P<ta>-?\d+) (?P<status>-?\d+) \+?\d+ \S+ \S+ \S+ \S+ \S+'
+    r'(?P<captures>(?: \{[^}]*\})*) "(?P<method>[A-Z]+) (?P<path>\S+)'
+)
+
+# 127.0.0.1 - - [10/Oct/2000:13:55:36 -0700] "GET / HTTP/1.1" 200 2326 "-" "agent" 0.012 "HIT"
+NGINX_PATTERN = re.compile(
+    r'\[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+)[^"]*" (?P<status>\d{3}) \S+ "[^"]*" "[^"]*"'
+    r'(?: (?P<request_time>\d+(?:\.\d+)?))?(?: "(?P<cache>[^"]*)")?'
+)
+
+TIME_FORMATS = ("%d/%b/%Y:%H:%M:%S.%f", "%d/%b/%Y:%H:%M:%S %z", "%d/%b/%Y:%H:%M:%S")
+
+
+def parse_time(value):
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def classify(path):
+    """Return (group, symbol) for a replayable request path, or (None, None)."""
+    path = unquote(urlsplit(path).path).rstrip("/")
+    if path == "/get_stock_data":
+        return "get_stock_data", None
+    if path.startswith("/api/stock/"):
+        return "api_stock", path[len("/api/stock/"):].upper() or None
+    if path == "/api/news" or path.startswith("/api/news/"):
+        rest = path[len("/api/news/"):] if path != "/api/news" else ""
+        return "api_news", rest.upper() if rest and rest != "search" else None
+    return None, None
+
+
+def parse_line(line):
+    """Parse one access log line into a request dict, or None when it is not replayable.
+
+    Latency is HAProxy's total active time (Ta) or nginx's $request_time, in ms.
+    """
+    match = HAPROXY_PATTERN.search(line)
+    if match:
+        captures = [field for block in re.findall(r"\{([^}]*)\}", match.group("captures"))
+                    for field in block.split("|")]
+        cache_state = next((c.upper() for c in captures if c.upper() in CACHE_STATES), None)
+        latency = int(match.group("ta"))
+        latency_ms = float(latency) if latency >= 0 else None
+    else:
+        match = NGINX_PATTERN.search(line)
+        if not match:
+            return None
+        cache_state = (match.group("cache") or "").upper() or None
+        request_time = match.group("request_time")
+        latency_ms = float(request_time) * 1000 if request_time else None
+
+    group, symbol = classify(match.group("path"))
+    timestamp = parse_time(match.group("time"))
+    if not group or timestamp is None:
+        return None
+    return {
+        "time": timestamp,
+        "method": match.group("method"),
+        "path": match.group("path"),
+        "group": group,
+        "symbol": symbol,
+        "status": int(match.group("status")),
+        "latency_ms": latency_ms,
+        "cache": cache_state if cache_state in CACHE_STATES else None,
+    }
+
+
+def read_log(path, limit=None):
+    entries = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            entry = parse_line(line)
+            if entry:
+                entries.append(entry)
+                if limit and len(entries) >= limit:
+                    break
+    entries.sort(key=lambda e: e["time"])
+    return entries
+
+
+def symbol_popularity(entries):
+    """(symbols, weights) from the symbols requested via /api/stock and /api/news/<symbol>."""
+    counts = Counter(e["symbol"] for e in entries if e["symbol"])
+    if not counts:
+        from benchmarks.load_test import popular_symbols
+        return popular_symbols()
+    symbols, weights = zip(*counts.most_common())
+    return list(symbols), list(weights)
+
+
+def build_plan(entries, speed=1.0, seed=0):
+    """Turn parsed entries into (offset_seconds, group, method, path, body) tuples.
+
+    Offsets keep the original inter-arrival times divided by ``speed``.
+    /get_stock_data bodies are synthesized from the observed symbol popularity.
+    """
+    if not entries:
+        return []
+    rng = random.Random(seed)
+    symbols, weights = symbol_popularity(entries)
+    start = entries[0]["time"]
+    plan = []
+    for entry in entries:
+        body = None
+        if entry["group"] == "get_stock_data":
+            chosen = dict.fromkeys(rng.choices(symbols, weights=weights, k=rng.randint(1, 5)))
+            body = {"symbols": ",".join(chosen)}
+        plan.append(((entry["time"] - start) / speed, entry["group"], entry["method"], entry["path"], body))
+    return plan
+
+
+def replay(base_url, plan, max_in_flight=64):
+    """Dispatch ``plan`` open-loop and return samples of (group, status, latency_ms, cache, lag_ms)."""
+    samples = []
+    lock = threading.Lock()
+    local = threading.local()
+
+    def send(group, method, path, body, scheduled):
+        if not hasattr(local, "http"):
+            local.http = requests.Session()
+        lag_ms = (time.perf_counter() - scheduled) * 1000
+        start = time.perf_counter()
+        try:
+            response = local.http.request(method, base_url + path, json=body, timeout=60)
+            status, cache_state = response.status_code, response.headers.get("X-Cache")
+        except requests.RequestException:
+            status, cache_state = 0, None
+        latency_ms = (time.perf_counter() - start) * 1000
+        with lock:
+            samples.append((group, status, latency_ms, cache_state, lag_ms))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for offset, group, method, path, body in plan:
+            scheduled = started + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, group, method, path, body, scheduled)
+    return samples, time.perf_counter() - started
+
+
+def cache_ratios(states):
+    counted = [s for s in states if s in CACHE_STATES]
+    if not counted:
+        return {"hit_ratio": None, "partial_ratio": None}
+    return {
+        "hit_ratio": round(counted.count("HIT") / len(counted), 3),
+        "partial_ratio": round(counted.count("PARTIAL") / len(counted), 3),
+    }
+
+
+def summarize_log(entries):
+    """Per-group request counts, original latencies and cache ratios as seen in the log."""
+    summary = {}
+    for group in [*GROUPS, "all"]:
+        rows = entries if group == "all" else [e for e in entries if e["group"] == group]
+        stats = summarize_latencies([e["latency_ms"] for e in rows if e["latency_ms"] is not None])
+        stats["count"] = len(rows)
+        stats.update(cache_ratios([e["cache"] for e in rows]))
+        summary[group] = stats
+    return summary
+
+
+def build_report(samples, elapsed, entries):
+    report = {"endpoints": {}, "original": summarize_log(entries)}
+    for group in [*GROUPS, "all"]:
+        rows = samples if group == "all" else [s for s in samples if s[0] == group]
+        summary = summarize_latencies([s[2] for s in rows])
+        summary["rps"] = round(len(rows) / elapsed, 2) if elapsed else 0.0
+        summary["errors"] = sum(1 for s in rows if s[1] == 0 or s[1] >= 500)
+        summary.update(cache_ratios([s[3] for s in rows]))
+        report["endpoints"][group] = summary
+    report["dispatch_lag_p99_ms"] = summarize_latencies([s[4] for s in samples])["p99_ms"]
+    return report
+
+
+def flatten(report):
+    flat = {}
+    for group, summary in report["endpoints"].items():
+        for key in ("p50_ms", "p95_ms", "p99_ms", "hit_ratio"):
+            if summary[key] is not None:
+                flat[f"{group}.{key}"] = summary[key]
+    return flat
+
+
+def _ratio(value):
+    return f"{value:.1%}" if value is not None else "-"
+
+
+def print_mix(entries, speed):
+    summary = summarize_log(entries)
+    span = entries[-1]["time"] - entries[0]["time"] if entries else 0.0
+    print(f"{len(entries)} replayable requests spanning {span:.0f}s (replay at {speed}x: {span / speed:.0f}s)")
+    print(f"{'endpoint':<16} {'requests':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'hit':>7}")
+    for group, s in summary.items():
+        print(f"{group:<16} {s['count']:>9} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} "
+              f"{_ratio(s['hit_ratio']):>7}")
+    top = Counter(e["symbol"] for e in entries if e["symbol"]).most_common(10)
+    if top:
+        print("Top symbols: " + ", ".join(f"{symbol} ({count})" for symbol, count in top))
+
+
+def print_report(report, elapsed):
+    print(f"\nReplay results over {elapsed:.1f}s")
+    print(f"{'endpoint':<16} {'requests':>9} {'rps':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'hit':>7} {'partial':>8} {'log p95':>9}")
+    for group, s in report["endpoints"].items():
+        original = report["original"][group]
+        print(f"{group:<16} {s['count']:>9} {s['rps']:>9.1f} {s['errors']:>7} {s['p50_ms']:>9.1f} "
+              f"{s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {_ratio(s['hit_ratio']):>7} "
+              f"{_ratio(s['partial_ratio']):>8} {original['p95_ms']:>9.1f}")
+    print(f"Dispatch lag p99: {report['dispatch_lag_p99_ms']:.1f} ms (high values mean the replayer fell behind)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay access-log traffic against a deployment")
+    parser.add_argument("log", help="HAProxy httplog or nginx access log")
+    parser.add_argument("--target", help="base URL of the deployment to replay against")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay N times faster than recorded")
+    parser.add_argument("--limit", type=int, help="only replay the first N matching requests")
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dry-run", action="store_true", help="only print the extracted request mix")
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    entries = read_log(args.log, args.limit)
+    if not entries:
+        print(f"No replayable requests found in {args.log}")
+        return 1
+    print_mix(entries, args.speed)
+    if args.dry_run:
+        return 0
+    if not args.target:
+        parser.error("--target is required unless --dry-run is given")
+
+    base_url = args.target.rstrip("/")
+    plan = build_plan(entries, args.speed, args.seed)
+    print(f"\nReplaying against {base_url}")
+    samples, elapsed = replay(base_url, plan, args.max_in_flight)
+    report = build_report(samples, elapsed, entries)
+    print_report(report, elapsed)
+
+    config = {"log": os.path.basename(args.log), "speed": args.speed, "limit": args.limit}
+    path = save_result("replay", args.label, {"config": config, "duration": elapsed, "report": report,
+                                              "metrics": flatten(report)})
+    print(f"\nSaved results to {path}")
+
+    previous = load_previous("replay", match=config, exclude=path)
+    if previous:
+        metrics = {name: ("higher" if name.endswith("hit_ratio") else "lower") for name in flatten(report)}
+        rows = compare(flatten(report), previous["metrics"], metrics, args.threshold)
+        regressed = print_comparison(rows, os.path.basename(previous["path"]))
+        if regressed and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
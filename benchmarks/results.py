@@ -0,0 +1,84 @@
+"""
+Result storage and regression comparison shared by the benchmark scripts
+"""
+
+import glob
+import json
+import math
+import os
+import time
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_latencies(latencies_ms):
+    return {
+        "count": len(latencies_ms),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms), 2) if latencies_ms else 0.0,
+    }
+
+
+def save_result(kind, label, data, results_dir=RESULTS_DIR):
+    """Write a result file ``<kind>-<timestamp>-<label>.json`` and return its path."""
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(results_dir, f"{kind}-{stamp}-{label}.json")
+    with open(path, "w") as f:
+        json.dump({"kind": kind, "label": label, "timestamp": stamp, **data}, f, indent=2)
+    return path
+
+
+def load_previous(kind, match=None, exclude=None, results_dir=RESULTS_DIR):
+    """Return the newest stored result of ``kind`` whose config matches ``match``."""
+    for path in sorted(glob.glob(os.path.join(results_dir, f"{kind}-*.json")), reverse=True):
+        if exclude and os.path.abspath(path) == os.path.abspath(exclude):
+            continue
+        with open(path) as f:
+            result = json.load(f)
+        config = result.get("config", {})
+        if not match or all(config.get(k) == v for k, v in match.items()):
+            result["path"] = path
+            return result
+    return None
+
+
+def compare(current, previous, metrics, threshold=0.10):
+    """Compare flat metric dicts and return rows of (name, old, new, change, regressed).
+
+    ``metrics`` maps metric name to direction: "lower" or "higher" is better.
+    """
+    rows = []
+    for name, better in metrics.items():
+        old, new = previous.get(name), current.get(name)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        regressed = change > threshold if better == "lower" else change < -threshold
+        rows.append((name, old, new, change, regressed))
+    return rows
+
+
+def print_comparison(rows, baseline_label):
+    if not rows:
+        print(f"No comparable metrics in baseline {baseline_label}")
+        return False
+    print(f"\nComparison against {baseline_label}")
+    print(f"{'metric':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    regressed_any = False
+    for name, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        regressed_any = regressed_any or regressed
+        print(f"{name:<40} {old:>12.2f} {new:>12.2f} {change:>+8.1%}{flag}")
+    return regressed_any
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: module import, app construction, first request and gunicorn boot
+
+Each measurement runs in a fresh interpreter so import caches do not hide
+regressions. Gunicorn boot is timed from launch until the first request is
+answered, with and without ``--preload``.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --workers 4 --skip-gunicorn
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.load_test import ROOT_DIR, free_port, start_app_server
+from benchmarks.results import save_result, load_previous, compare, print_comparison
+
+# Runs inside a fresh interpreter and prints the phase timings as JSON
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+import app as module
+t1 = time.perf_counter()
+flask_app = module.create_app({"TESTING": True})
+t2 = time.perf_counter()
+client = flask_app.test_client()
+client.get("/api/symbols?prefix=A")
+t3 = time.perf_counter()
+client.get("/api/symbols?prefix=M")
+t4 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "warm_request_ms": (t4 - t3) * 1000,
+}))
+"""
+
+
+def probe_env():
+    env = dict(os.environ)
+    env.update({
+        "ALPHA_VANTAGE_API_KEY": "bench",
+        "NEWS_API_KEY": "bench",
+        "DATABASE_PATH": os.path.join(tempfile.mkdtemp(prefix="stock-startup-"), "startup.db"),
+    })
+    return env
+
+
+def measure_phases(runs):
+    """Median of each in-process phase over ``runs`` fresh interpreters."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT_DIR, env=probe_env(),
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {name: round(statistics.median(s[name] for s in samples), 2) for name in samples[0]}
+
+
+def measure_boot(workers, preload, runs):
+    """Median milliseconds from launching gunicorn until it answers a request."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        server = start_app_server(free_port(), None, workers, extra_args=["--preload"] if preload else ())
+        timings.append((time.perf_counter() - started) * 1000)
+        server.terminate()
+        server.wait(timeout=10)
+    return round(statistics.median(timings), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app import, construction and worker boot time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--boot-runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--skip-gunicorn", action="store_true")
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    metrics = measure_phases(args.runs)
+    if not args.skip_gunicorn:
+        metrics["gunicorn_boot_ms"] = measure_boot(args.workers, False, args.boot_runs)
+        metrics["gunicorn_preload_boot_ms"] = measure_boot(args.workers, True, args.boot_runs)
+
+    print(f"{'phase':<28} {'median ms':>10}")
+    for name, value in metrics.items():
+        print(f"{name:<28} {value:>10.2f}")
+
+    config = {"workers": args.workers, "gunicorn": not args.skip_gunicorn}
+    path = save_result("startup", args.label, {"config": config, "metrics": metrics})
+    print(f"\nSaved results to {path}")
+
+    previous = load_previous("startup", match=config, exclude=path)
+    if previous:
+        rows = compare(metrics, previous["metrics"], {name: "lower" for name in metrics}, args.threshold)
+        if print_comparison(rows, os.path.basename(previous["path"])):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compare gunicorn worker profiles against the defaults in gunicorn.conf.py
+
+Runs the load test once per profile against the same mock upstream: sync
+workers at 2 x cores + 1, the gthread sizing derived from several I/O ratios
+(the default is marked), and gevent/uvicorn when installed. Every server is
+started with gunicorn.conf.py so preload, recycling and post-fork hooks are
+part of the measurement.
+
+Usage:
+    python -m benchmarks.worker_profiles --profile realistic --concurrency 32 --duration 20
+"""
+
+import argparse
+import importlib.util
+import os
+import runpy
+import sys
+
+from benchmarks.load_test import ROOT_DIR, popular_symbols, free_port, start_app_server, run_load, build_report
+from benchmarks.mock_upstream import MockUpstream, PROFILES
+from benchmarks.results import save_result
+
+CONFIG_PATH = os.path.join(ROOT_DIR, "gunicorn.conf.py")
+IO_RATIOS = (0.5, 0.75, 0.9, 0.95)
+
+
+def candidate_profiles(config, cores):
+    """Return (name, worker_class, workers, threads) tuples to benchmark."""
+    derive = config["derive_sizing"]
+    profiles = [("sync 2n+1", "sync", *derive("sync", cores, 0))]
+    for io_ratio in IO_RATIOS:
+        marker = " (default)" if io_ratio == config["DEFAULT_IO_RATIO"] else ""
+        profiles.append((f"gthread io={io_ratio}{marker}", "gthread", *derive("gthread", cores, io_ratio)))
+    if importlib.util.find_spec("gevent"):
+        profiles.append(("gevent", "gevent", *derive("gevent", cores, 0)))
+    if importlib.util.find_spec("uvicorn") and importlib.util.find_spec("asgiref"):
+        profiles.append(("uvicorn", "uvicorn", *derive("uvicorn", cores, 0)))
+    return profiles
+
+
+def run_profile(config, mock, worker_class, workers, threads, args, symbols, weights):
+    env = {"GUNICORN_WORKER_CLASS": worker_class, "GUNICORN_ACCESS_LOG": ""}
+    port = free_port()
+    server = start_app_server(port, mock.url, workers, config["WORKER_CLASSES"][worker_class], threads,
+                              extra_args=["-c", CONFIG_PATH], env=env,
+                              app_path="asgi:app" if worker_class == "uvicorn" else "app:app")
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        mock.reset()
+        samples, elapsed = run_load(base_url, args.concurrency, args.duration, symbols, weights)
+        return build_report(samples, elapsed, mock.stats())
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gunicorn worker classes and sizing")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--cores", type=int, help="size profiles for this many cores (default: this machine)")
+    parser.add_argument("--label", default="run")
+    args = parser.parse_args()
+
+    config = runpy.run_path(CONFIG_PATH)
+    cores = args.cores or config["available_cores"]()
+    symbols, weights = popular_symbols()
+
+    rows = []
+    mock = MockUpstream(args.profile).start()
+    try:
+        for name, worker_class, workers, threads in candidate_profiles(config, cores):
+            print(f"Running {name}: {workers} workers x {threads} threads")
+            report = run_profile(config, mock, worker_class, workers, threads, args, symbols, weights)
+            summary = report["endpoints"]["all"]
+            rows.append({"name": name, "worker_class": worker_class, "workers": workers, "threads": threads,
+                         "rps": summary["rps"], "p50_ms": summary["p50_ms"], "p95_ms": summary["p95_ms"],
+                         "p99_ms": summary["p99_ms"], "errors": summary["errors"]})
+    finally:
+        mock.stop()
+
+    print(f"\n{'profile':<26} {'workers':>8} {'threads':>8} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'errors':>7}")
+    for row in rows:
+        print(f"{row['name']:<26} {row['workers']:>8} {row['threads']:>8} {row['rps']:>9.1f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['errors']:>7}")
+
+    path = save_result("profiles", args.label, {
+        "config": {"profile": args.profile, "concurrency": args.concurrency, "cores": cores},
+        "profiles": rows,
+        "metrics": {f"{row['name']}.rps": row["rps"] for row in rows},
+    })
+    print(f"\nSaved results to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
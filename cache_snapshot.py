@@ -0,0 +1,111 @@
+"""
+Periodic snapshot of hot cache entries for warm restarts
+
+Quotes and news feeds written to the in-process cache are tracked with their
+expiry time. A background thread copies the most recently set, still-valid
+entries into the SQLite ``cache_snapshot`` table, and a newly started worker
+streams them back into its cache with their remaining TTL, so a deploy does
+not send the first wave of traffic to Alpha Vantage cold.
+
+Enable through the environment:
+    CACHE_SNAPSHOT_INTERVAL=60 CACHE_SNAPSHOT_MAX_ENTRIES=500
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheSnapshot:
+    """Tracks snapshot-worthy keys of a Flask-Caching ``cache`` bound to ``app``."""
+
+    def __init__(self, app, cache, store, interval=60, max_entries=500, default_timeout=300):
+        self.app = app
+        self.cache = cache
+        self.store = store
+        self.interval = interval
+        self.max_entries = max_entries
+        self.default_timeout = default_timeout
+        self._lock = threading.Lock()
+        # key -> (cached_at, expires_at), most recently set last
+        self._keys = OrderedDict()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def track(self, key, timeout=None):
+        now = time.time()
+        timeout = self.default_timeout if timeout is None else timeout
+        with self._lock:
+            self._keys[key] = (now, now + timeout)
+            self._keys.move_to_end(key)
+            while len(self._keys) > self.max_entries:
+                self._keys.popitem(last=False)
+
+    def write(self):
+        """Persist tracked entries that are still cached; returns the number written."""
+        now = time.time()
+        with self._lock:
+            tracked = [(key, times) for key, times in self._keys.items() if times[1] > now]
+        entries = []
+        with self.app.app_context():
+            for key, (cached_at, expires_at) in tracked:
+                value = self.cache.get(key)
+                if value is not None:
+                    entries.append((key, value, cached_at, expires_at))
+        if not entries:
+            return 0
+        return self.store.save_snapshot(entries)
+
+    def load(self):
+        """Stream still-valid snapshot entries into the cache with their remaining TTL."""
+        loaded = 0
+        with self.app.app_context():
+            for key, value, expires_at in self.store.iter_snapshot():
+                remaining = int(expires_at - time.time())
+                if remaining <= 0:
+                    continue
+                self.cache.set(key, value, timeout=remaining)
+                self.track(key, remaining)
+                loaded += 1
+                if loaded >= self.max_entries:
+                    break
+        return loaded
+
+    def start(self):
+        """Start the writer thread once per process (forked workers start their own)."""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive() and self._pid == os.getpid()):
+            return
+        self._pid = os.getpid()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-snapshot", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def after_fork(self):
+        """Reset locks and thread state copied from the parent process."""
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def stop(self):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread = None
+        self._write_logged()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._write_logged()
+
+    def _write_logged(self):
+        try:
+            written = self.write()
+            if written:
+                print(f"[DEBUG] Cache snapshot wrote {written} entries")
+        except Exception as e:
+            print(f"[ERROR] Cache snapshot failed: {e}")
@@ -0,0 +1,140 @@
+"""
+Record/replay transport for upstream HTTP calls
+
+Mounting a RecordingAdapter on the shared requests session captures every
+Alpha Vantage/NewsAPI exchange into a JSON-lines cassette (API keys
+redacted). A ReplayAdapter serves those exchanges back offline with their
+original latency, optionally scaled, so production traffic shapes can be
+reproduced without keys and caching strategies compared deterministically.
+
+Enable through the environment:
+    UPSTREAM_MODE=record UPSTREAM_CASSETTE=cassettes/prod.jsonl
+    UPSTREAM_MODE=replay UPSTREAM_CASSETTE=cassettes/prod.jsonl UPSTREAM_LATENCY_SCALE=0.5
+"""
+
+import io
+import json
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Credentials never reach the cassette
+SECRET_PARAMS = {"apikey", "token"}
+# Params that vary between runs (NewsAPI since-cursors) and are ignored when matching
+VOLATILE_PARAMS = {"from"}
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode when no recorded interaction matches a request."""
+
+
+def redact_url(url):
+    parts = urlsplit(url)
+    query = [(k, "REDACTED" if k.lower() in SECRET_PARAMS else v) for k, v in parse_qsl(parts.query, True)]
+    return parts._replace(query=urlencode(query)).geturl()
+
+
+def match_key(method, url):
+    """Key used to pair live requests with recorded ones: method, path and stable query params."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, True)
+                   if k.lower() not in SECRET_PARAMS and k not in VOLATILE_PARAMS)
+    return f"{method.upper()} {parts.path}?{urlencode(query)}"
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that appends each completed exchange to a cassette file."""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        body = response.content
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        interaction = {
+            "method": request.method,
+            "url": redact_url(request.url),
+            "status": response.status_code,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "application/json")},
+            "body": body.decode(response.encoding or "utf-8", errors="replace"),
+            "elapsed_ms": round(elapsed_ms, 2),
+            "recorded_at": time.time()
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(interaction) + "\n")
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adapter that answers requests from a cassette instead of the network.
+
+    Repeated requests for the same key cycle through the recorded responses in
+    order. ``latency_scale`` multiplies recorded latencies (0 disables sleeping).
+    """
+
+    def __init__(self, path, latency_scale=1.0):
+        super().__init__()
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._interactions = defaultdict(list)
+        self._positions = defaultdict(int)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    self._interactions[match_key(interaction["method"], interaction["url"])].append(interaction)
+
+    def __len__(self):
+        return sum(len(v) for v in self._interactions.values())
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = match_key(request.method, request.url)
+        with self._lock:
+            recorded = self._interactions.get(key)
+            if not recorded:
+                raise CassetteMiss(f"No recorded interaction for {key}", request=request)
+            interaction = recorded[self._positions[key] % len(recorded)]
+            self._positions[key] += 1
+
+        delay = interaction.get("elapsed_ms", 0) / 1000 * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+
+        body = interaction["body"].encode("utf-8")
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.headers = CaseInsensitiveDict(interaction.get("headers", {}))
+        response.encoding = "utf-8"
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        response.elapsed = timedelta(seconds=delay)
+        return response
+
+    def close(self):
+        pass
+
+
+def install(session, mode, path, latency_scale=1.0):
+    """Mount a record or replay adapter for every URL on ``session``."""
+    if mode == "record":
+        adapter = RecordingAdapter(path)
+    elif mode == "replay":
+        adapter = ReplayAdapter(path, latency_scale)
+    else:
+        raise ValueError(f"Unknown upstream mode: {mode}")
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
@@ -0,0 +1,93 @@
+"""
+Consistent-hash symbol ownership across backend nodes
+
+Each symbol is owned by one node, so its quote and news cache entries live in
+one place and the cluster-wide hit rate grows with node count instead of
+halving. The ring reproduces nginx's ``hash $key consistent`` (ketama over
+crc32, 160 points per node), so when nginx routes on the symbol it picks the
+same node the app would. Other balancers still work; non-owners forward.
+
+Configure through the environment, using the same host:port names as the
+balancer's server entries:
+    CLUSTER_NODES=web01:8080,web02:8080 CLUSTER_NODE_ID=web01:8080
+"""
+
+import bisect
+import os
+import struct
+import zlib
+
+POINTS_PER_NODE = 160
+
+# Marks requests already routed by a node so they are served locally
+FORWARDED_HEADER = "X-Cluster-Forwarded"
+
+
+def _host_port(node):
+    """Split like nginx does: a trailing ``:digits`` is the port."""
+    if node.lower().startswith("unix:"):
+        return node[5:], ""
+    host, sep, port = node.rpartition(":")
+    if sep and all("0" <= c <= "9" for c in port):
+        return host, port
+    return node, ""
+
+
+class HashRing:
+    """Sorted ring of (crc32 point, node) pairs searched with bisect."""
+
+    def __init__(self, nodes, points_per_node=POINTS_PER_NODE):
+        self.nodes = list(dict.fromkeys(nodes))
+        if not self.nodes:
+            raise ValueError("HashRing needs at least one node")
+
+        points = {}
+        for node in self.nodes:
+            host, port = _host_port(node)
+            base = host.encode() + b"\0" + port.encode()
+            prev = 0
+            for _ in range(points_per_node):
+                point = zlib.crc32(base + struct.pack("<I", prev))
+                points.setdefault(point, node)
+                prev = point
+
+        self._points = sorted(points)
+        self._owners = [points[p] for p in self._points]
+
+    def node_for(self, key):
+        i = bisect.bisect_left(self._points, zlib.crc32(key.encode()))
+        return self._owners[i % len(self._points)]
+
+    def group(self, keys):
+        """Return {node: [keys]} keeping the input order within each node."""
+        groups = {}
+        for key in keys:
+            groups.setdefault(self.node_for(key), []).append(key)
+        return groups
+
+
+class Cluster:
+    """This node's view of the ring."""
+
+    def __init__(self, nodes, node_id):
+        self.ring = HashRing(nodes)
+        if node_id not in self.ring.nodes:
+            raise ValueError(f"CLUSTER_NODE_ID {node_id!r} is not in CLUSTER_NODES")
+        self.node_id = node_id
+
+    @classmethod
+    def from_env(cls):
+        """Return a Cluster from CLUSTER_NODES/CLUSTER_NODE_ID, or None for a single node."""
+        nodes = [n.strip() for n in os.getenv("CLUSTER_NODES", "").split(",") if n.strip()]
+        if len(nodes) < 2:
+            return None
+        return cls(nodes, os.getenv("CLUSTER_NODE_ID", "").strip())
+
+    def owner(self, symbol):
+        return self.ring.node_for(symbol)
+
+    def is_local(self, symbol):
+        return self.owner(symbol) == self.node_id
+
+    def url(self, node, path):
+        return f"http://{node}{path}"
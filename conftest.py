@@ -0,0 +1,19 @@
+"""
+Test session setup: keep the suite's SQLite writes out of the working tree
+
+app.py reads DATABASE_PATH at import and builds the default app (with its
+stores) while test modules are collected, so the path is set here, before any
+of them import it. Quote history, API key usage, stored articles and the
+maintenance tables all land in a throwaway directory.
+"""
+
+import os
+import shutil
+import tempfile
+
+_tmpdir = tempfile.mkdtemp(prefix="stock-market-tests-")
+os.environ["DATABASE_PATH"] = os.path.join(_tmpdir, "stock_cache.db")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_tmpdir, ignore_errors=True)
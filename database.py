@@ -1,6 +1,19 @@
 import sqlite3
 import json
+import hashlib
+import re
+import time
+from contextlib import closing
 from datetime import datetime, timedelta
+from market_calendar import NYSE, cache_ttl, calendar_for
+
+
+def _fresh(timestamp, calendar, max_age, closed_max_age=None):
+    """Whether a row written at ``timestamp`` (naive local time) is within its market-hours TTL."""
+    written = datetime.fromisoformat(timestamp).astimezone()
+    ttl = cache_ttl(calendar, max_age, closed_max_age, now=written)
+    return datetime.now().astimezone() - written < timedelta(seconds=ttl)
+
 
 class StockDataCache:
     def __init__(self, db_path='stock_cache.db'):
@@ -23,18 +36,28 @@ class StockDataCache:
                     timestamp DATETIME
                 )
             ''')
+            # Retention deletes by age (see MaintenanceStore)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_stock_cache_timestamp ON stock_cache (timestamp)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_news_cache_timestamp ON news_cache (timestamp)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_snapshot (
+                    key TEXT PRIMARY KEY,
+                    data TEXT,
+                    cached_at REAL,
+                    expires_at REAL
+                )
+            ''')
     
-    def get_stock_data(self, symbol):
+    def get_stock_data(self, symbol, max_age=300):
+        """Cached quote, fresh for ``max_age`` seconds while its market trades and until the next open otherwise."""
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.execute(
                 'SELECT data, timestamp FROM stock_cache WHERE symbol = ?',
                 (symbol,)
             )
             row = cursor.fetchone()
-            if row:
-                timestamp = datetime.fromisoformat(row[1])
-                if datetime.now() - timestamp < timedelta(minutes=5):
-                    return json.loads(row[0])
+            if row and _fresh(row[1], calendar_for(symbol), max_age):
+                return json.loads(row[0])
         return None
     
     def cache_stock_data(self, symbol, data):
@@ -44,17 +67,16 @@ class StockDataCache:
                 (symbol, json.dumps(data), datetime.now().isoformat())
             )
     
-    def get_news_data(self, query):
+    def get_news_data(self, query, max_age=900, closed_max_age=3600):
+        """Cached news, kept up to ``closed_max_age`` seconds while US markets are closed."""
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.execute(
                 'SELECT data, timestamp FROM news_cache WHERE query = ?',
                 (query,)
             )
             row = cursor.fetchone()
-            if row:
-                timestamp = datetime.fromisoformat(row[1])
-                if datetime.now() - timestamp < timedelta(minutes=15):
-                    return json.loads(row[0])
+            if row and _fresh(row[1], NYSE, max_age, closed_max_age):
+                return json.loads(row[0])
         return None
     
     def cache_news_data(self, query, data):
@@ -62,4 +84,679 @@ class StockDataCache:
             conn.execute(
                 'INSERT OR REPLACE INTO news_cache (query, data, timestamp) VALUES (?, ?, ?)',
                 (query, json.dumps(data), datetime.now().isoformat())
-            )
\ No newline at end of file
+            )
+
+    def save_snapshot(self, entries):
+        """Upsert (key, value, cached_at, expires_at) cache entries and drop expired ones."""
+        rows = [(key, json.dumps(value), cached_at, expires_at) for key, value, cached_at, expires_at in entries]
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO cache_snapshot (key, data, cached_at, expires_at) VALUES (?, ?, ?, ?)',
+                rows
+            )
+            conn.execute('DELETE FROM cache_snapshot WHERE expires_at <= ?', (time.time(),))
+        return len(rows)
+
+    def iter_snapshot(self, now=None, batch_size=500):
+        """Yield still-valid (key, value, expires_at) entries, streamed in batches."""
+        now = time.time() if now is None else now
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            cursor = conn.execute(
+                'SELECT key, data, expires_at FROM cache_snapshot WHERE expires_at > ? ORDER BY cached_at DESC',
+                (now,)
+            )
+            while rows := cursor.fetchmany(batch_size):
+                for key, data, expires_at in rows:
+                    yield key, json.loads(data), expires_at
+
+
+def _iter_pages(db_path, sql, params, key_columns, batch_size):
+    """Yield the rows of ``sql`` ``batch_size`` at a time, one short read per page.
+
+    ``sql`` starts its WHERE clause with ``{after}``, orders by
+    ``key_columns`` and selects them first; each page resumes after the
+    previous page's last key. No read transaction stays open between pages,
+    so a slow consumer never holds up WAL checkpoints.
+    """
+    last = None
+    after = f"({', '.join(key_columns)}) > ({', '.join('?' * len(key_columns))})"
+    while True:
+        with closing(sqlite3.connect(db_path)) as conn:
+            rows = conn.execute(sql.format(after=after if last else '1'),
+                                [*(last or ()), *params, batch_size]).fetchall()
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        last = rows[-1][:len(key_columns)]
+
+
+def _range_filter(column, start=None, end=None, symbols=None, symbol_column='symbol'):
+    """SQL conditions (each prefixed with AND) and params for a symbol list and [start, end)."""
+    where, params = '', []
+    if symbols:
+        where += f' AND {symbol_column} IN ({",".join("?" * len(symbols))})'
+        params += list(symbols)
+    if start is not None:
+        where += f' AND {column} >= ?'
+        params.append(start)
+    if end is not None:
+        where += f' AND {column} < ?'
+        params.append(end)
+    return where, params
+
+
+def _normalize_url(url):
+    url = (url or '').strip()
+    if '://' in url:
+        scheme, rest = url.split('://', 1)
+        host, _, path = rest.partition('/')
+        url = f"{scheme.lower()}://{host.lower()}/{path}"
+    return url.rstrip('/')
+
+
+_EMPTY_URL_HASH = hashlib.sha1(b'').hexdigest()
+
+
+def _normalize_text(text):
+    return ' '.join(re.findall(r'\w+', (text or '').lower()))
+
+
+class NewsArticleStore:
+    """Persistent, de-duplicated store of fetched news articles with full-text search."""
+
+    def __init__(self, db_path='stock_cache.db'):
+        self.db_path = db_path
+        self.fts_enabled = False
+        self.init_db()
+
+    def init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS news_articles (
+                    id INTEGER PRIMARY KEY,
+                    url_hash TEXT UNIQUE,
+                    content_hash TEXT UNIQUE,
+                    url TEXT,
+                    title TEXT,
+                    description TEXT,
+                    published_at TEXT,
+                    fetched_at DATETIME
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_news_articles_published ON news_articles (published_at)')
+            # Older rows stored the hash of an empty URL for articles without one
+            conn.execute("UPDATE news_articles SET url_hash = NULL WHERE url_hash = ?", (_EMPTY_URL_HASH,))
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS news_article_symbols (
+                    symbol TEXT,
+                    article_id INTEGER,
+                    PRIMARY KEY (symbol, article_id)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS news_feed_articles (
+                    feed TEXT,
+                    article_id INTEGER,
+                    PRIMARY KEY (feed, article_id)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS news_ingest_cursors (
+                    feed TEXT PRIMARY KEY,
+                    high_water TEXT,
+                    last_run DATETIME
+                )
+            ''')
+            try:
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS news_articles_fts
+                    USING fts5(title, description, content='news_articles', content_rowid='id')
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS news_articles_ai AFTER INSERT ON news_articles BEGIN
+                        INSERT INTO news_articles_fts (rowid, title, description)
+                        VALUES (new.id, new.title, new.description);
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS news_articles_ad AFTER DELETE ON news_articles BEGIN
+                        INSERT INTO news_articles_fts (news_articles_fts, rowid, title, description)
+                        VALUES ('delete', old.id, old.title, old.description);
+                    END
+                ''')
+                self.fts_enabled = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5; search() falls back to LIKE scans
+                self.fts_enabled = False
+
+    def save_articles(self, articles, symbols=(), feed=None):
+        """Store articles, skipping ones already seen by URL or by title/description.
+
+        Articles are linked to each of ``symbols`` and to ``feed`` when given.
+
+        Returns the number of newly stored articles.
+        """
+        added = 0
+        now = datetime.now().isoformat()
+        with sqlite3.connect(self.db_path) as conn:
+            for article in articles:
+                title = article.get("title")
+                if not title or title == "[Removed]":
+                    continue
+                # NULL when there is no URL: UNIQUE ignores NULLs, so such articles dedupe on content only
+                url = _normalize_url(article.get("url"))
+                url_hash = hashlib.sha1(url.encode()).hexdigest() if url else None
+                content_hash = hashlib.sha1(
+                    f"{_normalize_text(title)}|{_normalize_text(article.get('description'))}".encode()
+                ).hexdigest()
+
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO news_articles '
+                    '(url_hash, content_hash, url, title, description, published_at, fetched_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (url_hash, content_hash, article.get("url"), title, article.get("description"),
+                     article.get("publishedAt"), now)
+                )
+                if cursor.rowcount:
+                    added += 1
+                    article_id = cursor.lastrowid
+                else:
+                    article_id = conn.execute(
+                        'SELECT id FROM news_articles WHERE content_hash = ? OR url_hash = ?',
+                        (content_hash, url_hash)
+                    ).fetchone()[0]
+
+                conn.executemany(
+                    'INSERT OR IGNORE INTO news_article_symbols (symbol, article_id) VALUES (?, ?)',
+                    [(symbol, article_id) for symbol in symbols]
+                )
+                if feed:
+                    conn.execute(
+                        'INSERT OR IGNORE INTO news_feed_articles (feed, article_id) VALUES (?, ?)',
+                        (feed, article_id)
+                    )
+        return added
+
+    def get_cursor(self, feed):
+        """Return the newest publishedAt ingested for ``feed``, or None if never ingested."""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                'SELECT high_water FROM news_ingest_cursors WHERE feed = ?',
+                (feed,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, feed, high_water):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO news_ingest_cursors (feed, high_water, last_run) VALUES (?, ?, ?)',
+                (feed, high_water, datetime.now().isoformat())
+            )
+
+    def iter_articles(self, symbols=None, start=None, end=None, batch_size=1000):
+        """Yield (id, published_at, title, description, url) in id order.
+
+        ``start``/``end`` bound publishedAt (ISO strings, end exclusive);
+        ``symbols`` keeps articles linked to any of them, each once.
+        """
+        where, params = _range_filter('a.published_at', start, end)
+        if symbols:
+            where += (' AND EXISTS (SELECT 1 FROM news_article_symbols s WHERE s.article_id = a.id '
+                      f'AND s.symbol IN ({",".join("?" * len(symbols))}))')
+            params += list(symbols)
+        return _iter_pages(
+            self.db_path,
+            'SELECT a.id, a.published_at, a.title, a.description, a.url FROM news_articles a '
+            'WHERE {after}' + where + ' ORDER BY a.id LIMIT ?',
+            params, ['a.id'], batch_size
+        )
+
+    def latest(self, symbol=None, feed=None, limit=10):
+        return self.search('', symbol=symbol, feed=feed, limit=limit)
+
+    def search(self, query, symbol=None, limit=10, feed=None):
+        """Full-text search over stored titles/descriptions, optionally limited to a symbol or feed."""
+        terms = re.findall(r'\w+', query or '')
+        params = []
+        joins = ''
+        where = []
+
+        if symbol:
+            joins += ' JOIN news_article_symbols s ON s.article_id = a.id'
+            where.append('s.symbol = ?')
+            params.append(symbol)
+        if feed:
+            joins += ' JOIN news_feed_articles fa ON fa.article_id = a.id'
+            where.append('fa.feed = ?')
+            params.append(feed)
+
+        order = 'a.published_at DESC'
+        if terms and self.fts_enabled:
+            joins += ' JOIN news_articles_fts f ON f.rowid = a.id'
+            where.append('news_articles_fts MATCH ?')
+            params.append(' '.join(f'"{term}"' for term in terms))
+            order = 'bm25(news_articles_fts), a.published_at DESC'
+        else:
+            for term in terms:
+                where.append("(a.title LIKE ? OR a.description LIKE ?)")
+                params.extend([f"%{term}%", f"%{term}%"])
+
+        sql = 'SELECT a.title, a.description, a.url, a.published_at FROM news_articles a' + joins
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' ORDER BY {order} LIMIT ?'
+        params.append(limit)
+
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [{
+            "title": row[0],
+            "description": row[1],
+            "url": row[2],
+            "publishedAt": row[3]
+        } for row in rows]
+
+
+class AlertStore:
+    """Persistent price alerts; an alert is active until it triggers or is deleted."""
+
+    COLUMNS = 'id, symbol, direction, threshold, created_at, triggered_at, triggered_price'
+
+    def __init__(self, db_path='stock_cache.db'):
+        self.db_path = db_path
+        self.init_db()
+
+    def init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS price_alerts (
+                    id INTEGER PRIMARY KEY,
+                    symbol TEXT NOT NULL,
+                    direction TEXT NOT NULL,
+                    threshold REAL NOT NULL,
+                    created_at REAL,
+                    triggered_at REAL,
+                    triggered_price REAL
+                )
+            ''')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_price_alerts_active '
+                'ON price_alerts (symbol, threshold) WHERE triggered_at IS NULL'
+            )
+
+    def _row(self, row):
+        return dict(zip(self.COLUMNS.split(', '), row)) if row else None
+
+    def add(self, symbol, direction, threshold):
+        return self.add_many([(symbol, direction, threshold)])[0]
+
+    def add_many(self, alerts):
+        """Insert (symbol, direction, threshold) alerts; returns their ids."""
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            return [conn.execute(
+                'INSERT INTO price_alerts (symbol, direction, threshold, created_at) VALUES (?, ?, ?, ?)',
+                (symbol, direction, threshold, now)
+            ).lastrowid for symbol, direction, threshold in alerts]
+
+    def get(self, alert_id):
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(f'SELECT {self.COLUMNS} FROM price_alerts WHERE id = ?', (alert_id,)).fetchone()
+        return self._row(row)
+
+    def delete(self, alert_id):
+        """Delete an alert; returns it, or None if it did not exist."""
+        alert = self.get(alert_id)
+        if alert:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('DELETE FROM price_alerts WHERE id = ?', (alert_id,))
+        return alert
+
+    def list_active(self, symbol=None, limit=100):
+        sql = f'SELECT {self.COLUMNS} FROM price_alerts WHERE triggered_at IS NULL'
+        params = []
+        if symbol:
+            sql += ' AND symbol = ?'
+            params.append(symbol)
+        sql += ' ORDER BY id LIMIT ?'
+        params.append(limit)
+        with sqlite3.connect(self.db_path) as conn:
+            return [self._row(row) for row in conn.execute(sql, params).fetchall()]
+
+    def iter_active(self, after_id=0, batch_size=5000):
+        """Yield active (id, symbol, direction, threshold) rows newer than ``after_id``.
+
+        Rows come in alerts.SymbolAlerts order: "below" by ascending threshold,
+        "above" by descending threshold.
+        """
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            cursor = conn.execute(
+                'SELECT id, symbol, direction, threshold FROM price_alerts '
+                "WHERE triggered_at IS NULL AND id > ? "
+                "ORDER BY CASE direction WHEN 'above' THEN -threshold ELSE threshold END, id",
+                (after_id,)
+            )
+            while rows := cursor.fetchmany(batch_size):
+                yield from rows
+
+    def mark_triggered(self, alert_ids, price, triggered_at=None):
+        """Trigger still-active alerts; returns the ones this call triggered.
+
+        Alerts already triggered or deleted (e.g. by another worker) are skipped,
+        so each alert is delivered once.
+        """
+        triggered_at = time.time() if triggered_at is None else triggered_at
+        with sqlite3.connect(self.db_path) as conn:
+            won = [alert_id for alert_id in alert_ids if conn.execute(
+                'UPDATE price_alerts SET triggered_at = ?, triggered_price = ? WHERE id = ? AND triggered_at IS NULL',
+                (triggered_at, price, alert_id)
+            ).rowcount]
+            rows = []
+            for start in range(0, len(won), 500):
+                chunk = won[start:start + 500]
+                rows += conn.execute(
+                    f'SELECT {self.COLUMNS} FROM price_alerts WHERE id IN ({",".join("?" * len(chunk))}) ORDER BY id',
+                    chunk
+                ).fetchall()
+        return [self._row(row) for row in rows]
+
+
+class KeyUsageStore:
+    """Per-key upstream call counts in fixed windows, shared by every worker using the database."""
+
+    def __init__(self, db_path='stock_cache.db'):
+        self.db_path = db_path
+        self.init_db()
+
+    def init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS api_key_usage (
+                    provider TEXT NOT NULL,
+                    key_id TEXT NOT NULL,
+                    window_start REAL NOT NULL DEFAULT 0,
+                    used INTEGER NOT NULL DEFAULT 0,
+                    throttled_until REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (provider, key_id)
+                )
+            ''')
+
+    def register(self, provider, key_ids):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                'INSERT OR IGNORE INTO api_key_usage (provider, key_id) VALUES (?, ?)',
+                [(provider, key_id) for key_id in key_ids]
+            )
+
+    def usage(self, provider):
+        """Return {key_id: (window_start, used, throttled_until)} for ``provider``."""
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            rows = conn.execute(
+                'SELECT key_id, window_start, used, throttled_until FROM api_key_usage WHERE provider = ?',
+                (provider,)
+            ).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def take(self, provider, key_id, window_start, limit, now):
+        """Count one call against a key that is not throttled and under ``limit`` in its window.
+
+        The check and the increment are one conditional UPDATE, so concurrent
+        workers never push a key past its limit. Returns whether the call was counted.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(
+                'UPDATE api_key_usage SET used = CASE WHEN window_start = ? THEN used + 1 ELSE 1 END, '
+                'window_start = ? WHERE provider = ? AND key_id = ? AND throttled_until <= ? '
+                'AND (window_start != ? OR used < ?)',
+                (window_start, window_start, provider, key_id, now, window_start, limit)
+            ).rowcount == 1
+
+    def throttle(self, provider, key_id, until):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                'UPDATE api_key_usage SET throttled_until = MAX(throttled_until, ?) WHERE provider = ? AND key_id = ?',
+                (until, provider, key_id)
+            )
+
+
+class QuoteHistoryStore:
+    """Quote points per symbol, downsampled into OHLCV bars once they age out.
+
+    ``volume`` is the session volume the upstream reports with each quote, so
+    a bar's volume is the highest one seen within it.
+    """
+
+    def __init__(self, db_path='stock_cache.db'):
+        self.db_path = db_path
+        self.init_db()
+
+    def init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS quote_points (
+                    symbol TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    price REAL NOT NULL,
+                    volume INTEGER
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_quote_points_symbol_ts ON quote_points (symbol, ts)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_quote_points_ts ON quote_points (ts)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS quote_bars (
+                    symbol TEXT NOT NULL,
+                    bar_start REAL NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume INTEGER,
+                    points INTEGER,
+                    PRIMARY KEY (symbol, bar_start)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_quote_bars_start ON quote_bars (bar_start)')
+
+    def record(self, symbol, price, volume=None, ts=None):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                'INSERT INTO quote_points (symbol, ts, price, volume) VALUES (?, ?, ?, ?)',
+                (symbol, time.time() if ts is None else ts, price, volume)
+            )
+
+    def iter_points(self, symbols=None, start=None, end=None, batch_size=1000):
+        """Yield (symbol, ts, price, volume) ordered by symbol and time, within [start, end)."""
+        where, params = _range_filter('ts', start, end, symbols)
+        pages = _iter_pages(
+            self.db_path,
+            'SELECT symbol, ts, rowid, price, volume FROM quote_points WHERE {after}' + where +
+            ' ORDER BY symbol, ts, rowid LIMIT ?',
+            params, ['symbol', 'ts', 'rowid'], batch_size
+        )
+        for symbol, ts, _, price, volume in pages:
+            yield symbol, ts, price, volume
+
+    def iter_bars(self, symbols=None, start=None, end=None, batch_size=1000):
+        """Yield (symbol, bar_start, open, high, low, close, volume, points) ordered by symbol and time."""
+        where, params = _range_filter('bar_start', start, end, symbols)
+        return _iter_pages(
+            self.db_path,
+            'SELECT symbol, bar_start, open, high, low, close, volume, points FROM quote_bars '
+            'WHERE {after}' + where + ' ORDER BY symbol, bar_start LIMIT ?',
+            params, ['symbol', 'bar_start'], batch_size
+        )
+
+    def downsample(self, before, bar_seconds=86400, batch_size=5000, pause=0.0):
+        """Fold points older than ``before`` into ``bar_seconds`` bars and delete them.
+
+        Points are taken oldest first, ``batch_size`` per transaction, so
+        readers and writers are never held up for long and an interrupted run
+        loses nothing. ``before`` should fall on a bar boundary so each bar is
+        built from all of its points. Returns (points folded, bars written).
+        """
+        folded = written = 0
+        while True:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute(
+                    'SELECT rowid, symbol, ts, price, volume FROM quote_points WHERE ts < ? ORDER BY ts LIMIT ?',
+                    (before, batch_size)
+                ).fetchall()
+                if not rows:
+                    return folded, written
+                bars = {}
+                for _, symbol, ts, price, volume in rows:
+                    bar = bars.get((symbol, ts - ts % bar_seconds))
+                    if bar is None:
+                        bars[(symbol, ts - ts % bar_seconds)] = [price, price, price, price, volume, 1]
+                        continue
+                    bar[1] = max(bar[1], price)
+                    bar[2] = min(bar[2], price)
+                    bar[3] = price
+                    bar[4] = volume if bar[4] is None else max(bar[4], volume or 0)
+                    bar[5] += 1
+                # Bars partly folded by an earlier batch are merged; batches run oldest first
+                conn.executemany(
+                    'INSERT INTO quote_bars (symbol, bar_start, open, high, low, close, volume, points) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (symbol, bar_start) DO UPDATE SET '
+                    'high = MAX(high, excluded.high), low = MIN(low, excluded.low), close = excluded.close, '
+                    'volume = COALESCE(MAX(volume, excluded.volume), volume, excluded.volume), '
+                    'points = points + excluded.points',
+                    [key + tuple(bar) for key, bar in bars.items()]
+                )
+                rowids = [row[0] for row in rows]
+                for start in range(0, len(rowids), 500):
+                    chunk = rowids[start:start + 500]
+                    conn.execute(f'DELETE FROM quote_points WHERE rowid IN ({",".join("?" * len(chunk))})', chunk)
+            folded += len(rows)
+            written += len(bars)
+            if len(rows) < batch_size:
+                return folded, written
+            time.sleep(pause)
+
+
+# Table -> column compared against the retention cutoff. The cache tables and
+# ingest cursors hold ISO timestamps, the others epoch seconds.
+EXPIRY_COLUMNS = {
+    "stock_cache": "timestamp",
+    "news_cache": "timestamp",
+    "news_ingest_cursors": "last_run",
+    "quote_bars": "bar_start",
+    "price_alerts": "triggered_at",
+}
+
+
+class MaintenanceStore:
+    """Batched retention deletes and online compaction of the shared database."""
+
+    def __init__(self, db_path='stock_cache.db'):
+        self.db_path = db_path
+        self.init_db()
+
+    def init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            # Only takes effect on a new, empty database; see vacuum() for existing ones
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS maintenance_runs (
+                    job TEXT PRIMARY KEY,
+                    last_run REAL NOT NULL DEFAULT 0
+                )
+            ''')
+
+    def claim(self, job, interval, now=None):
+        """Record a run of ``job`` unless one started within ``interval`` seconds.
+
+        The check and the update are one conditional UPDATE, so only one
+        worker wins each interval. Returns whether the caller should run it.
+        """
+        now = time.time() if now is None else now
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('INSERT OR IGNORE INTO maintenance_runs (job) VALUES (?)', (job,))
+            return conn.execute(
+                'UPDATE maintenance_runs SET last_run = ? WHERE job = ? AND last_run <= ?',
+                (now, job, now - interval)
+            ).rowcount == 1
+
+    def _tables(self):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    def expire(self, table, before, batch_size=1000, pause=0.0):
+        """Delete rows of ``table`` older than ``before``, ``batch_size`` per transaction.
+
+        Tables not created in this database are skipped. Returns the number deleted.
+        """
+        column = EXPIRY_COLUMNS[table]
+        if table not in self._tables():
+            return 0
+        deleted = 0
+        while True:
+            with sqlite3.connect(self.db_path) as conn:
+                count = conn.execute(
+                    f'DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {column} < ? LIMIT ?)',
+                    (before, batch_size)
+                ).rowcount
+            deleted += count
+            if count < batch_size:
+                return deleted
+            time.sleep(pause)
+
+    def expire_articles(self, before, batch_size=1000, pause=0.0):
+        """Delete stored articles published before ``before`` (an ISO timestamp) with their links.
+
+        Articles without a publish date go by when they were fetched.
+        """
+        if 'news_articles' not in self._tables():
+            return 0
+        deleted = 0
+        while True:
+            with sqlite3.connect(self.db_path) as conn:
+                ids = [row[0] for row in conn.execute(
+                    'SELECT id FROM news_articles WHERE published_at < ? '
+                    'OR (published_at IS NULL AND fetched_at < ?) LIMIT ?',
+                    (before, before, batch_size)
+                )]
+                marks = ",".join("?" * len(ids))
+                for table in ('news_article_symbols', 'news_feed_articles'):
+                    conn.execute(f'DELETE FROM {table} WHERE article_id IN ({marks})', ids)
+                # The delete trigger keeps the full-text index in step
+                conn.execute(f'DELETE FROM news_articles WHERE id IN ({marks})', ids)
+            deleted += len(ids)
+            if len(ids) < batch_size:
+                return deleted
+            time.sleep(pause)
+
+    def compact(self, max_pages=2000):
+        """Return up to ``max_pages`` free pages to the filesystem and checkpoint the WAL.
+
+        Both steps are online: the incremental vacuum only moves pages off the
+        end of the file and the PASSIVE checkpoint never waits for readers.
+        """
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            incremental = conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+            free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if incremental and free_pages:
+                # execute() would step the pragma once, freeing a single page
+                conn.executescript(f'PRAGMA incremental_vacuum({int(max_pages)});')
+            _, wal_pages, checkpointed = conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+            conn.execute('PRAGMA optimize')
+            remaining = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            return {
+                "incremental": incremental,
+                "free_pages": remaining,
+                "freed_pages": free_pages - remaining,
+                "wal_pages": wal_pages,
+                "checkpointed_pages": checkpointed,
+            }
+
+    def vacuum(self):
+        """Rewrite the database with incremental auto-vacuum enabled.
+
+        A full VACUUM blocks every writer while it runs, so this is a one-off
+        offline step for databases created before incremental vacuum.
+        """
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            conn.execute('VACUUM')
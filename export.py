@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Streaming bulk export of stored quote history and news articles
+
+Rows are read from the local store a page at a time (see
+database._iter_pages) and encoded a batch at a time, so an export holds about
+one batch in memory whatever its range, and nothing is read ahead of the
+consumer: a slow client or pipe simply pauses the reads. Datasets:
+
+- ``quotes``: recorded quote points (symbol, time, price, volume);
+- ``bars``: daily OHLCV bars the points were folded into (see maintenance.py);
+- ``news``: stored articles, optionally only those linked to ``symbols``.
+
+Formats are CSV, JSON Lines and, when pyarrow is installed, an Arrow IPC
+stream or Parquet (one row group per PARQUET_ROW_GROUP rows).
+
+Usage:
+    GET /api/export/quotes?symbols=AAPL,MSFT&start=2024-01-01&end=2024-02-01&format=csv
+    python export.py news --symbols AAPL --start 2024-01-01 --format parquet --output news.parquet
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import datetime, timezone
+from itertools import islice
+
+# (name, type) per exported column; "timestamp" columns hold epoch seconds
+DATASETS = {
+    "quotes": (("symbol", "string"), ("time", "timestamp"), ("price", "float"), ("volume", "int")),
+    "bars": (("symbol", "string"), ("time", "timestamp"), ("open", "float"), ("high", "float"),
+             ("low", "float"), ("close", "float"), ("volume", "int"), ("points", "int")),
+    "news": (("id", "int"), ("published_at", "string"), ("title", "string"), ("description", "string"),
+             ("url", "string")),
+}
+
+# format -> (content type, file extension)
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+PARQUET_ROW_GROUP = 65536
+
+
+class ExportError(ValueError):
+    """An export request that cannot be served as asked."""
+
+
+def parse_time(value):
+    """Epoch seconds from an ISO date/datetime (UTC unless it has an offset) or a number; None if empty."""
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ExportError(f"Invalid time: {value!r}; use an ISO date/datetime or epoch seconds")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def dataset_rows(dataset, history, articles, symbols=None, start=None, end=None, batch_size=1000):
+    """Rows of ``dataset`` from the stores, in DATASETS column order."""
+    if dataset == "quotes":
+        return history.iter_points(symbols, start, end, batch_size)
+    if dataset == "bars":
+        return history.iter_bars(symbols, start, end, batch_size)
+    if dataset == "news":
+        # publishedAt is stored as NewsAPI sends it, which compares as a string
+        return articles.iter_articles(symbols, None if start is None else _iso(start),
+                                      None if end is None else _iso(end), batch_size)
+    raise ExportError(f"Unknown dataset {dataset!r}; choose one of {', '.join(DATASETS)}")
+
+
+def _pyarrow():
+    # Imported on first use: it is optional and slow to import
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportError("Arrow and Parquet exports need pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def _text_rows(batch, columns):
+    timestamps = [i for i, (_, kind) in enumerate(columns) if kind == "timestamp"]
+    for row in batch:
+        if timestamps:
+            row = list(row)
+            for i in timestamps:
+                row[i] = None if row[i] is None else _iso(row[i])
+        yield row
+
+
+def _csv(batches, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(name for name, _ in columns)
+    yield buffer.getvalue().encode()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_text_rows(batch, columns))
+        yield buffer.getvalue().encode()
+
+
+def _jsonl(batches, columns):
+    names = [name for name, _ in columns]
+    for batch in batches:
+        yield "".join(json.dumps(dict(zip(names, row))) + "\n" for row in _text_rows(batch, columns)).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file handing what pyarrow wrote so far to the response in chunks."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        # Parquet records column chunk offsets from this, so it counts every byte ever written
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _record_batch(pa, schema, batch, columns):
+    arrays = []
+    for (name, kind), values in zip(columns, zip(*batch)):
+        if kind == "timestamp":
+            values = [None if value is None else round(value * 1000) for value in values]
+        arrays.append(pa.array(values, schema.field(name).type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _schema(pa, columns):
+    types = {"string": pa.string(), "float": pa.float64(), "int": pa.int64(),
+             "timestamp": pa.timestamp("ms", tz="UTC")}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def _arrow(pa, batches, columns):
+    schema = _schema(pa, columns)
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(_record_batch(pa, schema, batch, columns))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _parquet(pa, batches, columns):
+    schema = _schema(pa, columns)
+    sink = _ChunkSink()
+    with pa.parquet.ParquetWriter(sink, schema) as writer:
+        for batch in batches:
+            writer.write_table(pa.Table.from_batches([_record_batch(pa, schema, batch, columns)]))
+            yield sink.drain()
+    # The footer is written on close
+    yield sink.drain()
+
+
+def encode(rows, columns, fmt, batch_size=1000):
+    """Return an iterator of ``rows`` encoded as ``fmt``, one bytes chunk per batch.
+
+    Checks the format (and that pyarrow is there) up front, so an HTTP export
+    fails before its response starts rather than part way through.
+    """
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format {fmt!r}; choose one of {', '.join(FORMATS)}")
+    if fmt == "csv":
+        return _csv(_batches(rows, batch_size), columns)
+    if fmt == "jsonl":
+        return _jsonl(_batches(rows, batch_size), columns)
+    pa = _pyarrow()
+    if fmt == "arrow":
+        return _arrow(pa, _batches(rows, batch_size), columns)
+    return _parquet(pa, _batches(rows, max(batch_size, PARQUET_ROW_GROUP)), columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export stored quote history or news articles")
+    parser.add_argument("dataset", choices=list(DATASETS))
+    parser.add_argument("--symbols", default="", help="comma-separated symbols (default: all)")
+    parser.add_argument("--start", help="ISO date/datetime (UTC) or epoch seconds, inclusive")
+    parser.add_argument("--end", help="ISO date/datetime (UTC) or epoch seconds, exclusive")
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--output", help="file to write (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    import app as app_module
+    try:
+        rows = dataset_rows(args.dataset, app_module.get_quote_history(), app_module.get_article_store(),
+                            app_module.parse_symbols(args.symbols), parse_time(args.start), parse_time(args.end),
+                            args.batch_size)
+        chunks = encode(rows, DATASETS[args.dataset], args.format, args.batch_size)
+    except ExportError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 2
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
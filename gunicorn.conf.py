@@ -0,0 +1,135 @@
+"""
+Gunicorn configuration for the Stock Market Data & News Aggregator
+
+Gunicorn loads ./gunicorn.conf.py automatically and it names the app itself,
+so a plain ``gunicorn`` from the project directory is enough. Requests spend most of their time
+waiting on Alpha Vantage and NewsAPI, so the default is a threaded worker per
+core, with threads sized from the share of time spent on upstream I/O.
+
+Environment overrides:
+    GUNICORN_WORKER_CLASS    sync | gthread | gevent | uvicorn (default gthread)
+    GUNICORN_WORKERS         worker processes (default derived from cores)
+    GUNICORN_THREADS         threads per gthread worker (default derived from GUNICORN_IO_RATIO)
+    GUNICORN_IO_RATIO        fraction of request time spent waiting on upstreams (default 0.95)
+    GUNICORN_PRELOAD         load the app once in the master before forking (default true)
+    GUNICORN_MAX_REQUESTS    recycle a worker after this many requests (default 1000, 0 disables)
+    GUNICORN_READY_FILE      file touched once workers are up, for external readiness probes
+    PORT                     listen port (default 8080)
+"""
+
+import importlib.util
+import math
+import os
+
+MAX_THREADS = 32
+# Measured with benchmarks/worker_profiles.py against the "realistic" mock upstream
+DEFAULT_IO_RATIO = 0.95
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "gevent": "gevent",
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+
+# Worker classes backed by optional packages: (modules to probe, install hint)
+OPTIONAL_WORKERS = {
+    "gevent": (("gevent",), "pip install gevent"),
+    # asgi.py wraps the app with asgiref, which uvicorn does not install
+    "uvicorn": (("uvicorn", "asgiref"), "pip install uvicorn asgiref"),
+}
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def resolve_worker_class(name):
+    """Return the requested worker class, falling back to gthread if its package is missing."""
+    name = name.lower()
+    if name not in WORKER_CLASSES:
+        raise ValueError(f"Unknown GUNICORN_WORKER_CLASS: {name}")
+    if name in OPTIONAL_WORKERS:
+        modules, hint = OPTIONAL_WORKERS[name]
+        missing = [module for module in modules if importlib.util.find_spec(module) is None]
+        if missing:
+            print(f"[ERROR] {name} workers need {', '.join(missing)} ({hint}); using gthread")
+            return "gthread"
+    return name
+
+
+def derive_sizing(worker_class, cores, io_ratio):
+    """Return (workers, threads) for a worker class on ``cores`` CPUs.
+
+    Blocking sync workers follow the usual 2 x cores + 1. Threaded workers run
+    one process per core with enough threads to keep it busy while requests
+    wait on upstreams: 1 / (1 - io_ratio) threads, capped at MAX_THREADS.
+    Event-loop workers (gevent, uvicorn) multiplex I/O themselves and need one
+    process per core.
+    """
+    if worker_class == "sync":
+        return 2 * cores + 1, 1
+    if worker_class == "gthread":
+        io_ratio = min(max(io_ratio, 0.0), 0.99)
+        return cores, min(MAX_THREADS, math.ceil(round(1 / (1 - io_ratio), 6)))
+    return cores, 1
+
+
+_worker_class = resolve_worker_class(os.getenv("GUNICORN_WORKER_CLASS", "gthread"))
+_workers, _threads = derive_sizing(_worker_class, available_cores(), float(os.getenv("GUNICORN_IO_RATIO", DEFAULT_IO_RATIO)))
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', 8080)}")
+worker_class = WORKER_CLASSES[_worker_class]
+workers = int(os.getenv("GUNICORN_WORKERS", _workers))
+threads = int(os.getenv("GUNICORN_THREADS", _threads))
+worker_connections = 1000
+
+# Uvicorn workers need an ASGI callable; asgi.py wraps the Flask app
+wsgi_app = "asgi:app" if _worker_class == "uvicorn" else "app:app"
+
+# gevent must monkey-patch before the app imports socket/ssl, which preloading would defeat
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() != "false" and _worker_class != "gevent"
+
+# Recycle workers gradually; jitter keeps them from restarting at the same moment
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = max_requests // 10
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Heartbeat files on tmpfs so a slow disk cannot make the arbiter kill healthy workers
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # State built by a preloading master (HTTP pools, locks) is replaced per worker
+    import app as app_module
+    app_module.reinit_after_fork()
+
+
+def post_worker_init(worker):
+    # Build the symbol index, HTTP session and news store before taking traffic
+    import app as app_module
+    app_module.warm_up()
+
+
+def when_ready(server):
+    server.log.info(f"Serving with {workers} {_worker_class} workers x {threads} threads "
+                    f"(preload={preload_app}, max_requests={max_requests})")
+    ready_file = os.getenv("GUNICORN_READY_FILE")
+    if ready_file:
+        with open(ready_file, "w") as f:
+            f.write(str(os.getpid()))
+
+
+def on_exit(server):
+    ready_file = os.getenv("GUNICORN_READY_FILE")
+    if ready_file and os.path.exists(ready_file):
+        os.remove(ready_file)
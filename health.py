@@ -0,0 +1,165 @@
+"""
+Process health signals used by the /ready endpoint
+
+InFlightGauge counts upstream calls currently running in this worker so a
+saturated node can report itself unready. CircuitBreaker stops calling an
+upstream that keeps failing and lets a single trial call through after a
+cool-down. AdmissionController bounds the requests that need upstream work
+and sheds the ones that would wait longer than a latency budget.
+"""
+
+import math
+import threading
+import time
+
+
+class InFlightGauge:
+    """Thread-safe counter of in-flight operations, used as a context manager."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def saturated(self):
+        return self._value >= self.limit
+
+    def __enter__(self):
+        with self._lock:
+            self._value += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self._value -= 1
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures.
+
+    While open, calls are refused for ``reset_timeout`` seconds; then one call
+    is allowed through (half-open) and its outcome closes or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    reset = record_success
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def snapshot(self):
+        return {"state": self.state, "consecutive_failures": self._failures}
+
+
+class OverloadedError(Exception):
+    """Raised when a request could not be admitted within the queue budget."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Server busy, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Admit at most ``limit`` concurrent requests, each queued for at most ``queue_budget`` seconds.
+
+    ``queued`` passed to ``acquire`` is time already spent waiting upstream of
+    the app (balancer and worker queues), so it counts against the budget.
+    """
+
+    def __init__(self, limit, queue_budget):
+        self.limit = limit
+        self.queue_budget = queue_budget
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = 0
+        self._rejected = 0
+        self._queue_ms = 0.0
+
+    @property
+    def retry_after(self):
+        return max(1, math.ceil(self.queue_budget))
+
+    def acquire(self, queued=0.0):
+        remaining = self.queue_budget - queued
+        start = time.monotonic()
+        admitted = False
+        with self._lock:
+            self._waiting += 1
+        try:
+            admitted = remaining > 0 and self._slots.acquire(timeout=remaining)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+                if admitted:
+                    self._in_flight += 1
+                    # Moving average of queue time for admitted requests
+                    waited_ms = (queued + time.monotonic() - start) * 1000
+                    self._queue_ms += 0.2 * (waited_ms - self._queue_ms)
+                else:
+                    self._rejected += 1
+        if not admitted:
+            raise OverloadedError(self.retry_after)
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def snapshot(self):
+        return {
+            "in_flight": self._in_flight,
+            "limit": self.limit,
+            "waiting": self._waiting,
+            "rejected": self._rejected,
+            "queue_ms": round(self._queue_ms, 1)
+        }
@@ -0,0 +1,169 @@
+"""
+Pools of upstream API keys with per-key quota tracking
+
+Each provider can be given several comma-separated keys. Every call is
+counted against one key in fixed windows (e.g. 25 calls per day), and the
+key with the most budget left in the current window is used next, so calls
+spread evenly and throughput grows with the number of keys. A key the
+provider reports as throttled is skipped until its window resets (or the
+provider's Retry-After passes). Usage lives in the SQLite ``api_key_usage``
+table, shared by every worker on the host; without a store it is tracked
+in-process.
+
+Configure through the environment:
+    ALPHA_VANTAGE_API_KEY=key1,key2,key3 ALPHA_VANTAGE_KEY_QUOTA=25/day
+"""
+
+import hashlib
+import sys
+import threading
+import time
+
+from health import CircuitOpenError
+
+WINDOW_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class KeyThrottled(Exception):
+    """Raised by a call when the provider rejected its key for exceeding a rate limit."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class KeysExhausted(CircuitOpenError):
+    """Every key in a pool is out of quota or throttled."""
+
+    def __init__(self, provider, retry_after):
+        super().__init__(f"{provider} API keys exhausted; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def parse_keys(value):
+    """Split a comma-separated key setting, dropping blanks and duplicates."""
+    return list(dict.fromkeys(k.strip() for k in (value or "").split(",") if k.strip()))
+
+
+def parse_quota(value, default_window=60):
+    """Parse "<calls>/<seconds or unit>" (e.g. "25/day", "5/60") into (limit, window).
+
+    An empty value means no limit is counted; throttled keys are then rested
+    for ``default_window`` seconds.
+    """
+    if not value:
+        return None, default_window
+    calls, _, window = value.partition("/")
+    window = window.strip().lower()
+    seconds = WINDOW_UNITS.get(window) or WINDOW_UNITS.get(window.rstrip("s"))
+    return int(calls), seconds or int(window or default_window)
+
+
+def key_id(key):
+    """Stable identifier for a key that never reveals it."""
+    return hashlib.sha256(key.encode()).hexdigest()[:12]
+
+
+class LocalKeyUsage:
+    """In-process stand-in for database.KeyUsageStore."""
+
+    def __init__(self):
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def register(self, provider, key_ids):
+        with self._lock:
+            for kid in key_ids:
+                self._rows.setdefault((provider, kid), [0.0, 0, 0.0])
+
+    def usage(self, provider):
+        with self._lock:
+            return {kid: tuple(row) for (p, kid), row in self._rows.items() if p == provider}
+
+    def take(self, provider, kid, window_start, limit, now):
+        with self._lock:
+            row = self._rows[(provider, kid)]
+            if row[2] > now or (row[0] == window_start and row[1] >= limit):
+                return False
+            row[1] = row[1] + 1 if row[0] == window_start else 1
+            row[0] = window_start
+            return True
+
+    def throttle(self, provider, kid, until):
+        with self._lock:
+            row = self._rows[(provider, kid)]
+            row[2] = max(row[2], until)
+
+
+class KeyPool:
+    """Rotates calls for one provider across its keys, within each key's quota."""
+
+    def __init__(self, provider, keys, store=None, limit=None, window=60):
+        if not keys:
+            raise ValueError(f"{provider} needs at least one API key")
+        self.provider = provider
+        self.limit = limit
+        self.window = window
+        self.store = store if store is not None else LocalKeyUsage()
+        self._keys = {key_id(key): key for key in keys}
+        self.store.register(provider, list(self._keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _window_start(self, now):
+        return now - now % self.window
+
+    def acquire(self, now=None):
+        """Count a call against the key with the most budget left and return that key."""
+        now = time.time() if now is None else now
+        start = self._window_start(now)
+        limit = sys.maxsize if self.limit is None else self.limit
+        usage = self.store.usage(self.provider)
+        candidates = []
+        for kid in self._keys:
+            window_start, used, throttled_until = usage.get(kid, (0.0, 0, 0.0))
+            used = used if window_start == start else 0
+            if throttled_until <= now and used < limit:
+                candidates.append((used, kid))
+        # Sorting is stable, so equally used keys are taken in pool order
+        candidates.sort(key=lambda candidate: candidate[0])
+        for _, kid in candidates:
+            # Another worker may have used up the key since it was read
+            if self.store.take(self.provider, kid, start, limit, now):
+                return self._keys[kid]
+        raise KeysExhausted(self.provider, self.retry_after(now))
+
+    def throttled(self, key, retry_after=None, now=None):
+        """Skip ``key`` until ``retry_after`` seconds pass, or else until its window resets."""
+        now = time.time() if now is None else now
+        until = now + retry_after if retry_after else self._window_start(now) + self.window
+        print(f"[ERROR] {self.provider} key {key_id(key)} throttled for {until - now:.0f}s")
+        self.store.throttle(self.provider, key_id(key), until)
+
+    def retry_after(self, now=None):
+        """Seconds until some key has budget again."""
+        now = time.time() if now is None else now
+        start = self._window_start(now)
+        limit = sys.maxsize if self.limit is None else self.limit
+        waits = []
+        for kid, (window_start, used, throttled_until) in self.store.usage(self.provider).items():
+            if kid not in self._keys:
+                continue
+            if throttled_until > now:
+                waits.append(throttled_until - now)
+            elif window_start == start and used >= limit:
+                waits.append(start + self.window - now)
+            else:
+                return 1.0
+        return max(min(waits, default=self.window), 1.0)
+
+    def call(self, fn):
+        """Return ``fn(key)``, moving on to the next best key each time it raises KeyThrottled."""
+        for _ in range(len(self._keys)):
+            key = self.acquire()
+            try:
+                return fn(key)
+            except KeyThrottled as e:
+                self.throttled(key, e.retry_after)
+        raise KeysExhausted(self.provider, self.retry_after())
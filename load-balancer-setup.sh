@@ -35,10 +35,10 @@ server {
     }
 
     # Health check endpoint
+    # Answered by the app itself so it reflects app liveness, not just nginx
     location /health {
         access_log off;
-        return 200 "healthy\n";
-        add_header Content-Type text/plain;
+        proxy_pass http://stock_app_backend/health;
     }
 }
 EOF
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Retention, downsampling and compaction for the SQLite store
+
+Left alone, the shared database only grows: quote points are recorded on every
+fetch, ``news_cache`` keys are arbitrary query strings and stored articles are
+never dropped. A background job, run by one worker per interval, keeps it flat:
+
+- quote points older than the point retention are folded into daily OHLCV
+  bars, which are kept for their own (by default unlimited) retention;
+- stale ``stock_cache``/``news_cache`` rows, old articles, ingest cursors of
+  searches not run within the article retention and long-triggered alerts
+  are deleted;
+- freed pages are returned with an incremental vacuum and the WAL is
+  checkpointed.
+
+Every delete runs in small batches, each its own short transaction, so
+requests reading or writing the database are never held up for long.
+
+Configure through the environment:
+    STORE_MAINTENANCE_INTERVAL=3600 QUOTE_POINT_RETENTION_DAYS=7 NEWS_RETENTION_DAYS=180
+
+Usage:
+    python maintenance.py            # run once, e.g. from cron with STORE_MAINTENANCE_INTERVAL=0
+    python maintenance.py --vacuum   # one-off, offline: enable incremental vacuum on an older database
+"""
+
+import argparse
+import atexit
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+DAY = 86400
+
+
+class RetentionPolicy:
+    """How long each kind of row is kept, in seconds; None keeps it forever."""
+
+    def __init__(self, quote_points=7 * DAY, quote_bars=None, bar_seconds=DAY, articles=180 * DAY,
+                 cache_rows=7 * DAY, triggered_alerts=30 * DAY):
+        self.quote_points = quote_points
+        self.quote_bars = quote_bars
+        self.bar_seconds = bar_seconds
+        self.articles = articles
+        self.cache_rows = cache_rows
+        self.triggered_alerts = triggered_alerts
+
+
+class MaintenanceJob:
+    """Applies a RetentionPolicy to a database.MaintenanceStore and QuoteHistoryStore."""
+
+    def __init__(self, store, history, policy=None, interval=3600, batch_size=1000, pause=0.01, max_pages=2000):
+        self.store = store
+        self.history = history
+        self.policy = policy or RetentionPolicy()
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.max_pages = max_pages
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._vacuum_hinted = False
+
+    def run(self, now=None):
+        """Apply the policy once; returns counts of what was folded, deleted and freed."""
+        now = time.time() if now is None else now
+        policy = self.policy
+        batch = {"batch_size": self.batch_size, "pause": self.pause}
+        stats = {}
+        if policy.quote_points is not None:
+            # Whole bars only, so each is built from all of its points
+            before = now - policy.quote_points
+            before -= before % policy.bar_seconds
+            stats["points_folded"], stats["bars_written"] = self.history.downsample(
+                before, policy.bar_seconds, **batch)
+        if policy.quote_bars is not None:
+            stats["quote_bars"] = self.store.expire("quote_bars", now - policy.quote_bars, **batch)
+        if policy.cache_rows is not None:
+            cutoff = datetime.fromtimestamp(now - policy.cache_rows).isoformat()
+            for table in ("stock_cache", "news_cache"):
+                stats[table] = self.store.expire(table, cutoff, **batch)
+        if policy.triggered_alerts is not None:
+            stats["price_alerts"] = self.store.expire("price_alerts", now - policy.triggered_alerts, **batch)
+        if policy.articles is not None:
+            # Same shape as NewsAPI's publishedAt, so the two compare as strings
+            cutoff = datetime.fromtimestamp(now - policy.articles, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            stats["news_articles"] = self.store.expire_articles(cutoff, **batch)
+            # One cursor per distinct search feed; one not run in that long has nothing left to resume
+            stats["news_ingest_cursors"] = self.store.expire(
+                "news_ingest_cursors", datetime.fromtimestamp(now - policy.articles).isoformat(), **batch)
+        stats.update(self.store.compact(self.max_pages))
+        return stats
+
+    def tick(self, now=None):
+        """Run unless another worker already did within the interval; returns the stats or None."""
+        if not self.store.claim("retention", self.interval, now):
+            return None
+        stats = self.run(now)
+        print(f"[DEBUG] Store maintenance: {stats}")
+        if not stats["incremental"] and stats["free_pages"] > self.max_pages and not self._vacuum_hinted:
+            self._vacuum_hinted = True
+            print(f"[DEBUG] {stats['free_pages']} free database pages are not returned to the filesystem; "
+                  "run `python maintenance.py --vacuum` once while the app is stopped")
+        return stats
+
+    def start(self):
+        """Start the maintenance thread once per process (forked workers start their own)."""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive() and self._pid == os.getpid()):
+            return
+        self._pid = os.getpid()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="store-maintenance", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def after_fork(self):
+        """Reset thread state copied from the parent process."""
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def stop(self):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"[ERROR] Store maintenance failed: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply retention to the SQLite store and compact it")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="rewrite the database with incremental vacuum enabled (stop the app first)")
+    args = parser.parse_args()
+
+    import app as app_module
+    job = app_module.create_maintenance_job()
+    if args.vacuum:
+        job.store.vacuum()
+        print(f"Vacuumed {job.store.db_path}")
+    print(job.run())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Exchange trading calendars for market-hours-aware cache TTLs
+
+Each exchange has a regular session in its local time zone, rule-based
+holidays and early-close days. A symbol's exchange is taken from its suffix
+(VOD.L -> London; no or an unknown suffix such as BRK.B -> New York).
+
+cache_ttl() keeps data short-lived while the exchange trades and caches it
+until the next open while it is closed, so nights, weekends and holidays cost
+no upstream calls while intraday freshness is unchanged.
+"""
+
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+MON, TUE, WED, THU, FRI, SAT, SUN = range(7)
+
+
+def nth_weekday(year, month, weekday, n):
+    """The ``n``-th ``weekday`` of a month; n=-1 is the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def easter(year):
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def observed(day, saturday=True):
+    """US rule: a Sunday holiday moves to Monday and (if ``saturday``) a Saturday one to Friday."""
+    if day.weekday() == SUN:
+        return day + timedelta(days=1)
+    if day.weekday() == SAT:
+        return day - timedelta(days=1) if saturday else None
+    return day
+
+
+def substituted(days):
+    """UK/Canada rule: weekend holidays move to the next weekday not already a holiday."""
+    taken = set()
+    for day in days:
+        while day.weekday() >= SAT or day in taken:
+            day += timedelta(days=1)
+        taken.add(day)
+    return taken
+
+
+def _nyse_holidays(year):
+    good_friday = easter(year) - timedelta(days=2)
+    days = [
+        # A Saturday New Year's Day is not moved back into the previous year
+        observed(date(year, 1, 1), saturday=False),
+        nth_weekday(year, 1, MON, 3), nth_weekday(year, 2, MON, 3), good_friday,
+        nth_weekday(year, 5, MON, -1), observed(date(year, 7, 4)),
+        nth_weekday(year, 9, MON, 1), nth_weekday(year, 11, THU, 4), observed(date(year, 12, 25))
+    ]
+    if year >= 2022:
+        days.append(observed(date(year, 6, 19)))
+    return {day for day in days if day}
+
+
+def _nyse_early_closes(year):
+    return {date(year, 7, 3), nth_weekday(year, 11, THU, 4) + timedelta(days=1), date(year, 12, 24)}
+
+
+def _lse_holidays(year):
+    monday = easter(year) + timedelta(days=1)
+    return substituted([date(year, 1, 1)]) | substituted([date(year, 12, 25), date(year, 12, 26)]) | {
+        monday - timedelta(days=3), monday,
+        nth_weekday(year, 5, MON, 1), nth_weekday(year, 5, MON, -1), nth_weekday(year, 8, MON, -1)
+    }
+
+
+def _lse_early_closes(year):
+    return {date(year, 12, 24), date(year, 12, 31)}
+
+
+def _tsx_holidays(year):
+    victoria_day = date(year, 5, 24) - timedelta(days=date(year, 5, 24).weekday())
+    return (substituted([date(year, 1, 1)]) | substituted([date(year, 7, 1)])
+            | substituted([date(year, 12, 25), date(year, 12, 26)]) | {
+        nth_weekday(year, 2, MON, 3), easter(year) - timedelta(days=2), victoria_day,
+        nth_weekday(year, 8, MON, 1), nth_weekday(year, 9, MON, 1), nth_weekday(year, 10, MON, 2)
+    })
+
+
+def _tsx_early_closes(year):
+    return {date(year, 12, 24)}
+
+
+def _xetra_holidays(year):
+    monday = easter(year) + timedelta(days=1)
+    return {date(year, 1, 1), monday - timedelta(days=3), monday, date(year, 5, 1),
+            date(year, 12, 24), date(year, 12, 25), date(year, 12, 26), date(year, 12, 31)}
+
+
+class ExchangeCalendar:
+    """Regular sessions of one exchange, minus holidays and with early closes."""
+
+    def __init__(self, name, timezone, open_time, close_time, holidays, early_closes=None, early_close=None):
+        self.name = name
+        self.tz = ZoneInfo(timezone)
+        self.open_time = open_time
+        self.close_time = close_time
+        self.early_close = early_close
+        self._rules = {"holidays": holidays, "early_closes": early_closes or (lambda year: set())}
+        self._years = {}
+
+    def _days(self, kind, year):
+        key = (kind, year)
+        if key not in self._years:
+            self._years[key] = frozenset(self._rules[kind](year))
+        return self._years[key]
+
+    def is_holiday(self, day):
+        return day in self._days("holidays", day.year)
+
+    def session(self, day):
+        """(open, close) as aware datetimes for a local date, or None when the exchange is shut."""
+        if day.weekday() >= SAT or self.is_holiday(day):
+            return None
+        close = self.close_time
+        if self.early_close and day in self._days("early_closes", day.year):
+            close = self.early_close
+        return (datetime.combine(day, self.open_time, self.tz), datetime.combine(day, close, self.tz))
+
+    def is_open(self, when):
+        session = self.session(when.astimezone(self.tz).date())
+        return session is not None and session[0] <= when < session[1]
+
+    def last_close(self, when):
+        """The most recent session close at or before ``when``."""
+        day = when.astimezone(self.tz).date()
+        for offset in range(15):
+            session = self.session(day - timedelta(days=offset))
+            if session and session[1] <= when:
+                return session[1]
+        raise ValueError(f"{self.name} has no session in the two weeks before {when}")
+
+    def next_open(self, when):
+        """The first session open after ``when``."""
+        day = when.astimezone(self.tz).date()
+        for offset in range(15):
+            session = self.session(day + timedelta(days=offset))
+            if session and session[0] > when:
+                return session[0]
+        raise ValueError(f"{self.name} has no session in the two weeks after {when}")
+
+
+NYSE = ExchangeCalendar("NYSE", "America/New_York", time(9, 30), time(16, 0),
+                        _nyse_holidays, _nyse_early_closes, time(13, 0))
+LSE = ExchangeCalendar("LSE", "Europe/London", time(8, 0), time(16, 30),
+                       _lse_holidays, _lse_early_closes, time(12, 30))
+TSX = ExchangeCalendar("TSX", "America/Toronto", time(9, 30), time(16, 0),
+                       _tsx_holidays, _tsx_early_closes, time(13, 0))
+XETRA = ExchangeCalendar("XETRA", "Europe/Berlin", time(9, 0), time(17, 30), _xetra_holidays)
+
+# Both the common suffixes and Alpha Vantage's own
+SUFFIXES = {".L": LSE, ".LON": LSE, ".TO": TSX, ".TRT": TSX, ".DE": XETRA, ".DEX": XETRA}
+
+
+def calendar_for(symbol):
+    _, dot, suffix = symbol.rpartition(".")
+    return SUFFIXES.get(f".{suffix.upper()}", NYSE) if dot else NYSE
+
+
+def cache_ttl(calendar, open_ttl, closed_max=None, now=None):
+    """Seconds to cache data priced by ``calendar``'s exchange.
+
+    ``open_ttl`` while it trades and for ``open_ttl`` after a close (so the
+    closing print is picked up), otherwise until the next open, capped at
+    ``closed_max`` when given.
+    """
+    now = datetime.now(calendar.tz) if now is None else now
+    if calendar.is_open(now) or now - calendar.last_close(now) < timedelta(seconds=open_ttl):
+        return open_ttl
+    ttl = max(int((calendar.next_open(now) - now).total_seconds()), 1)
+    return min(ttl, closed_max) if closed_max else ttl
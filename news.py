@@ -0,0 +1,154 @@
+"""
+News query building, per-symbol article attribution/merging and incremental ingestion
+"""
+import re
+from datetime import datetime, timedelta
+
+NEWS_TOPIC_TERMS = "(stock OR shares OR company OR market OR earnings)"
+
+# Corporate suffixes stripped from listing names so queries use the name people write
+_COMPANY_SUFFIXES = re.compile(
+    r"[,\s]+(inc\.?|incorporated|corp\.?|corporation|company|co\.?|ltd\.?|limited|plc|p\.l\.c\.|"
+    r"n\.v\.|s\.a\.|se|ag|a/s|holdings?|group|class [a-z]|common stock|& co\.?)$",
+    re.IGNORECASE
+)
+
+
+def company_alias(name):
+    """Reduce a listing name like 'Apple Inc.' or 'Alphabet Inc. Class A' to 'Apple'/'Alphabet'."""
+    alias = (name or '').split(' - ')[0].strip()
+    previous = None
+    while alias and alias != previous:
+        previous = alias
+        alias = _COMPANY_SUFFIXES.sub('', alias).strip()
+    if alias.lower().startswith('the '):
+        alias = alias[4:]
+    return alias
+
+
+def symbol_terms(symbol, symbol_index=None):
+    """Return the ticker and company-name terms an article must mention to be about ``symbol``."""
+    tickers = [symbol]
+    if '.' in symbol:
+        tickers.append(symbol.split('.')[0])  # Handle BRK.A -> BRK
+
+    names = []
+    if symbol_index is not None:
+        alias = company_alias(symbol_index.name_for(symbol))
+        if alias and alias.upper() not in tickers:
+            names.append(alias)
+
+    return {"tickers": tickers, "names": names}
+
+
+def build_news_query(terms_by_symbol):
+    """Build one NewsAPI query covering every symbol's tickers and company names."""
+    parts = []
+    for terms in terms_by_symbol.values():
+        parts.extend(terms["tickers"])
+        parts.extend(f'"{name}"' for name in terms["names"])
+    return f"({' OR '.join(dict.fromkeys(parts))}) {NEWS_TOPIC_TERMS}"
+
+
+def _term_patterns(terms):
+    # Tickers are matched case-sensitively so 'F' or 'T' don't match every article
+    patterns = [re.compile(rf"(?<![A-Za-z0-9]){re.escape(t)}(?![A-Za-z0-9])") for t in terms["tickers"]]
+    patterns.extend(re.compile(rf"\b{re.escape(n)}\b", re.IGNORECASE) for n in terms["names"])
+    return patterns
+
+
+def assign_articles(articles, terms_by_symbol, limit=10):
+    """Attribute articles from a combined query back to the symbols they mention."""
+    patterns = {symbol: _term_patterns(terms) for symbol, terms in terms_by_symbol.items()}
+    assigned = {symbol: [] for symbol in terms_by_symbol}
+
+    for article in articles:
+        text = f"{article.get('title') or ''} {article.get('description') or ''}"
+        matched = [s for s, pats in patterns.items() if any(p.search(text) for p in pats)]
+        if not matched and len(assigned) == 1:
+            matched = list(assigned)
+        for symbol in matched:
+            if len(assigned[symbol]) < limit:
+                assigned[symbol].append(article)
+
+    return assigned
+
+
+def merge_symbol_news(article_lists, limit=5):
+    """Merge per-symbol article lists into one ranked, de-duplicated list.
+
+    Articles mentioned by more of the requested symbols rank first, then by their
+    best relevancy position in any list, so each symbol's top story surfaces
+    before any symbol's second story.
+    """
+    ranked = {}
+    for articles in article_lists:
+        for position, article in enumerate(articles):
+            key = article.get("url") or article.get("title")
+            if key in ranked:
+                entry = ranked[key]
+                entry[0] -= 1
+                entry[1] = min(entry[1], position)
+            else:
+                ranked[key] = [-1, position, article.get("publishedAt") or '', article]
+
+    # Stable sorts: newest first within ties on (mentions, position)
+    ordered = sorted(ranked.values(), key=lambda e: e[2], reverse=True)
+    ordered.sort(key=lambda e: (e[0], e[1]))
+    return [entry[3] for entry in ordered[:limit]]
+
+
+def _after(published_at):
+    """Return the timestamp one second after ``published_at`` (NewsAPI's ``from`` is inclusive)."""
+    try:
+        moment = datetime.strptime(published_at, '%Y-%m-%dT%H:%M:%SZ')
+    except (TypeError, ValueError):
+        return published_at
+    return (moment + timedelta(seconds=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class NewsIngestor:
+    """Incrementally pulls news into the article store.
+
+    Each feed keeps a ``publishedAt`` high-water mark, and upstream queries only
+    ask for articles published after it, so repeat fetches return just the
+    new stories instead of the same top-N results.
+
+    ``fetch(query, page_size, since, search_in)`` must return normalized article dicts.
+    """
+
+    def __init__(self, store, fetch):
+        self.store = store
+        self.fetch = fetch
+
+    def _advance(self, feed, since, articles):
+        newest = max((a.get("publishedAt") or '' for a in articles), default='')
+        self.store.set_cursor(feed, max(newest, since or ''))
+
+    def ingest(self, feed, query, page_size=10, symbols=(), search_in="title,description"):
+        """Fetch articles newer than the feed's cursor and merge them into the store."""
+        since = self.store.get_cursor(feed)
+        articles = self.fetch(query, page_size, _after(since) if since else None, search_in)
+        added = self.store.save_articles(articles, symbols, feed=feed)
+        self._advance(feed, since, articles)
+        return added
+
+    def ingest_symbols(self, terms_by_symbol, per_symbol=10):
+        """Fetch new articles for several symbols in one query and attribute them per symbol.
+
+        The batched query starts from the oldest of the symbols' cursors; already
+        stored articles are de-duplicated by the store.
+        """
+        feeds = {symbol: f"symbol:{symbol}" for symbol in terms_by_symbol}
+        cursors = {symbol: self.store.get_cursor(feed) for symbol, feed in feeds.items()}
+        since = None if None in cursors.values() else min(cursors.values())
+
+        page_size = min(100, per_symbol * len(terms_by_symbol))
+        articles = self.fetch(build_news_query(terms_by_symbol), page_size, _after(since) if since else None,
+                              "title,description")
+
+        added = 0
+        for symbol, assigned in assign_articles(articles, terms_by_symbol, per_symbol).items():
+            added += self.store.save_articles(assigned, [symbol], feed=feeds[symbol])
+            self._advance(feeds[symbol], cursors[symbol], assigned)
+        return added
@@ -0,0 +1,209 @@
+"""
+Quote providers and hedged fetching across them
+
+Each provider turns its own API response into the app's quote shape
+(symbol, price, change, volume). HedgedQuoteFetcher calls the primary and,
+if it has not answered within its observed p95 latency, sends the same
+request to the secondary and returns whichever succeeds first. A primary
+that fails outright fails over to the secondary. Hedges are paid for with
+credits earned at ``hedge_ratio`` per request, so hedging adds at most that
+fraction of upstream calls on top of a small burst allowance.
+
+Providers take a single API key or a KeyPool rotating several (see key_pool.py);
+rate-limit answers move the call on to the pool's next key.
+
+Configure a secondary through the environment:
+    SECONDARY_QUOTE_PROVIDER=finnhub FINNHUB_API_KEY=... QUOTE_HEDGE_RATIO=0.05
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import as_completed, wait
+
+from key_pool import KeyPool, KeyThrottled
+from upstream import SelectiveDecoder
+
+
+class QuoteUnavailable(Exception):
+    """The provider answered, but without a quote for the symbol."""
+
+
+# GLOBAL_QUOTE fields build_quote reads
+QUOTE_FIELDS = ("01. symbol", "05. price", "09. change", "06. volume")
+
+
+def build_quote(quote):
+    """Normalize an Alpha Vantage GLOBAL_QUOTE object."""
+    return {
+        "symbol": quote.get("01. symbol"),
+        "price": quote.get("05. price"),
+        "change": quote.get("09. change"),
+        "volume": quote.get("06. volume")
+    }
+
+
+def _key_pool(name, api_key):
+    return api_key if isinstance(api_key, KeyPool) else KeyPool(name, [api_key])
+
+
+class AlphaVantageProvider:
+    name = "alpha_vantage"
+
+    def __init__(self, get, base_url, api_key):
+        self.get = get
+        self.base_url = base_url
+        self.keys = _key_pool(self.name, api_key)
+
+    def fetch(self, symbol):
+        return self.keys.call(lambda api_key: self._fetch(symbol, api_key))
+
+    def _fetch(self, symbol, api_key):
+        url = f"{self.base_url}/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}"
+        print(f"[DEBUG] Alpha Vantage URL: {url}")
+        response = self.get(url)
+        print(f"[DEBUG] Alpha Vantage response status for {symbol}: {response.status_code}")
+        response.raise_for_status()
+        data = response.json(cls=SelectiveDecoder, fields={
+            "Global Quote": QUOTE_FIELDS, "Error Message": None, "Note": None, "Information": None
+        })
+        if "Global Quote" in data:
+            return build_quote(data["Global Quote"])
+        if "Error Message" in data:
+            raise QuoteUnavailable(f"Alpha Vantage Error for {symbol}: {data['Error Message']}")
+        if "Note" in data or "Information" in data:
+            # Rate limits are reported as a 200 with a notice instead of a quote
+            raise KeyThrottled(data.get("Note") or data.get("Information"))
+        raise QuoteUnavailable(f"No data found for {symbol} from Alpha Vantage.")
+
+
+class FinnhubProvider:
+    name = "finnhub"
+
+    def __init__(self, get, base_url, api_key):
+        self.get = get
+        self.base_url = base_url
+        self.keys = _key_pool(self.name, api_key)
+
+    def fetch(self, symbol):
+        return self.keys.call(lambda api_key: self._fetch(symbol, api_key))
+
+    def _fetch(self, symbol, api_key):
+        response = self.get(f"{self.base_url}/api/v1/quote?symbol={symbol}&token={api_key}")
+        if response.status_code == 429:
+            raise KeyThrottled(f"Finnhub rate limit reached for {symbol}")
+        response.raise_for_status()
+        data = response.json(cls=SelectiveDecoder, fields={"c": None, "d": None})
+        # Unknown symbols come back as all-zero quotes
+        if not data.get("c"):
+            raise QuoteUnavailable(f"No data found for {symbol} from Finnhub.")
+        return {
+            "symbol": symbol,
+            "price": f"{data['c']:.4f}",
+            "change": f"{data['d']:.4f}" if data.get("d") is not None else None,
+            "volume": None
+        }
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies in seconds."""
+
+    def __init__(self, window=200, min_samples=20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q):
+        """The ``q`` quantile of the window, or None until ``min_samples`` calls were seen."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class HedgedQuoteFetcher:
+    """Fetch quotes from ``primary``, hedged and failed over to ``secondary`` when given."""
+
+    def __init__(self, primary, secondary=None, executor=None, hedge_ratio=0.05, max_burst=5,
+                 default_delay=1.0, min_delay=0.05):
+        if secondary is not None and executor is None:
+            raise ValueError("hedging needs an executor")
+        self.primary = primary
+        self.secondary = secondary
+        self.executor = executor
+        self.hedge_ratio = hedge_ratio
+        self.max_burst = max_burst
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.latency = LatencyTracker()
+        self._credits = float(max_burst)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "failovers": 0}
+
+    def hedge_delay(self):
+        p95 = self.latency.percentile(0.95)
+        return self.default_delay if p95 is None else max(self.min_delay, p95)
+
+    def snapshot(self):
+        p95 = self.latency.percentile(0.95)
+        with self._lock:
+            stats = dict(self._stats)
+        stats["primary_p95_ms"] = None if p95 is None else round(p95 * 1000, 1)
+        return stats
+
+    def _count(self, field):
+        with self._lock:
+            self._stats[field] += 1
+
+    def _take_hedge_credit(self):
+        with self._lock:
+            if self._credits >= 1:
+                self._credits -= 1
+                return True
+            return False
+
+    def _timed_primary(self, symbol):
+        start = time.monotonic()
+        try:
+            return self.primary.fetch(symbol)
+        finally:
+            # Slow calls that lost a hedge are still recorded, keeping p95 honest
+            self.latency.record(time.monotonic() - start)
+
+    def fetch(self, symbol):
+        """Return (quote, provider name); raises the primary's error if no provider has a quote."""
+        if self.secondary is None:
+            return self.primary.fetch(symbol), self.primary.name
+
+        with self._lock:
+            self._stats["requests"] += 1
+            self._credits = min(self.max_burst, self._credits + self.hedge_ratio)
+
+        primary = self.executor.submit(self._timed_primary, symbol)
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if not done and self._take_hedge_credit():
+            self._count("hedged")
+            print(f"[DEBUG] Hedging {symbol} quote to {self.secondary.name}")
+            hedge = self.executor.submit(self.secondary.fetch, symbol)
+            for future in as_completed([primary, hedge]):
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                        return future.result(), self.secondary.name
+                    return future.result(), self.primary.name
+            raise primary.exception()
+
+        try:
+            return primary.result(), self.primary.name
+        except Exception as primary_error:
+            self._count("failovers")
+            print(f"[ERROR] {self.primary.name} failed for {symbol}, trying {self.secondary.name}: {primary_error}")
+            try:
+                return self.secondary.fetch(symbol), self.secondary.name
+            except Exception:
+                raise primary_error
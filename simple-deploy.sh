@@ -30,7 +30,7 @@ cat > start-app.sh << 'EOF'
 #!/bin/bash
 cd /opt/stock-market-app
 export PYTHONPATH=/opt/stock-market-app
-gunicorn --bind 0.0.0.0:8080 --daemon --pid app.pid app:app
+gunicorn -c gunicorn.conf.py --bind 0.0.0.0:8080 --daemon --pid app.pid
 echo "App started on port 8080"
 EOF
 
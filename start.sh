@@ -27,8 +27,8 @@ if [ ! -f ".env" ]; then
 fi
 
 # Start the application
-echo "Starting Flask application..."
+echo "Starting application under gunicorn (see gunicorn.conf.py)..."
 echo "Application will be available at http://localhost:8080"
 echo "Press Ctrl+C to stop the server"
 echo ""
-python app.py
\ No newline at end of file
+PORT=${PORT:-8080} gunicorn -c gunicorn.conf.py
\ No newline at end of file
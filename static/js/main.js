@@ -4,35 +4,102 @@ document.addEventListener('DOMContentLoaded', () => {
     const stockTableContainer = document.getElementById('stockTable');
     const newsArticlesContainer = document.getElementById('newsArticles');
     const errorsContainer = document.getElementById('errors');
+    const symbolSuggestions = document.getElementById('symbolSuggestions');
+    let suggestTimer = null;
+
+    // Server-rendered snapshot dates arrive as ISO timestamps
+    document.querySelectorAll('.article-date time').forEach(time => {
+        time.textContent = new Date(time.dateTime).toLocaleString();
+    });
+
+    if (stockSymbolsInput && symbolSuggestions) {
+        stockSymbolsInput.addEventListener('input', () => {
+            clearTimeout(suggestTimer);
+            suggestTimer = setTimeout(suggestSymbols, 150);
+        });
+    }
+
+    async function suggestSymbols() {
+        // Only the symbol currently being typed (after the last comma) is completed
+        const value = stockSymbolsInput.value;
+        const cut = value.lastIndexOf(',') + 1;
+        const head = value.slice(0, cut);
+        const prefix = value.slice(cut).trim();
+        if (!prefix) {
+            symbolSuggestions.replaceChildren();
+            return;
+        }
+
+        try {
+            const response = await fetch(`/api/symbols?prefix=${encodeURIComponent(prefix)}&limit=8`);
+            if (!response.ok) return;
+            const data = await response.json();
+            const lead = head ? `${head.trimEnd()} ` : '';
+            // Built as nodes: the lead is raw input box text
+            symbolSuggestions.replaceChildren(...data.symbols.map(item => {
+                const option = document.createElement('option');
+                option.value = `${lead}${item.symbol}`;
+                option.textContent = item.name;
+                return option;
+            }));
+        } catch (error) {
+            symbolSuggestions.replaceChildren();
+        }
+    }
+
+    const resultCache = createResultCache();
+    const stockFilter = createFilter(document.getElementById('stockSearch'), stockTableContainer, 'tbody tr');
+    const newsFilter = createFilter(document.getElementById('newsSearch'), newsArticlesContainer, '.news-article');
 
     if (fetchDataBtn) {
         fetchDataBtn.addEventListener('click', async () => {
-            const symbols = stockSymbolsInput.value.trim();
-            if (!symbols) {
+            const symbols = parseSymbols(stockSymbolsInput.value);
+            if (symbols.length === 0) {
                 displayError('Please enter at least one stock symbol.');
                 return;
             }
+            if (symbols.length > 10) {
+                displayError('Too many symbols. Maximum 10 allowed.');
+                return;
+            }
 
-            clearContent();
+            errorsContainer.innerHTML = '';
             setLoading(true);
 
             try {
-                const response = await fetch('/get_stock_data', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ symbols }),
-                });
+                // Only symbols without a fresh cached result go to the server
+                const results = await resultCache.getMany(symbols);
+                const missing = symbols.filter(symbol => !results.has(symbol));
+                if (missing.length > 0) {
+                    const response = await fetch('/get_stock_data', {
+                        method: 'POST',
+                        headers: {
+                            'Content-Type': 'application/json',
+                        },
+                        body: JSON.stringify({ symbols: missing.join(','), symbol_news: true }),
+                    });
 
-                if (!response.ok) {
-                    const errorData = await response.json();
-                    throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+                    if (!response.ok) {
+                        const errorData = await response.json();
+                        throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+                    }
+
+                    const data = await response.json();
+                    const maxAge = parseMaxAge(response.headers.get('Cache-Control'));
+                    const quotes = new Map(data.stock_data.map(stock => [String(stock.symbol).toUpperCase(), stock]));
+                    const symbolNews = data.symbol_news || {};
+                    for (const symbol of missing) {
+                        if (!quotes.has(symbol)) continue;
+                        const result = { quote: quotes.get(symbol), news: symbolNews[symbol] || [] };
+                        results.set(symbol, result);
+                        // Symbols whose news failed are shown but not cached, so they are retried
+                        if (symbol in symbolNews) resultCache.put(symbol, result, maxAge);
+                    }
                 }
 
-                const data = await response.json();
-                displayStockData(data.stock_data);
-                displayNewsData(data.news_data);
+                const shown = symbols.filter(symbol => results.has(symbol)).map(symbol => results.get(symbol));
+                displayStockData(shown.map(result => result.quote));
+                displayNewsData(mergeSymbolNews(shown.map(result => result.news), 5));
 
             } catch (error) {
                 displayError(`Failed to fetch data: ${error.message}`);
@@ -42,52 +109,234 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
 
-    function displayError(message) {
-        errorsContainer.innerHTML = `<p>${message}</p>`;
+    function parseSymbols(value) {
+        // Mirrors parse_symbols() in app.py
+        const symbols = value.split(',').map(symbol => symbol.trim().toUpperCase()).filter(Boolean);
+        return [...new Set(symbols)];
+    }
+
+    function parseMaxAge(cacheControl) {
+        const match = /max-age=(\d+)/.exec(cacheControl || '');
+        return match ? Number(match[1]) : 0;
     }
 
-    function clearContent() {
-        errorsContainer.innerHTML = '';
-        stockTableContainer.innerHTML = '';
-        newsArticlesContainer.innerHTML = '';
+    function mergeSymbolNews(articleLists, limit) {
+        // Mirrors merge_symbol_news() in news.py: most-mentioned first, then best
+        // position in any list, then newest
+        const ranked = new Map();
+        articleLists.forEach(articles => {
+            articles.forEach((article, position) => {
+                const key = article.url || article.title;
+                const entry = ranked.get(key);
+                if (entry) {
+                    entry.mentions += 1;
+                    entry.position = Math.min(entry.position, position);
+                } else {
+                    ranked.set(key, { mentions: 1, position, publishedAt: article.publishedAt || '', article });
+                }
+            });
+        });
+        return [...ranked.values()]
+            .sort((a, b) => b.mentions - a.mentions || a.position - b.position ||
+                (a.publishedAt < b.publishedAt ? 1 : a.publishedAt > b.publishedAt ? -1 : 0))
+            .slice(0, limit)
+            .map(entry => entry.article);
+    }
+
+    function createResultCache() {
+        // Per-symbol {quote, news} results in memory, backed by IndexedDB so they
+        // survive reloads; entries expire after the server's Cache-Control max-age
+        const memory = new Map();
+        const database = openDatabase();
+
+        function openDatabase() {
+            return new Promise(resolve => {
+                if (!window.indexedDB) {
+                    resolve(null);
+                    return;
+                }
+                const open = indexedDB.open('stock-market-results', 1);
+                open.onupgradeneeded = () => open.result.createObjectStore('results', { keyPath: 'symbol' });
+                open.onsuccess = () => resolve(open.result);
+                open.onerror = () => resolve(null);
+                open.onblocked = () => resolve(null);
+            });
+        }
+
+        function readStored(db, symbols) {
+            return new Promise(resolve => {
+                const found = [];
+                const transaction = db.transaction('results', 'readonly');
+                const store = transaction.objectStore('results');
+                symbols.forEach(symbol => {
+                    const get = store.get(symbol);
+                    get.onsuccess = () => {
+                        if (get.result) found.push(get.result);
+                    };
+                });
+                transaction.oncomplete = () => resolve(found);
+                transaction.onerror = () => resolve(found);
+            });
+        }
+
+        async function getMany(symbols) {
+            const now = Date.now();
+            const results = new Map();
+            const unseen = [];
+            symbols.forEach(symbol => {
+                const entry = memory.get(symbol);
+                if (entry && entry.expires > now) {
+                    results.set(symbol, entry.result);
+                } else {
+                    memory.delete(symbol);
+                    unseen.push(symbol);
+                }
+            });
+
+            const db = unseen.length > 0 ? await database : null;
+            if (db) {
+                const stale = [];
+                (await readStored(db, unseen)).forEach(entry => {
+                    if (entry.expires > now) {
+                        memory.set(entry.symbol, entry);
+                        results.set(entry.symbol, entry.result);
+                    } else {
+                        stale.push(entry.symbol);
+                    }
+                });
+                if (stale.length > 0) {
+                    const store = db.transaction('results', 'readwrite').objectStore('results');
+                    stale.forEach(symbol => store.delete(symbol));
+                }
+            }
+            return results;
+        }
+
+        function put(symbol, result, maxAge) {
+            if (maxAge <= 0) return;
+            const entry = { symbol, result, expires: Date.now() + maxAge * 1000 };
+            memory.set(symbol, entry);
+            database.then(db => {
+                if (db) db.transaction('results', 'readwrite').objectStore('results').put(entry);
+            }).catch(() => {});
+        }
+
+        return { getMany, put };
+    }
+
+    function createFilter(input, container, itemSelector) {
+        // Hides non-matching items in place. Item text is lower-cased once per
+        // render, and a query that only extends the previous one re-checks just
+        // the items still visible.
+        const texts = new WeakMap();
+        let lastQuery = '';
+        let timer = null;
+
+        function apply() {
+            if (!input) return;
+            const query = input.value.trim().toLowerCase();
+            const narrowing = lastQuery !== '' && query.startsWith(lastQuery);
+            container.querySelectorAll(itemSelector).forEach(item => {
+                if (narrowing && item.hidden) return;
+                let text = texts.get(item);
+                if (text === undefined) {
+                    text = item.textContent.toLowerCase();
+                    texts.set(item, text);
+                }
+                const hidden = query !== '' && !text.includes(query);
+                if (item.hidden !== hidden) item.hidden = hidden;
+            });
+            lastQuery = query;
+        }
+
+        function refresh(item) {
+            // Called after rendering: forget changed items' text and re-filter everything
+            if (item) texts.delete(item);
+            lastQuery = '';
+        }
+
+        if (input) {
+            input.addEventListener('input', () => {
+                clearTimeout(timer);
+                timer = setTimeout(apply, 120);
+            });
+        }
+        return { apply, refresh };
+    }
+
+    function displayError(message) {
+        errorsContainer.innerHTML = `<p>${message}</p>`;
     }
 
     function setLoading(isLoading) {
         fetchDataBtn.disabled = isLoading;
-        if (isLoading) {
+        // Rendered results stay in place while loading and are updated in place afterwards
+        if (isLoading && !stockTableContainer.querySelector('table')) {
             stockTableContainer.innerHTML = '<p class="loading">Loading stock data...</p>';
+        }
+        if (isLoading && !newsArticlesContainer.querySelector('.news-article')) {
             newsArticlesContainer.innerHTML = '<p class="loading">Loading news...</p>';
         }
     }
 
+    function setText(element, text) {
+        const value = text === undefined || text === null ? '' : String(text);
+        if (element.textContent !== value) element.textContent = value;
+    }
+
+    function reconcile(parent, items, keyOf, create, update) {
+        // Reuse the element already rendered for each key, so unchanged rows and
+        // articles keep their DOM nodes and only changed text is written
+        const existing = new Map();
+        Array.from(parent.children).forEach(element => existing.set(element.dataset.key, element));
+        items.forEach((item, index) => {
+            const key = keyOf(item);
+            let element = existing.get(key);
+            existing.delete(key);
+            if (!element) {
+                element = create();
+                element.dataset.key = key;
+            }
+            update(element, item);
+            if (parent.children[index] !== element) parent.insertBefore(element, parent.children[index] || null);
+        });
+        existing.forEach(element => element.remove());
+    }
+
     function displayStockData(stockData) {
         if (!stockData || stockData.length === 0) {
             stockTableContainer.innerHTML = '<p class="no-data">No stock data available for the given symbols.</p>';
             return;
         }
 
-        const table = document.createElement('table');
-        table.innerHTML = `
-            <thead>
-                <tr>
-                    <th>Symbol</th>
-                    <th>Price</th>
-                    <th>Change</th>
-                    <th>Volume</th>
-                </tr>
-            </thead>
-            <tbody>
-                ${stockData.map(stock => `
-                    <tr>
-                        <td>${stock.symbol}</td>
-                        <td>${stock.price}</td>
-                        <td class="${parseFloat(stock.change) >= 0 ? 'positive' : 'negative'}">${stock.change}</td>
-                        <td>${stock.volume}</td>
-                    </tr>
-                `).join('')}
-            </tbody>
-        `;
-        stockTableContainer.appendChild(table);
+        let tbody = stockTableContainer.querySelector('tbody');
+        if (!tbody) {
+            const table = document.createElement('table');
+            const header = table.createTHead().insertRow();
+            ['Symbol', 'Price', 'Change', 'Volume'].forEach(label => {
+                const th = document.createElement('th');
+                th.textContent = label;
+                header.appendChild(th);
+            });
+            tbody = table.createTBody();
+            stockTableContainer.replaceChildren(table);
+        }
+
+        reconcile(tbody, stockData, stock => stock.symbol, () => {
+            const row = document.createElement('tr');
+            for (let i = 0; i < 4; i++) row.insertCell();
+            return row;
+        }, (row, stock) => {
+            const [symbol, price, change, volume] = row.cells;
+            setText(symbol, stock.symbol);
+            setText(price, stock.price);
+            setText(change, stock.change);
+            change.className = parseFloat(stock.change) >= 0 ? 'positive' : 'negative';
+            setText(volume, stock.volume);
+            stockFilter.refresh(row);
+        });
+        stockFilter.refresh();
+        stockFilter.apply();
     }
 
     function displayNewsData(newsData) {
@@ -96,12 +345,27 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
 
-        newsArticlesContainer.innerHTML = newsData.map(article => `
-            <div class="news-article">
-                <h3><a href="${article.url}" target="_blank" rel="noopener noreferrer">${article.title}</a></h3>
-                <p class="article-description">${article.description || ''}</p>
-                <p class="article-date">${article.publishedAt ? `Published: ${new Date(article.publishedAt).toLocaleString()}` : ''}</p>
-            </div>
-        `).join('');
+        if (!newsArticlesContainer.querySelector('.news-article')) newsArticlesContainer.replaceChildren();
+        reconcile(newsArticlesContainer, newsData, article => article.url || article.title, () => {
+            const element = document.createElement('div');
+            element.className = 'news-article';
+            const heading = element.appendChild(document.createElement('h3'));
+            const link = heading.appendChild(document.createElement('a'));
+            link.target = '_blank';
+            link.rel = 'noopener noreferrer';
+            element.appendChild(document.createElement('p')).className = 'article-description';
+            element.appendChild(document.createElement('p')).className = 'article-date';
+            return element;
+        }, (element, article) => {
+            const link = element.querySelector('a');
+            if (link.getAttribute('href') !== article.url) link.href = article.url;
+            setText(link, article.title);
+            setText(element.querySelector('.article-description'), article.description);
+            setText(element.querySelector('.article-date'),
+                article.publishedAt ? `Published: ${new Date(article.publishedAt).toLocaleString()}` : '');
+            newsFilter.refresh(element);
+        });
+        newsFilter.refresh();
+        newsFilter.apply();
     }
 });
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Local symbol universe index used for symbol validation and autocomplete
+"""
+import bisect
+import csv
+import os
+import re
+from array import array
+
+DEFAULT_LISTING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'symbols.csv')
+
+# Tickers are upper-case letters/digits with optional class or exchange suffix (BRK.B, VOD.L)
+SYMBOL_PATTERN = re.compile(r'^[A-Z0-9][A-Z0-9.\-]{0,14}$')
+
+
+class SymbolIndex:
+    """Sorted-array index over (symbol, name, exchange) listings.
+
+    Symbols and lower-cased company names are kept in parallel sorted lists so
+    membership checks and prefix scans are a single bisect each.
+    """
+
+    def __init__(self, entries=()):
+        listings = {}
+        for symbol, name, exchange in entries:
+            symbol = symbol.strip().upper()
+            if symbol and SYMBOL_PATTERN.match(symbol):
+                listings[symbol] = ((name or '').strip(), (exchange or '').strip())
+
+        self._symbols = sorted(listings)
+        self._names = [listings[s][0] for s in self._symbols]
+        self._exchanges = [listings[s][1] for s in self._symbols]
+
+        name_keys = sorted((name.lower(), i) for i, name in enumerate(self._names) if name)
+        self._name_keys = [key for key, _ in name_keys]
+        self._name_refs = array('I', (i for _, i in name_keys))
+
+    @classmethod
+    def load(cls, path):
+        """Load a listing file.
+
+        Accepts the bundled ``symbol,name,exchange`` CSV as well as the
+        pipe-delimited NASDAQ Trader ``nasdaqlisted.txt``/``otherlisted.txt``
+        files, so the full exchange universe can be dropped in unchanged.
+        """
+        with open(path, newline='', encoding='utf-8') as f:
+            header = f.readline()
+            delimiter = '|' if '|' in header else ','
+            f.seek(0)
+            reader = csv.DictReader(f, delimiter=delimiter)
+            entries = []
+            for row in reader:
+                symbol = row.get('symbol') or row.get('Symbol') or row.get('ACT Symbol') or ''
+                if symbol.startswith('File Creation Time') or row.get('Test Issue') == 'Y':
+                    continue
+                name = row.get('name') or row.get('Security Name') or ''
+                exchange = row.get('exchange') or row.get('Exchange') or ('NASDAQ' if 'Market Category' in row else '')
+                entries.append((symbol.replace('$', '-'), name, exchange))
+        return cls(entries)
+
+    @classmethod
+    def load_default(cls):
+        path = os.getenv('SYMBOL_LISTING_PATH', DEFAULT_LISTING_PATH)
+        return cls.load(path)
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __iter__(self):
+        return iter(self._symbols)
+
+    def __contains__(self, symbol):
+        i = bisect.bisect_left(self._symbols, symbol)
+        return i < len(self._symbols) and self._symbols[i] == symbol
+
+    def _entry(self, i):
+        return {
+            "symbol": self._symbols[i],
+            "name": self._names[i],
+            "exchange": self._exchanges[i]
+        }
+
+    def get(self, symbol):
+        i = bisect.bisect_left(self._symbols, symbol)
+        if i < len(self._symbols) and self._symbols[i] == symbol:
+            return self._entry(i)
+        return None
+
+    def name_for(self, symbol):
+        entry = self.get(symbol)
+        return entry["name"] if entry else None
+
+    def search(self, prefix, limit=10):
+        """Return up to ``limit`` listings whose symbol or company name starts with ``prefix``.
+
+        Symbol matches come first, followed by company-name matches.
+        """
+        prefix = prefix.strip()
+        if not prefix or limit <= 0:
+            return []
+
+        matches = []
+        seen = set()
+
+        upper = prefix.upper()
+        i = bisect.bisect_left(self._symbols, upper)
+        while i < len(self._symbols) and len(matches) < limit and self._symbols[i].startswith(upper):
+            matches.append(self._entry(i))
+            seen.add(i)
+            i += 1
+
+        lower = prefix.lower()
+        j = bisect.bisect_left(self._name_keys, lower)
+        while j < len(self._name_keys) and len(matches) < limit and self._name_keys[j].startswith(lower):
+            ref = self._name_refs[j]
+            if ref not in seen:
+                matches.append(self._entry(ref))
+                seen.add(ref)
+            j += 1
+
+        return matches
@@ -43,7 +43,9 @@ Type=simple
 User=$USER
 WorkingDirectory=$APP_DIR
 Environment=PATH=$APP_DIR/venv/bin
-ExecStart=$APP_DIR/venv/bin/gunicorn --bind 0.0.0.0:8080 app:app
+Environment=CACHE_SNAPSHOT_INTERVAL=60
+ExecStart=$APP_DIR/venv/bin/gunicorn -c $APP_DIR/gunicorn.conf.py --bind 0.0.0.0:8080
+ExecReload=/bin/kill -s HUP \$MAINPID
 Restart=always
 RestartSec=3
 EnvironmentFile=$APP_DIR/.env
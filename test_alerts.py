@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the price-alert index, its SQLite store and the alert endpoints
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import patch, Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+from alerts import AlertEngine, SymbolAlerts, ABOVE, BELOW
+from database import AlertStore
+
+
+class SymbolAlertsTestCase(unittest.TestCase):
+    """Test cases for the per-symbol threshold index"""
+
+    def test_update_fires_only_crossed_thresholds(self):
+        """Test that a move fires the thresholds between the old and new price"""
+        alerts = SymbolAlerts()
+        for alert_id, threshold in enumerate([105, 110, 120], start=1):
+            alerts.add(alert_id, ABOVE, threshold)
+        alerts.add(4, BELOW, 90)
+        alerts.add(5, BELOW, 95)
+
+        self.assertEqual(alerts.update(100), [])
+        self.assertEqual(alerts.update(112), [1, 2])
+        self.assertEqual(alerts.update(94), [5])
+        self.assertEqual(len(alerts), 2)
+
+    def test_remove(self):
+        """Test that removal finds the right alert among equal thresholds"""
+        alerts = SymbolAlerts()
+        alerts.add(1, ABOVE, 200)
+        alerts.add(2, ABOVE, 200)
+        self.assertTrue(alerts.remove(2, ABOVE, 200))
+        self.assertFalse(alerts.remove(2, ABOVE, 200))
+        self.assertEqual(alerts.update(201), [1])
+
+
+class AlertEngineTestCase(unittest.TestCase):
+    """Test cases for persistence, immediate triggers and cross-worker delivery"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = AlertStore(os.path.join(self.tmpdir.name, 'alerts.db'))
+        self.sink = Mock()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_loaded_alerts_trigger_once(self):
+        """Test that alerts survive a restart and a crossing seen by two workers is delivered once"""
+        self.store.add_many([("AAPL", ABOVE, 200), ("AAPL", BELOW, 150), ("MSFT", ABOVE, 400)])
+        worker_a = AlertEngine(self.store, self.sink)
+        worker_b = AlertEngine(self.store, self.sink)
+        self.assertEqual(worker_a.load(), 3)
+        worker_b.load()
+
+        self.assertEqual(worker_a.on_quote("AAPL", 180), [])
+        events = worker_a.on_quote("AAPL", 205)
+        self.assertEqual([(e['symbol'], e['threshold'], e['triggered_price']) for e in events], [("AAPL", 200, 205)])
+        self.assertEqual(worker_b.on_quote("AAPL", 205), [])
+        self.sink.assert_called_once_with(events)
+        self.assertEqual(len(self.store.list_active()), 2)
+
+    def test_bulk_load_keeps_index_order(self):
+        """Test that loaded alerts fire level by level in both directions"""
+        self.store.add_many([("AAPL", ABOVE, t) for t in (220, 200, 210)] + [("AAPL", BELOW, t) for t in (140, 150)])
+        engine = AlertEngine(self.store, self.sink)
+        engine.load()
+
+        self.assertEqual([e['threshold'] for e in engine.on_quote("AAPL", 205)], [200])
+        self.assertEqual([e['threshold'] for e in engine.on_quote("AAPL", 215)], [210])
+        self.assertEqual([e['threshold'] for e in engine.on_quote("AAPL", 145)], [150])
+        self.assertEqual(len(engine), 2)
+
+    def test_satisfied_alert_fires_on_add(self):
+        """Test that an alert already met by the last price fires immediately"""
+        engine = AlertEngine(self.store, self.sink)
+        engine.on_quote("AAPL", 190)
+        self.assertIsNone(engine.add("AAPL", ABOVE, 200)['triggered_at'])
+        self.assertEqual(engine.add("AAPL", BELOW, 195)['triggered_price'], 190)
+        self.assertEqual(len(engine), 1)
+
+    def test_alerts_from_other_workers_are_synced(self):
+        """Test that alerts added elsewhere are indexed on the next sync"""
+        engine = AlertEngine(self.store, self.sink, sync_interval=0)
+        engine.load()
+        AlertEngine(self.store, self.sink).add("AAPL", ABOVE, 200)
+        self.assertEqual(len(engine.on_quote("AAPL", 201)), 1)
+
+    def test_removed_alert_does_not_fire(self):
+        """Test that a deleted alert is dropped from the index"""
+        engine = AlertEngine(self.store, self.sink)
+        alert = engine.add("AAPL", ABOVE, 200)
+        self.assertEqual(engine.remove(alert['id'])['id'], alert['id'])
+        self.assertIsNone(engine.remove(alert['id']))
+        self.assertEqual(engine.on_quote("AAPL", 210), [])
+
+
+class AlertEndpointTestCase(unittest.TestCase):
+    """Test cases for /api/alerts and evaluation on quote refresh"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        app_module.cache.clear()
+        app_module.reset_circuits()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sink = Mock()
+        engine = AlertEngine(AlertStore(os.path.join(self.tmpdir.name, 'alerts.db')), self.sink)
+        self.patch = patch.object(app_module, 'alert_engine', engine, create=True)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmpdir.cleanup()
+
+    @patch('app.session')
+    def test_quote_refresh_triggers_alert(self, mock_session):
+        """Test that a created alert fires when a fetched quote crosses it"""
+        response = self.client.post('/api/alerts', json={'symbol': 'aapl', 'direction': 'above', 'threshold': 200})
+        self.assertEqual(response.status_code, 201)
+        alert_id = json.loads(response.data)['id']
+
+        mock_response = Mock()
+        mock_response.json.return_value = {"Global Quote": {"01. symbol": "AAPL", "05. price": "201.50"}}
+        mock_session.get.return_value = mock_response
+        self.client.get('/api/stock/AAPL')
+
+        events = self.sink.call_args[0][0]
+        self.assertEqual([e['id'] for e in events], [alert_id])
+        self.assertEqual(json.loads(self.client.get('/api/alerts?symbol=AAPL').data)['alerts'], [])
+
+    def test_validation_and_delete(self):
+        """Test that malformed alerts are rejected and unknown ids return 404"""
+        response = self.client.post('/api/alerts', json={'symbol': 'AAPL', 'direction': 'sideways', 'threshold': 1})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/alerts', json={'symbol': 'AAPL', 'direction': 'below', 'threshold': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+        alert_id = json.loads(self.client.post(
+            '/api/alerts', json={'symbol': 'AAPL', 'direction': 'below', 'threshold': 150}).data)['id']
+        self.assertEqual(self.client.delete(f'/api/alerts/{alert_id}').status_code, 200)
+        self.assertEqual(self.client.delete(f'/api/alerts/{alert_id}').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -14,6 +14,7 @@ from io import StringIO
 # Add the current directory to the path so we can import app
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import app as app_module
 from app import app
 
 class StockMarketAppTestCase(unittest.TestCase):
@@ -456,6 +457,99 @@ class IntegrationTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
 
 
+class AppFactoryTestCase(unittest.TestCase):
+    """Test cases for the application factory"""
+
+    def test_apps_have_isolated_caches(self):
+        """Test that each created app gets its own cache"""
+        first = app_module.create_app({'TESTING': True})
+        second = app_module.create_app({'TESTING': True})
+
+        with first.app_context():
+            app_module.cache.set('stock_TEST', {'symbol': 'TEST'})
+        with second.app_context():
+            self.assertIsNone(app_module.cache.get('stock_TEST'))
+        with first.app_context():
+            self.assertEqual(app_module.cache.get('stock_TEST'), {'symbol': 'TEST'})
+
+    def test_routes_registered(self):
+        """Test that a fresh app serves the API routes"""
+        client = app_module.create_app({'TESTING': True}).test_client()
+        response = client.get('/api/symbols?prefix=AAP')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('AAPL', [s['symbol'] for s in json.loads(response.data)['symbols']])
+
+    def test_missing_keys_rejected(self):
+        """Test that building an app without API keys fails fast"""
+        with patch.object(app_module, 'NEWS_API_KEY', None):
+            with self.assertRaises(ValueError):
+                app_module.create_app()
+
+
+class IndexSnapshotTestCase(unittest.TestCase):
+    """Test cases for the server-rendered market snapshot on the index page"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        app_module.cache.clear()
+
+    @patch('app.session')
+    def test_cached_data_inlined_without_upstream(self, mock_session):
+        """Test that cached quotes and news are rendered into the page from cache only"""
+        app_module.cache.set('stock_AAPL', {"symbol": "AAPL", "price": "190.00", "change": "-1.20", "volume": "100"})
+        app_module.cache.set('general_news', [{"title": "Markets <rally>", "description": "", "url": "https://e.com/1",
+                                              "publishedAt": "2024-01-05T14:32:00Z"}])
+
+        html = self.client.get('/').data.decode('utf-8')
+
+        self.assertIn('<td>190.00</td>', html)
+        self.assertIn('class="negative"', html)
+        self.assertIn('Markets &lt;rally&gt;', html)
+        self.assertIn('value="AAPL"', html)
+        mock_session.get.assert_not_called()
+
+    def test_render_cached_per_snapshot_version(self):
+        """Test that the page revalidates by version and changes when the snapshot does"""
+        first = self.client.get('/')
+        self.assertEqual(self.client.get('/', headers={'If-None-Match': first.headers['ETag']}).status_code, 304)
+
+        app_module.cache.set('stock_MSFT', {"symbol": "MSFT", "price": "300.00", "change": "1.00", "volume": "100"})
+        second = self.client.get('/', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(second.status_code, 200)
+        self.assertIn(b'<td>300.00</td>', second.data)
+
+        with patch('app.render_template') as mock_render:
+            self.client.get('/')
+        mock_render.assert_not_called()
+
+
+class ClientCacheTestCase(unittest.TestCase):
+    """Test cases for the per-symbol results the browser caches"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        app_module.cache.clear()
+        app_module.cache.set('stock_AAPL', {"symbol": "AAPL", "price": "190.00", "change": "1.00", "volume": "100"})
+        app_module.cache.set('news_AAPL', [{"title": "Apple news", "url": "https://e.com/aapl"}])
+
+    def test_symbol_news_and_max_age(self):
+        """Test that per-symbol news is returned on request along with a client max-age"""
+        response = self.client.post('/get_stock_data', json={'symbols': 'AAPL', 'symbol_news': True})
+        data = json.loads(response.data)
+
+        self.assertEqual(data['symbol_news']['AAPL'][0]['title'], 'Apple news')
+        self.assertEqual(response.headers['Cache-Control'], f'private, max-age={app_module.CLIENT_CACHE_MAX_AGE}')
+        self.assertNotIn('symbol_news', json.loads(self.client.post('/get_stock_data', json={'symbols': 'AAPL'}).data))
+
+    def test_max_age_disabled(self):
+        """Test that CLIENT_CACHE_MAX_AGE=0 leaves responses uncacheable by the browser"""
+        with patch.object(app_module, 'CLIENT_CACHE_MAX_AGE', 0):
+            response = self.client.post('/get_stock_data', json={'symbols': 'AAPL'})
+        self.assertNotIn('Cache-Control', response.headers)
+
+
 if __name__ == '__main__':
     # Run the tests
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for fingerprinted, precompressed static assets
+"""
+
+import unittest
+import gzip
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app
+from assets import StaticAssets, minify_css, minify_js
+
+
+class MinifyTestCase(unittest.TestCase):
+    """Test cases for the built-in minifiers"""
+
+    def test_minify_css(self):
+        """Test that comments and whitespace go while selector semantics stay"""
+        css = "/* header */\nbody {\n    margin: 0;\n    font-family: 'Segoe UI', sans-serif;\n}\na :hover { color: red; }\n"
+        self.assertEqual(minify_css(css), "body{margin:0;font-family:'Segoe UI',sans-serif}a :hover{color:red}")
+
+    def test_minify_js_keeps_line_breaks(self):
+        """Test that JS keeps statement line breaks but drops indentation and comments"""
+        js = "// setup\nconst a = 1\n\n    const b = a + 1\n/* note */\n"
+        self.assertEqual(minify_js(js), "const a = 1\nconst b = a + 1")
+
+    def test_hash_follows_content(self):
+        """Test that a changed file gets a new fingerprinted name"""
+        with tempfile.TemporaryDirectory() as static:
+            os.makedirs(os.path.join(static, 'css'))
+            path = os.path.join(static, 'css', 'site.css')
+            with open(path, 'w') as f:
+                f.write("body { margin: 0; }")
+            first = StaticAssets.build(static)['css/site.css'].url
+            with open(path, 'w') as f:
+                f.write("body { margin: 1px; }")
+            second = StaticAssets.build(static)['css/site.css'].url
+        self.assertRegex(first, r'^css/site\.[0-9a-f]{12}\.css$')
+        self.assertNotEqual(first, second)
+
+
+class StaticAssetsTestCase(unittest.TestCase):
+    """Test cases for serving fingerprinted assets"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+    def asset_urls(self):
+        html = self.client.get('/').data.decode()
+        return re.findall(r'(?:href|src)="(/static/[^"]+)"', html)
+
+    def test_page_links_fingerprinted_assets(self):
+        """Test that the page references content-hashed CSS and JS"""
+        urls = self.asset_urls()
+        self.assertEqual(len(urls), 2)
+        self.assertTrue(all(re.search(r'\.[0-9a-f]{12}\.(css|js)$', url) for url in urls))
+
+    def test_immutable_precompressed_response(self):
+        """Test long-lived caching, gzip negotiation and conditional requests"""
+        url = next(u for u in self.asset_urls() if u.endswith('.css'))
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertTrue(gzip.decompress(response.data).startswith(b'body{'))
+
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url)
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_unversioned_paths_still_served(self):
+        """Test that the original static paths keep working"""
+        response = self.client.get('/static/js/main.js')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response.headers.get('Cache-Control', ''))
+        response.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
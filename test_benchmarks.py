@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark tooling (mock upstream and result comparison)
+"""
+
+import unittest
+import os
+import sys
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.mock_upstream import MockUpstream
+from benchmarks.results import percentile, compare
+from benchmarks.replay_logs import parse_line, build_plan, summarize_log
+
+
+class MockUpstreamTestCase(unittest.TestCase):
+    """Test cases for the mock Alpha Vantage/NewsAPI server"""
+
+    def setUp(self):
+        self.mock = MockUpstream("fast", latency_ms=0, jitter_ms=0).start()
+
+    def tearDown(self):
+        self.mock.stop()
+
+    def test_serves_quotes_and_news(self):
+        """Test that both upstream shapes are served and counted"""
+        quote = requests.get(f"{self.mock.url}/query?function=GLOBAL_QUOTE&symbol=AAPL", timeout=5).json()
+        self.assertEqual(quote["Global Quote"]["01. symbol"], "AAPL")
+
+        news = requests.get(f"{self.mock.url}/v2/everything?q=(AAPL OR \"Apple\") stock&pageSize=4", timeout=5).json()
+        self.assertEqual(news["status"], "ok")
+        self.assertEqual(len(news["articles"]), 4)
+
+        stats = self.mock.stats()
+        self.assertEqual(stats["alpha_vantage"]["calls"], 1)
+        self.assertEqual(stats["news_api"]["calls"], 1)
+
+    def test_throttle_profile(self):
+        """Test that the per-minute limit returns Alpha Vantage's throttle note"""
+        self.mock.profile["calls_per_minute"] = 1
+        requests.get(f"{self.mock.url}/query?symbol=AAPL", timeout=5)
+        throttled = requests.get(f"{self.mock.url}/query?symbol=AAPL", timeout=5).json()
+
+        self.assertIn("Note", throttled)
+        self.assertEqual(self.mock.stats()["alpha_vantage"]["throttled"], 1)
+
+
+class ResultComparisonTestCase(unittest.TestCase):
+    """Test cases for percentile and regression helpers"""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_regression_detection(self):
+        """Test that slower latency and lower throughput are flagged"""
+        rows = compare({"p95_ms": 120, "rps": 80}, {"p95_ms": 100, "rps": 100},
+                       {"p95_ms": "lower", "rps": "higher"}, threshold=0.1)
+        self.assertTrue(all(row[4] for row in rows))
+
+
+
+HAPROXY_LINE = ('Jan 15 10:00:01 lb haproxy[1234]: 10.0.0.5:51234 [15/Jan/2024:10:00:01.250] '
+                'stock_app_frontend stock_app_servers/web01 0/0/1/42/43 200 512 - - ---- 3/3/1/1/0 0/0 '
+                '{example.com|curl/8.0} {HIT} "GET /api/stock/AAPL HTTP/1.1"')
+NGINX_LINE = ('10.0.0.6 - - [15/Jan/2024:10:00:03 +0000] "POST /get_stock_data HTTP/1.1" 200 2048 "-" '
+              '"Mozilla/5.0" 0.180 "PARTIAL"')
+
+
+class AccessLogReplayTestCase(unittest.TestCase):
+    """Test cases for access log parsing and replay planning"""
+
+    def test_parse_haproxy_line(self):
+        """Test that HAProxy httplog timers and captured X-Cache are extracted"""
+        entry = parse_line(HAPROXY_LINE)
+        self.assertEqual(entry["group"], "api_stock")
+        self.assertEqual(entry["symbol"], "AAPL")
+        self.assertEqual(entry["latency_ms"], 43.0)
+        self.assertEqual(entry["cache"], "HIT")
+
+    def test_parse_nginx_line(self):
+        """Test that nginx combined lines with request time are extracted"""
+        entry = parse_line(NGINX_LINE)
+        self.assertEqual(entry["group"], "get_stock_data")
+        self.assertEqual(entry["method"], "POST")
+        self.assertAlmostEqual(entry["latency_ms"], 180.0)
+        self.assertEqual(entry["cache"], "PARTIAL")
+
+    def test_other_paths_skipped(self):
+        """Test that static files and the index page are not replayed"""
+        line = NGINX_LINE.replace("POST /get_stock_data", "GET /static/js/main.js")
+        self.assertIsNone(parse_line(line))
+
+    def test_plan_keeps_spacing_and_symbols(self):
+        """Test that offsets are scaled by speed and POST bodies use observed symbols"""
+        entries = [parse_line(HAPROXY_LINE), parse_line(NGINX_LINE)]
+        plan = build_plan(entries, speed=2.0)
+        self.assertEqual(plan[0][0], 0.0)
+        self.assertAlmostEqual(plan[1][0], 0.875)
+        self.assertEqual(plan[1][4], {"symbols": "AAPL"})
+
+        summary = summarize_log(entries)
+        self.assertEqual(summary["all"]["count"], 2)
+        self.assertEqual(summary["api_stock"]["hit_ratio"], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
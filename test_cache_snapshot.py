@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for cache snapshots used to warm restarted workers
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_caching import Cache
+
+from cache_snapshot import CacheSnapshot
+from database import StockDataCache
+
+
+def make_app():
+    app = Flask(__name__)
+    cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 300})
+    return app, cache
+
+
+class CacheSnapshotTestCase(unittest.TestCase):
+    """Test cases for CacheSnapshot and the StockDataCache snapshot table"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = StockDataCache(os.path.join(self.tmpdir.name, 'test.db'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_restart_loads_valid_entries(self):
+        """Test that a new cache is warmed with snapshotted entries and their remaining TTL"""
+        app, cache = make_app()
+        snapshot = CacheSnapshot(app, cache, self.store, interval=0)
+        with app.app_context():
+            cache.set('stock_AAPL', {'symbol': 'AAPL', 'price': '190.00'})
+            cache.set('general_news', [{'title': 'Markets rally'}], timeout=120)
+        snapshot.track('stock_AAPL')
+        snapshot.track('general_news', 120)
+        snapshot.track('stock_EVICTED')
+        self.assertEqual(snapshot.write(), 2)
+
+        new_app, new_cache = make_app()
+        self.assertEqual(CacheSnapshot(new_app, new_cache, self.store, interval=0).load(), 2)
+        with new_app.app_context():
+            self.assertEqual(new_cache.get('stock_AAPL'), {'symbol': 'AAPL', 'price': '190.00'})
+            self.assertEqual(new_cache.get('general_news'), [{'title': 'Markets rally'}])
+
+    def test_expired_entries_skipped(self):
+        """Test that entries past their expiry are neither loaded nor kept"""
+        now = time.time()
+        self.store.save_snapshot([
+            ('stock_OLD', {'symbol': 'OLD'}, now - 600, now - 300),
+            ('stock_NEW', {'symbol': 'NEW'}, now, now + 300),
+        ])
+        self.assertEqual([key for key, _, _ in self.store.iter_snapshot()], ['stock_NEW'])
+
+    def test_tracking_is_bounded(self):
+        """Test that only the most recently set keys are snapshotted"""
+        app, cache = make_app()
+        snapshot = CacheSnapshot(app, cache, self.store, interval=0, max_entries=2)
+        with app.app_context():
+            for symbol in ('AAPL', 'MSFT', 'TSLA'):
+                cache.set(f'stock_{symbol}', {'symbol': symbol})
+                snapshot.track(f'stock_{symbol}')
+
+        snapshot.write()
+        self.assertEqual({key for key, _, _ in self.store.iter_snapshot()}, {'stock_MSFT', 'stock_TSLA'})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
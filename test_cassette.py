@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for upstream record/replay cassettes
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cassette
+from benchmarks.mock_upstream import MockUpstream
+
+
+class CassetteTestCase(unittest.TestCase):
+    """Test cases for RecordingAdapter and ReplayAdapter"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'upstream.jsonl')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def record(self, *urls):
+        mock = MockUpstream("fast", latency_ms=30, jitter_ms=0).start()
+        try:
+            session = requests.Session()
+            cassette.install(session, "record", self.path)
+            return mock.url, [session.get(mock.url + url, timeout=5).json() for url in urls]
+        finally:
+            mock.stop()
+
+    def test_record_redacts_api_keys(self):
+        """Test that recorded exchanges never contain API keys"""
+        self.record("/query?function=GLOBAL_QUOTE&symbol=AAPL&apikey=SECRET123")
+
+        with open(self.path) as f:
+            interaction = json.loads(f.readline())
+        self.assertNotIn("SECRET123", interaction["url"])
+        self.assertEqual(interaction["status"], 200)
+        self.assertGreater(interaction["elapsed_ms"], 0)
+
+    def test_replay_offline_with_scaled_latency(self):
+        """Test that replay serves recorded bodies without the upstream running"""
+        base_url, live = self.record("/query?function=GLOBAL_QUOTE&symbol=AAPL&apikey=a",
+                                     "/v2/everything?q=AAPL&from=2024-01-01T00:00:00Z&apiKey=a")
+
+        session = requests.Session()
+        adapter = cassette.install(session, "replay", self.path, latency_scale=0)
+        self.assertEqual(len(adapter), 2)
+
+        start = time.perf_counter()
+        quote = session.get(f"{base_url}/query?function=GLOBAL_QUOTE&symbol=AAPL&apikey=other", timeout=5).json()
+        news = session.get(f"{base_url}/v2/everything?q=AAPL&from=2024-06-01T00:00:00Z&apiKey=b", timeout=5).json()
+        self.assertLess(time.perf_counter() - start, 0.03)
+
+        self.assertEqual(quote, live[0])
+        self.assertEqual(news, live[1])
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            session.get(f"{base_url}/query?function=GLOBAL_QUOTE&symbol=MSFT", timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for consistent-hash symbol ownership and cross-node forwarding
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from collections import Counter
+from unittest.mock import patch, Mock
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+from cluster import HashRing, Cluster, FORWARDED_HEADER
+from database import NewsArticleStore
+from news import NewsIngestor
+
+NODES = ["web01:8080", "web02:8080"]
+SYMBOLS = [f"S{i:04d}" for i in range(2000)]
+
+
+class HashRingTestCase(unittest.TestCase):
+    """Test cases for ring placement"""
+
+    def test_placement_is_stable(self):
+        """Test that placement depends only on node names, not their order"""
+        ring = HashRing(NODES)
+        self.assertEqual([ring.node_for(s) for s in SYMBOLS],
+                         [HashRing(list(reversed(NODES))).node_for(s) for s in SYMBOLS])
+        self.assertEqual(ring.node_for("AAPL"), "web02:8080")
+        self.assertEqual(ring.node_for("GOOGL"), "web01:8080")
+
+    def test_adding_a_node_only_moves_keys_to_it(self):
+        """Test that growing the cluster keeps other nodes' symbols where they were"""
+        before = HashRing(NODES)
+        after = HashRing(NODES + ["web03:8080"])
+        moved = [s for s in SYMBOLS if before.node_for(s) != after.node_for(s)]
+
+        self.assertTrue(all(after.node_for(s) == "web03:8080" for s in moved))
+        self.assertLess(len(moved), len(SYMBOLS) / 2)
+
+        shares = Counter(after.node_for(s) for s in SYMBOLS)
+        self.assertGreater(min(shares.values()), len(SYMBOLS) / 6)
+
+    def test_group_keeps_input_order(self):
+        """Test that symbols are grouped by owner in request order"""
+        groups = HashRing(NODES).group(["AAPL", "GOOGL", "MSFT", "AMZN"])
+        self.assertEqual(groups, {"web02:8080": ["AAPL", "MSFT"], "web01:8080": ["GOOGL", "AMZN"]})
+
+    def test_from_env(self):
+        """Test that a single node needs no cluster and an unknown node id is rejected"""
+        with patch.dict(os.environ, {"CLUSTER_NODES": "web01:8080"}):
+            self.assertIsNone(Cluster.from_env())
+        with patch.dict(os.environ, {"CLUSTER_NODES": ",".join(NODES), "CLUSTER_NODE_ID": "web09:8080"}):
+            with self.assertRaises(ValueError):
+                Cluster.from_env()
+
+
+def upstream_response(url, **kwargs):
+    response = Mock()
+    if "GLOBAL_QUOTE" in url:
+        symbol = url.split("symbol=")[1].split("&")[0]
+        response.json.return_value = {"Global Quote": {"01. symbol": symbol, "05. price": "100.00"}}
+    else:
+        response.json.return_value = {"status": "ok", "articles": []}
+    return response
+
+
+class ClusterForwardingTestCase(unittest.TestCase):
+    """Test cases for routing requests to the owning node"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        app_module.cache.clear()
+        app_module.reset_circuits()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        store = NewsArticleStore(os.path.join(self.tmpdir.name, 'test.db'))
+        self.cluster_session = Mock()
+        self.patches = [
+            patch.object(app_module, 'cluster', Cluster(NODES, "web01:8080")),
+            patch.object(app_module, 'cluster_session', self.cluster_session, create=True),
+            patch.object(app_module, 'article_store', store),
+            patch.object(app_module, 'news_ingestor', NewsIngestor(store, app_module.fetch_news_articles)),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmpdir.cleanup()
+
+    @patch('app.session')
+    def test_multi_symbol_request_fans_out(self, mock_session):
+        """Test that remote-owned symbols are fetched by their owner and merged in order"""
+        mock_session.get.side_effect = upstream_response
+        remote = Mock()
+        remote.json.return_value = {"cluster": {
+            "quotes": {"AAPL": {"symbol": "AAPL", "price": "190.00"}},
+            "news": {"AAPL": []},
+            "errors": []
+        }}
+        self.cluster_session.post.return_value = remote
+
+        response = self.client.post('/get_stock_data', json={'symbols': 'AAPL,GOOGL'})
+        data = json.loads(response.data)
+
+        self.assertEqual([q['symbol'] for q in data['stock_data']], ['AAPL', 'GOOGL'])
+        self.assertNotIn('cluster', data)
+        url = self.cluster_session.post.call_args[0][0]
+        self.assertEqual(url, 'http://web02:8080/get_stock_data')
+        self.assertEqual(self.cluster_session.post.call_args[1]['json'], {'symbols': 'AAPL'})
+        self.assertFalse(any('AAPL' in call[0][0] for call in mock_session.get.call_args_list))
+
+    @patch('app.session')
+    def test_unreachable_owner_is_served_locally(self, mock_session):
+        """Test that symbols fall back to this node when their owner is down"""
+        mock_session.get.side_effect = upstream_response
+        self.cluster_session.post.side_effect = requests.exceptions.ConnectionError("refused")
+        self.cluster_session.get.side_effect = requests.exceptions.ConnectionError("refused")
+
+        data = json.loads(self.client.post('/get_stock_data', json={'symbols': 'AAPL,GOOGL'}).data)
+        self.assertEqual([q['symbol'] for q in data['stock_data']], ['AAPL', 'GOOGL'])
+
+        response = self.client.get('/api/stock/AAPL')
+        self.assertEqual(json.loads(response.data)['symbol'], 'AAPL')
+
+    @patch('app.session')
+    def test_single_symbol_proxied_once(self, mock_session):
+        """Test that non-owners proxy single-symbol requests and owners never re-forward"""
+        remote = Mock(status_code=200, content=b'{"symbol": "AAPL"}',
+                      headers={"Content-Type": "application/json", "X-Cache": "HIT"})
+        self.cluster_session.get.return_value = remote
+
+        response = self.client.get('/api/stock/AAPL')
+        self.assertEqual(response.headers['X-Cluster-Node'], 'web02:8080')
+        self.assertEqual(response.headers['X-Cache'], 'HIT')
+        self.assertEqual(self.cluster_session.get.call_args[0][0], 'http://web02:8080/api/stock/AAPL')
+        mock_session.get.assert_not_called()
+        self.assertEqual(json.loads(self.client.get('/api/cluster/owner/aapl').data),
+                         {"symbol": "AAPL", "node": "web02:8080", "local": False})
+
+        mock_session.get.side_effect = upstream_response
+        self.client.get('/api/stock/AAPL', headers={FORWARDED_HEADER: 'web02:8080'})
+        self.assertEqual(self.cluster_session.get.call_count, 1)
+        self.assertEqual(mock_session.get.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite persistence layer
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch, Mock
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+from database import NewsArticleStore
+from news import NewsIngestor
+
+
+def article(title, url, description="", published_at="2023-01-01T00:00:00Z"):
+    return {"title": title, "description": description, "url": url, "publishedAt": published_at}
+
+
+class NewsArticleStoreTestCase(unittest.TestCase):
+    """Test cases for NewsArticleStore"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = NewsArticleStore(os.path.join(self.tmpdir.name, 'test.db'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_deduplicates_by_url_and_content(self):
+        """Test that re-fetched and syndicated copies are stored once"""
+        added = self.store.save_articles([
+            article("Apple beats earnings", "https://example.com/apple/"),
+            article("Apple beats earnings", "HTTPS://EXAMPLE.COM/apple"),
+            article("Apple Beats Earnings!", "https://mirror.example.org/apple"),
+            article("[Removed]", "https://removed.example.com"),
+        ])
+        self.assertEqual(added, 1)
+
+        added = self.store.save_articles([article("Apple beats earnings", "https://example.com/apple")])
+        self.assertEqual(added, 0)
+
+    def test_articles_without_url_kept_apart(self):
+        """Test that distinct articles with no URL are each stored and linked to their own symbols"""
+        added = self.store.save_articles([article("Fed holds rates", None, "Powell speaks")], ["SPY"])
+        added += self.store.save_articles([article("Oil prices slip", None, "OPEC output")], ["XOM"])
+        added += self.store.save_articles([article("Oil prices slip", None, "OPEC output")], ["CVX"])
+
+        self.assertEqual(added, 2)
+        self.assertEqual([a["title"] for a in self.store.search("oil")], ["Oil prices slip"])
+        self.assertEqual([a["title"] for a in self.store.search("", symbol="SPY")], ["Fed holds rates"])
+        self.assertEqual([a["title"] for a in self.store.search("", symbol="CVX")], ["Oil prices slip"])
+
+    def test_full_text_search_with_symbol_filter(self):
+        """Test searching titles/descriptions and filtering by symbol"""
+        self.store.save_articles([article("Apple unveils headset", "u1", "Vision hardware")], ["AAPL"])
+        self.store.save_articles([article("Microsoft cloud growth", "u2", "Azure hardware demand")], ["MSFT"])
+
+        self.assertTrue(self.store.fts_enabled)
+        self.assertEqual({a["url"] for a in self.store.search("hardware")}, {"u1", "u2"})
+        self.assertEqual([a["url"] for a in self.store.search("hardware", symbol="MSFT")], ["u2"])
+        self.assertEqual([a["url"] for a in self.store.search("", symbol="AAPL")], ["u1"])
+        self.assertEqual(self.store.search("banana"), [])
+
+    def test_like_fallback_without_fts(self):
+        """Test that search still works when SQLite lacks FTS5"""
+        self.store.save_articles([article("Tesla deliveries rise", "u1")])
+        self.store.fts_enabled = False
+
+        self.assertEqual([a["url"] for a in self.store.search("deliveries")], ["u1"])
+
+
+class NewsSearchEndpointTestCase(unittest.TestCase):
+    """Test cases for /api/news/search"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        app_module.cache.clear()
+        app_module.reset_circuits()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = NewsArticleStore(os.path.join(self.tmpdir.name, 'test.db'))
+        self.patches = [
+            patch.object(app_module, 'article_store', self.store),
+            patch.object(app_module, 'news_ingestor', NewsIngestor(self.store, app_module.fetch_news_articles)),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmpdir.cleanup()
+
+    @patch('app.session')
+    def test_fresh_local_results_skip_upstream(self, mock_session):
+        """Test that enough fresh local matches are served without NewsAPI"""
+        now = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        self.store.save_articles([article(f"Fed decision {i}", f"u{i}", published_at=now) for i in range(3)])
+
+        response = self.client.get('/api/news/search?q=fed&limit=3')
+        data = json.loads(response.data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(data['articles']), 3)
+        self.assertEqual(data['source'], 'local')
+        mock_session.get.assert_not_called()
+
+    @patch('app.session')
+    def test_thin_results_top_up_once(self, mock_session):
+        """Test that thin local results trigger a single NewsAPI top-up per interval"""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "status": "ok",
+            "articles": [article("Fed holds rates steady", "https://example.com/fed")]
+        }
+        mock_session.get.return_value = mock_response
+
+        response = self.client.get('/api/news/search?q=fed')
+        data = json.loads(response.data)
+        self.assertEqual(data['source'], 'local+upstream')
+        self.assertEqual(data['articles'][0]['title'], 'Fed holds rates steady')
+
+        response = self.client.get('/api/news/search?q=fed')
+        data = json.loads(response.data)
+        self.assertEqual(data['source'], 'local')
+        self.assertEqual(mock_session.get.call_count, 1)
+
+    @patch('app.session')
+    def test_search_text_cannot_inject_parameters(self, mock_session):
+        """Test that '&' and '#' in the search text stay inside NewsAPI's q"""
+        mock_response = Mock()
+        mock_response.json.return_value = {"status": "ok", "articles": []}
+        mock_session.get.return_value = mock_response
+
+        self.client.get('/api/news/search', query_string={'q': 'M&A&sortBy=popularity #fed'})
+
+        params = parse_qs(urlparse(mock_session.get.call_args[0][0]).query)
+        self.assertEqual(params['q'], ['M&A&sortBy=popularity #fed'])
+        self.assertEqual(params['sortBy'], ['publishedAt'])
+        self.assertEqual(params['apiKey'], [app_module.NEWS_API_KEY])
+
+    def test_missing_query(self):
+        """Test that a search without query or symbol is rejected"""
+        response = self.client.get('/api/news/search')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
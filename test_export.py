@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming bulk export of quote history and news
+"""
+
+import unittest
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+from database import NewsArticleStore, QuoteHistoryStore
+from export import DATASETS, ExportError, encode, parse_time
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+JAN_2 = 1704153600.0  # 2024-01-02T00:00:00Z
+
+
+class EncodeTestCase(unittest.TestCase):
+    """Test cases for batch-at-a-time encoding"""
+
+    def test_rows_pulled_one_batch_per_chunk(self):
+        """Test that encoding reads no further ahead than the chunk being sent"""
+        pulled = []
+
+        def rows():
+            for i in range(25):
+                pulled.append(i)
+                yield "AAPL", JAN_2 + i, 100.0 + i, None
+
+        chunks = encode(rows(), DATASETS["quotes"], "csv", batch_size=10)
+        self.assertEqual(next(chunks), b"symbol,time,price,volume\r\n")
+        self.assertEqual(next(chunks).decode().splitlines()[0], "AAPL,2024-01-02T00:00:00Z,100.0,")
+        self.assertLessEqual(len(pulled), 11)
+        self.assertEqual(len(list(chunks)), 2)
+
+    def test_jsonl_and_bad_requests(self):
+        """Test JSON Lines output and rejected formats and times"""
+        chunks = list(encode([("AAPL", JAN_2, 190.5, 1200)], DATASETS["quotes"], "jsonl"))
+        self.assertEqual(json.loads(b"".join(chunks)),
+                         {"symbol": "AAPL", "time": "2024-01-02T00:00:00Z", "price": 190.5, "volume": 1200})
+        self.assertEqual(parse_time("2024-01-02"), JAN_2)
+        self.assertEqual(parse_time("2024-01-01T19:00:00-05:00"), JAN_2)
+        with self.assertRaises(ExportError):
+            encode([], DATASETS["quotes"], "xlsx")
+        with self.assertRaises(ExportError):
+            parse_time("last tuesday")
+
+    @unittest.skipUnless(pyarrow, "pyarrow not installed")
+    def test_arrow_and_parquet_round_trip(self):
+        """Test that Arrow and Parquet exports read back with their types"""
+        import pyarrow.parquet
+        rows = [("AAPL", JAN_2 + i, 100.0 + i, i) for i in range(30)]
+        stream = b"".join(encode(rows, DATASETS["quotes"], "arrow", batch_size=8))
+        table = pyarrow.ipc.open_stream(stream).read_all()
+        self.assertEqual(table.num_rows, 30)
+        self.assertEqual(str(table.schema.field("time").type), "timestamp[ms, tz=UTC]")
+        parquet = b"".join(encode(rows, DATASETS["quotes"], "parquet"))
+        self.assertEqual(pyarrow.parquet.read_table(io.BytesIO(parquet)).column("volume").to_pylist(), list(range(30)))
+
+
+class ExportEndpointTestCase(unittest.TestCase):
+    """Test cases for /api/export/<dataset>"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmpdir.name, 'export.db')
+        self.history = QuoteHistoryStore(db_path)
+        self.articles = NewsArticleStore(db_path)
+        self.patches = [patch.object(app_module, 'quote_history', self.history, create=True),
+                        patch.object(app_module, 'article_store', self.articles, create=True)]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmpdir.cleanup()
+
+    def test_quotes_filtered_by_symbol_and_range(self):
+        """Test that only the requested symbols and [start, end) are streamed, in order"""
+        for day in range(5):
+            for symbol in ("MSFT", "AAPL"):
+                self.history.record(symbol, 100.0 + day, 1000 * day, ts=JAN_2 + day * 86400)
+
+        with patch.object(app_module, 'EXPORT_BATCH_SIZE', 2):
+            response = self.client.get('/api/export/quotes?symbols=aapl&start=2024-01-03&end=2024-01-05')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Disposition'], 'attachment; filename="quotes.csv"')
+        self.assertEqual(response.data.decode().splitlines(), [
+            "symbol,time,price,volume",
+            "AAPL,2024-01-03T00:00:00Z,101.0,1000",
+            "AAPL,2024-01-04T00:00:00Z,102.0,2000",
+        ])
+
+    def test_news_linked_to_symbols_once(self):
+        """Test that an article linked to several requested symbols is exported once"""
+        self.articles.save_articles([{"title": "Big tech rallies", "url": "https://example.com/1",
+                                      "publishedAt": "2024-01-03T10:00:00Z"}], symbols=["AAPL", "MSFT"])
+        self.articles.save_articles([{"title": "Oil slips", "url": "https://example.com/2",
+                                      "publishedAt": "2024-01-03T11:00:00Z"}], symbols=["XOM"])
+
+        response = self.client.get('/api/export/news?symbols=AAPL,MSFT&format=jsonl')
+
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual([line["title"] for line in lines], ["Big tech rallies"])
+        self.assertEqual(response.content_type, "application/x-ndjson")
+
+    def test_rejected_exports(self):
+        """Test unknown datasets, missing pyarrow and the per-worker export limit"""
+        self.assertEqual(self.client.get('/api/export/trades').status_code, 400)
+        with patch.dict(sys.modules, {"pyarrow": None}):
+            response = self.client.get('/api/export/bars?format=parquet')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("pyarrow", json.loads(response.data)["error"])
+
+        with patch.object(app_module, 'export_slots', threading.BoundedSemaphore(1)):
+            running = self.client.get('/api/export/quotes', buffered=False)
+            response = self.client.get('/api/export/quotes')
+            self.assertEqual((response.status_code, response.headers['Retry-After']), (503, "5"))
+            running.close()
+            self.assertEqual(self.client.get('/api/export/quotes').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
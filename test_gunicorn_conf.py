@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the gunicorn profile and worker fork hooks
+"""
+
+import unittest
+import os
+import runpy
+import sys
+from unittest.mock import patch, Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+
+
+class GunicornConfigTestCase(unittest.TestCase):
+    """Test cases for worker class selection and sizing"""
+
+    def load_config(self, **env):
+        with patch.dict(os.environ, env):
+            return runpy.run_path(CONFIG_PATH)
+
+    def test_sizing_by_worker_class(self):
+        """Test worker/thread counts derived from cores and I/O ratio"""
+        derive = self.load_config()['derive_sizing']
+        self.assertEqual(derive('sync', 4, 0.9), (9, 1))
+        self.assertEqual(derive('gthread', 4, 0.9), (4, 10))
+        self.assertEqual(derive('gthread', 4, 0.5), (4, 2))
+        self.assertEqual(derive('gthread', 4, 1.0), (4, 32))
+        self.assertEqual(derive('uvicorn', 4, 0.9), (4, 1))
+
+    def test_environment_overrides(self):
+        """Test explicit overrides and the uvicorn ASGI entry point"""
+        config = self.load_config(GUNICORN_WORKER_CLASS='sync', GUNICORN_WORKERS='3', GUNICORN_MAX_REQUESTS='500')
+        self.assertEqual(config['worker_class'], 'sync')
+        self.assertEqual(config['workers'], 3)
+        self.assertEqual(config['max_requests_jitter'], 50)
+        self.assertEqual(config['wsgi_app'], 'app:app')
+
+        with patch('importlib.util.find_spec', return_value=Mock()):
+            config = self.load_config(GUNICORN_WORKER_CLASS='uvicorn')
+        self.assertEqual(config['worker_class'], 'uvicorn.workers.UvicornWorker')
+        self.assertEqual(config['wsgi_app'], 'asgi:app')
+
+    def test_missing_optional_worker_falls_back(self):
+        """Test that an uninstalled worker class falls back to gthread"""
+        with patch('importlib.util.find_spec', return_value=None):
+            config = self.load_config(GUNICORN_WORKER_CLASS='gevent')
+        self.assertEqual(config['worker_class'], 'gthread')
+
+    def test_uvicorn_without_asgiref_falls_back(self):
+        """Test that uvicorn alone is not enough, since asgi.py also needs asgiref"""
+        with patch('importlib.util.find_spec', side_effect=lambda name: None if name == 'asgiref' else Mock()):
+            config = self.load_config(GUNICORN_WORKER_CLASS='uvicorn')
+        self.assertEqual(config['worker_class'], 'gthread')
+        self.assertEqual(config['wsgi_app'], 'app:app')
+
+    def test_reinit_after_fork(self):
+        """Test that a forked worker drops the inherited HTTP session and is warmed again"""
+        inherited = Mock()
+        with patch.object(app_module, 'session', inherited, create=True):
+            app_module.warm_up()
+            app_module.reinit_after_fork()
+            inherited.close.assert_called_once()
+            self.assertFalse(app_module.worker_ready.is_set())
+            self.assertIsNot(app_module.get_session(), inherited)
+            app_module.warm_up()
+            self.assertTrue(app_module.worker_ready.is_set())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
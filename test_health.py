@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests for circuit breakers, the in-flight gauge, admission control and the /health and /ready endpoints
+"""
+
+import unittest
+import json
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+from health import CircuitBreaker, InFlightGauge, AdmissionController, OverloadedError
+
+
+class CircuitBreakerTestCase(unittest.TestCase):
+    """Test cases for CircuitBreaker state transitions"""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the circuit opens at the threshold and a success resets the count"""
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_allows_one_trial(self):
+        """Test that after the timeout a single trial call decides the state"""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_gauge_saturation(self):
+        """Test that the gauge tracks nested in-flight operations"""
+        gauge = InFlightGauge(limit=2)
+        with gauge:
+            with gauge:
+                self.assertTrue(gauge.saturated)
+            self.assertFalse(gauge.saturated)
+        self.assertEqual(gauge.value, 0)
+
+
+class ReadinessEndpointTestCase(unittest.TestCase):
+    """Test cases for /health and /ready"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        app_module.cache.clear()
+        self.breaker = CircuitBreaker("alpha_vantage", failure_threshold=1, reset_timeout=30)
+        self.patches = [
+            patch.object(app_module, 'alpha_vantage_breaker', self.breaker),
+            patch.object(app_module, 'upstream_in_flight', InFlightGauge(limit=1)),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+
+    def test_health_is_static(self):
+        """Test that liveness needs nothing but the process"""
+        response = self.client.get('/health')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['status'], 'ok')
+
+    def test_ready_and_saturated(self):
+        """Test that readiness fails while upstream calls are saturated"""
+        self.assertEqual(self.client.get('/ready').status_code, 200)
+        with app_module.upstream_in_flight:
+            response = self.client.get('/ready')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(json.loads(response.data)['status'], 'unavailable')
+
+    @patch('app.session')
+    def test_open_circuit_skips_upstream(self, mock_session):
+        """Test that a failing upstream opens the circuit, reported as degraded"""
+        mock_session.get.side_effect = requests.exceptions.ConnectTimeout("timed out")
+
+        self.assertEqual(self.client.get('/api/stock/AAPL').status_code, 500)
+        response = self.client.get('/api/stock/MSFT')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(mock_session.get.call_count, 1)
+
+        data = json.loads(self.client.get('/ready').data)
+        self.assertEqual(data['status'], 'degraded')
+        self.assertEqual(data['checks']['circuits']['alpha_vantage']['state'], 'open')
+
+
+class AdmissionControlTestCase(unittest.TestCase):
+    """Test cases for admission control and load shedding"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        app_module.cache.clear()
+        app_module.reset_circuits()
+        self.admission = AdmissionController(limit=1, queue_budget=0.05)
+        self.patch = patch.object(app_module, 'admission', self.admission)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+
+    def test_queue_budget(self):
+        """Test that a request waiting past the budget, or arriving already late, is rejected"""
+        self.admission.acquire()
+        with self.assertRaises(OverloadedError) as ctx:
+            self.admission.acquire()
+        self.assertEqual(ctx.exception.retry_after, 1)
+        self.admission.release()
+
+        with self.assertRaises(OverloadedError):
+            self.admission.acquire(queued=0.1)
+        self.admission.acquire()
+        self.admission.release()
+        self.assertEqual(self.admission.snapshot()['rejected'], 2)
+        self.assertEqual(self.admission.snapshot()['in_flight'], 0)
+
+    @patch('app.session')
+    def test_overload_sheds_only_upstream_work(self, mock_session):
+        """Test that a saturated worker returns 503 with Retry-After but still serves cached quotes"""
+        app_module.cache.set('stock_MSFT', {"symbol": "MSFT", "price": "300.00"})
+        self.admission.acquire()
+        try:
+            response = self.client.get('/api/stock/AAPL')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers['Retry-After'], '1')
+            mock_session.get.assert_not_called()
+
+            response = self.client.get('/api/stock/MSFT')
+            self.assertEqual(response.status_code, 200)
+        finally:
+            self.admission.release()
+
+    @patch('app.session')
+    def test_balancer_queue_time_counts(self, mock_session):
+        """Test that X-Request-Start from HAProxy or nginx counts against the budget"""
+        late_ms = f"t={int((time.time() - 5) * 1000)}"
+        late_seconds = f"t={time.time() - 5:.3f}"
+        for header in (late_ms, late_seconds):
+            response = self.client.get('/api/stock/AAPL', headers={'X-Request-Start': header})
+            self.assertEqual(response.status_code, 503)
+        mock_session.get.assert_not_called()
+        self.assertEqual(self.admission.snapshot()['in_flight'], 0)
+
+    @patch('app.session')
+    def test_implausible_queue_time_ignored(self, mock_session):
+        """Test that an X-Request-Start far in the past (skew or client-set) does not shed the request"""
+        mock_session.get.return_value.json.return_value = {}
+        for header in ("t=1", f"t={int((time.time() - 3600) * 1000)}"):
+            response = self.client.get('/api/stock/AAPL', headers={'X-Request-Start': header})
+            self.assertNotEqual(response.status_code, 503)
+        self.assertEqual(self.admission.snapshot()['in_flight'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
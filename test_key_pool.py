@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for API key pools and their shared per-key quota tracking
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import KeyUsageStore
+from key_pool import KeyPool, KeyThrottled, KeysExhausted, parse_keys, parse_quota
+from providers import AlphaVantageProvider
+
+NOW = 1_700_000_040.0
+
+
+class KeyPoolTestCase(unittest.TestCase):
+    """Test cases for quota-aware key rotation"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = KeyUsageStore(os.path.join(self.tmpdir.name, 'keys.db'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_parse_settings(self):
+        """Test key lists and quota strings"""
+        self.assertEqual(parse_keys(" k1, k2,,k1 "), ["k1", "k2"])
+        self.assertEqual(parse_quota("25/day"), (25, 86400))
+        self.assertEqual(parse_quota("5/60"), (5, 60))
+        self.assertEqual(parse_quota(""), (None, 60))
+
+    def test_throughput_scales_with_keys_across_workers(self):
+        """Test that two workers share each key's quota and together get keys x limit calls"""
+        keys = ["k1", "k2", "k3"]
+        worker_a = KeyPool("alpha_vantage", keys, self.store, limit=2, window=60)
+        worker_b = KeyPool("alpha_vantage", keys, self.store, limit=2, window=60)
+
+        used = [worker.acquire(NOW) for worker in (worker_a, worker_b, worker_a, worker_b, worker_a, worker_b)]
+        self.assertEqual(sorted(used), ["k1", "k1", "k2", "k2", "k3", "k3"])
+        with self.assertRaises(KeysExhausted) as raised:
+            worker_a.acquire(NOW)
+        self.assertEqual(raised.exception.retry_after, 60 - NOW % 60)
+        self.assertEqual(worker_b.acquire(NOW + 60), "k1")
+
+    def test_throttled_key_skipped_until_reset(self):
+        """Test that a throttled key is passed over until its window resets"""
+        pool = KeyPool("news_api", ["k1", "k2"], self.store, window=60)
+        pool.throttled("k1", now=NOW)
+        self.assertEqual({pool.acquire(NOW) for _ in range(3)}, {"k2"})
+        self.assertEqual(pool.acquire(NOW + 60), "k1")
+
+    def test_call_moves_to_next_key_on_throttle(self):
+        """Test that a rate-limit answer retries the call with another key"""
+        pool = KeyPool("alpha_vantage", ["k1", "k2"], self.store)
+        throttled = Mock(status_code=200)
+        throttled.json.return_value = {"Note": "Our standard API call frequency is 5 calls per minute."}
+        quote = Mock(status_code=200)
+        quote.json.return_value = {"Global Quote": {"01. symbol": "AAPL", "05. price": "190.00"}}
+        get = Mock(side_effect=[throttled, quote, throttled])
+        provider = AlphaVantageProvider(get, "https://upstream.test", pool)
+
+        self.assertEqual(provider.fetch("AAPL")["price"], "190.00")
+        self.assertIn("apikey=k1", get.call_args_list[0][0][0])
+        self.assertIn("apikey=k2", get.call_args_list[1][0][0])
+        with self.assertRaises(KeysExhausted):
+            provider.fetch("AAPL")
+
+    def test_single_key_without_store(self):
+        """Test that a plain key works as a pool of one tracked in-process"""
+        pool = KeyPool("finnhub", ["only"])
+        self.assertEqual(pool.call(lambda key: key), "only")
+
+        def throttled(key):
+            raise KeyThrottled("slow down", retry_after=5)
+
+        with self.assertRaises(KeysExhausted) as raised:
+            pool.call(throttled)
+        self.assertAlmostEqual(raised.exception.retry_after, 5, delta=1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
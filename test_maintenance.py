@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for retention, downsampling and compaction of the SQLite store
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from database import MaintenanceStore, NewsArticleStore, QuoteHistoryStore, StockDataCache
+from maintenance import DAY, MaintenanceJob, RetentionPolicy
+
+NOW = 1_700_006_400.0  # a UTC midnight
+
+
+class MaintenanceTestCase(unittest.TestCase):
+    """Test cases for MaintenanceStore, QuoteHistoryStore and MaintenanceJob"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'store.db')
+        self.store = MaintenanceStore(self.db_path)
+        self.history = QuoteHistoryStore(self.db_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def rows(self, sql):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(sql).fetchall()
+
+    def test_points_fold_into_ohlcv_bars(self):
+        """Test that aged points become one bar per symbol and day, across batches"""
+        day = NOW - 10 * DAY
+        for offset, price, volume in ((100, 10.0, 1000), (200, 12.5, 1500), (300, 9.0, 2400), (400, 11.0, 3000)):
+            self.history.record("AAPL", price, volume, ts=day + offset)
+        self.history.record("MSFT", 300.0, None, ts=day + 50)
+        self.history.record("AAPL", 20.0, 100, ts=NOW - 60)
+
+        folded, _ = self.history.downsample(NOW - 7 * DAY, batch_size=2)
+
+        self.assertEqual(folded, 5)
+        self.assertEqual(self.rows('SELECT symbol, bar_start, open, high, low, close, volume, points '
+                                   'FROM quote_bars ORDER BY symbol'),
+                         [("AAPL", day, 10.0, 12.5, 9.0, 11.0, 3000, 4),
+                          ("MSFT", day, 300.0, 300.0, 300.0, 300.0, None, 1)])
+        self.assertEqual(self.rows('SELECT symbol, price FROM quote_points'), [("AAPL", 20.0)])
+
+    def test_job_expires_stale_rows_in_batches(self):
+        """Test that old cache rows and articles go and recent ones stay"""
+        cache = StockDataCache(self.db_path)
+        articles = NewsArticleStore(self.db_path)
+        cache.cache_news_data("stale query", {"articles": []})
+        cache.cache_news_data("fresh query", {"articles": []})
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE news_cache SET timestamp = ? WHERE query = 'stale query'",
+                         (datetime.fromtimestamp(NOW - 30 * DAY).isoformat(),))
+        for i in range(5):
+            articles.save_articles([{"title": f"Old story {i}", "url": f"https://example.com/old/{i}",
+                                     "publishedAt": "2020-01-01T00:00:00Z"}], symbols=["AAPL"], feed="general")
+        articles.save_articles([{"title": "Apple news", "url": "https://example.com/new",
+                                 "publishedAt": "2023-11-14T00:00:00Z"}], symbols=["AAPL"])
+
+        job = MaintenanceJob(self.store, self.history, RetentionPolicy(), batch_size=2, pause=0)
+        stats = job.run(NOW)
+
+        self.assertEqual((stats["news_cache"], stats["news_articles"]), (1, 5))
+        self.assertEqual(self.rows('SELECT query FROM news_cache'), [("fresh query",)])
+        self.assertEqual([a["title"] for a in articles.search("story")], [])
+        self.assertEqual([a["title"] for a in articles.latest(symbol="AAPL")], ["Apple news"])
+        self.assertEqual(self.rows('SELECT COUNT(*) FROM news_feed_articles'), [(0,)])
+
+    def test_idle_search_cursors_expire(self):
+        """Test that ingest cursors of searches not run within the article retention are deleted"""
+        articles = NewsArticleStore(self.db_path)
+        for i in range(3):
+            articles.set_cursor(f"search::old query {i}", "2020-01-01T00:00:00Z")
+        articles.set_cursor("search:AAPL:earnings", "2023-11-14T00:00:00Z")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE news_ingest_cursors SET last_run = ? WHERE feed LIKE 'search::old%'",
+                         (datetime.fromtimestamp(NOW - 200 * DAY).isoformat(),))
+            conn.execute("UPDATE news_ingest_cursors SET last_run = ? WHERE feed = 'search:AAPL:earnings'",
+                         (datetime.fromtimestamp(NOW - DAY).isoformat(),))
+
+        stats = MaintenanceJob(self.store, self.history, batch_size=2, pause=0).run(NOW)
+
+        self.assertEqual(stats["news_ingest_cursors"], 3)
+        self.assertEqual(self.rows('SELECT feed FROM news_ingest_cursors'), [("search:AAPL:earnings",)])
+
+    def test_file_shrinks_after_expiry(self):
+        """Test that a new database vacuums incrementally, so deletes shrink the file"""
+        for i in range(3000):
+            self.history.record("AAPL", 100.0 + i, i, ts=NOW - 30 * DAY + i)
+        grown = os.path.getsize(self.db_path)
+
+        job = MaintenanceJob(self.store, self.history, RetentionPolicy(quote_points=7 * DAY), max_pages=100000)
+        stats = job.run(NOW)
+
+        self.assertTrue(stats["incremental"])
+        self.assertGreater(stats["freed_pages"], 0)
+        self.assertEqual(stats["free_pages"], 0)
+        self.assertLess(os.path.getsize(self.db_path), grown / 2)
+
+    def test_one_worker_runs_per_interval(self):
+        """Test that workers sharing the database take turns"""
+        other = MaintenanceJob(MaintenanceStore(self.db_path), self.history, interval=3600)
+        job = MaintenanceJob(self.store, self.history, interval=3600)
+
+        with patch('builtins.print'):
+            self.assertIsNotNone(job.tick(NOW))
+            self.assertIsNone(other.tick(NOW + 60))
+            self.assertIsNotNone(other.tick(NOW + 3600))
+
+    def test_store_quote_records_history(self):
+        """Test that fetched quotes are recorded as points"""
+        with patch.object(app_module, 'quote_history', self.history, create=True), \
+                patch.object(app_module, 'get_alert_engine'), app_module.app.app_context():
+            app_module.store_quote("AAPL", {"symbol": "AAPL", "price": "190.50", "volume": "1200"})
+        self.assertEqual(self.rows('SELECT symbol, price, volume FROM quote_points'), [("AAPL", 190.5, 1200)])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
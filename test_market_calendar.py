@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for exchange calendars and market-hours-aware cache TTLs
+"""
+
+import unittest
+import os
+import sys
+from datetime import date, datetime
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from market_calendar import NYSE, LSE, TSX, cache_ttl, calendar_for, easter
+
+NEW_YORK = NYSE.tz
+
+
+class ExchangeCalendarTestCase(unittest.TestCase):
+    """Test cases for sessions, holidays and early closes"""
+
+    def test_nyse_holidays(self):
+        """Test rule-based and observed NYSE holidays"""
+        self.assertEqual(easter(2024), date(2024, 3, 31))
+        for holiday in (date(2024, 3, 29), date(2024, 6, 19), date(2024, 11, 28), date(2021, 12, 24),
+                        date(2026, 7, 3)):
+            self.assertIsNone(NYSE.session(holiday), holiday)
+        # New Year's Day 2022 fell on a Saturday and was not observed on the Friday
+        self.assertIsNotNone(NYSE.session(date(2021, 12, 31)))
+
+    def test_early_close_and_other_exchanges(self):
+        """Test early closes and suffix-based exchange lookup"""
+        _, close = NYSE.session(date(2024, 11, 29))
+        self.assertEqual((close.hour, close.minute), (13, 0))
+        self.assertIs(calendar_for("VOD.L"), LSE)
+        self.assertIs(calendar_for("SHOP.TRT"), TSX)
+        self.assertIs(calendar_for("BRK.B"), NYSE)
+        self.assertIsNone(LSE.session(date(2022, 12, 27)))
+        self.assertIsNone(TSX.session(date(2024, 5, 20)))
+
+
+class CacheTtlTestCase(unittest.TestCase):
+    """Test cases for TTLs that follow the trading session"""
+
+    def test_ttl_follows_session(self):
+        """Test short TTLs intraday and just after the close, and until the open otherwise"""
+        self.assertEqual(cache_ttl(NYSE, 300, now=datetime(2024, 1, 8, 11, 0, tzinfo=NEW_YORK)), 300)
+        self.assertEqual(cache_ttl(NYSE, 300, now=datetime(2024, 1, 8, 16, 2, tzinfo=NEW_YORK)), 300)
+        # Friday evening to Monday 9:30
+        self.assertEqual(cache_ttl(NYSE, 300, now=datetime(2024, 1, 5, 20, 0, tzinfo=NEW_YORK)), 61.5 * 3600)
+        # Never past the open, however close it is
+        self.assertEqual(cache_ttl(NYSE, 300, now=datetime(2024, 1, 8, 9, 29, tzinfo=NEW_YORK)), 60)
+        self.assertEqual(cache_ttl(NYSE, 300, 3600, now=datetime(2024, 1, 6, 12, 0, tzinfo=NEW_YORK)), 3600)
+
+    def test_quote_cached_until_open_when_closed(self):
+        """Test that a quote stored on a Saturday is cached until Monday's open"""
+        saturday = datetime(2024, 1, 6, 12, 0, tzinfo=NEW_YORK)
+        with patch('market_calendar.datetime') as mock_datetime:
+            mock_datetime.now.return_value = saturday
+            mock_datetime.combine.side_effect = datetime.combine
+            self.assertEqual(app_module.quote_ttl("AAPL"), (45 * 60 + 30) * 60)
+            self.assertEqual(app_module.news_ttl("AAPL"), app_module.NEWS_CLOSED_TTL)
+        with patch.object(app_module, 'MARKET_HOURS_TTL', False):
+            self.assertIsNone(app_module.quote_ttl("AAPL"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Tests for news query building and per-symbol news caching
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import patch, Mock
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+from news import (company_alias, symbol_terms, build_news_query, assign_articles, merge_symbol_news, NewsIngestor,
+                  NEWS_TOPIC_TERMS)
+from symbols import SymbolIndex
+from database import NewsArticleStore
+
+
+def news_payload(*titles):
+    return {
+        "status": "ok",
+        "articles": [
+            {
+                "title": title,
+                "description": "",
+                "url": f"https://example.com/{title.lower().replace(' ', '-')}",
+                "publishedAt": f"2023-01-0{i + 1}T00:00:00Z"
+            }
+            for i, title in enumerate(titles)
+        ]
+    }
+
+
+class NewsQueryTestCase(unittest.TestCase):
+    """Test cases for the company-name aware query builder"""
+
+    def setUp(self):
+        self.index = SymbolIndex([
+            ("AAPL", "Apple Inc.", "NASDAQ"),
+            ("BRK.B", "Berkshire Hathaway Inc. Class B", "NYSE"),
+            ("F", "Ford Motor Company", "NYSE"),
+        ])
+
+    def test_company_alias(self):
+        """Test that corporate suffixes are stripped from listing names"""
+        self.assertEqual(company_alias("Apple Inc."), "Apple")
+        self.assertEqual(company_alias("Alphabet Inc. Class A"), "Alphabet")
+        self.assertEqual(company_alias("JPMorgan Chase & Co."), "JPMorgan Chase")
+
+    def test_build_query_includes_company_names(self):
+        """Test that the query covers tickers, base tickers and company names"""
+        terms = {s: symbol_terms(s, self.index) for s in ("AAPL", "BRK.B")}
+        query = build_news_query(terms)
+
+        self.assertTrue(query.startswith('(AAPL OR "Apple" OR BRK.B OR BRK OR "Berkshire Hathaway")'))
+        self.assertIn("(stock OR shares", query)
+
+    def test_assign_articles_by_mention(self):
+        """Test that combined results are attributed to the symbols they mention"""
+        terms = {s: symbol_terms(s, self.index) for s in ("AAPL", "F")}
+        articles = news_payload("Apple earnings beat", "Ford Motor recalls trucks", "Apple and F shares rise",
+                                "Fed holds rates")["articles"]
+
+        assigned = assign_articles(articles, terms)
+
+        self.assertEqual([a["title"] for a in assigned["AAPL"]], ["Apple earnings beat", "Apple and F shares rise"])
+        self.assertEqual([a["title"] for a in assigned["F"]], ["Ford Motor recalls trucks", "Apple and F shares rise"])
+
+    def test_merge_ranks_shared_articles_first(self):
+        """Test that articles shared by several symbols rank ahead and are de-duplicated"""
+        shared = {"title": "Both", "url": "u-both", "publishedAt": "2023-01-01"}
+        first = [{"title": "A1", "url": "u-a1", "publishedAt": "2023-01-02"}, shared]
+        second = [{"title": "B1", "url": "u-b1", "publishedAt": "2023-01-03"}, shared]
+
+        merged = merge_symbol_news([first, second], limit=5)
+
+        self.assertEqual([a["title"] for a in merged], ["Both", "B1", "A1"])
+
+
+class NewsIngestorTestCase(unittest.TestCase):
+    """Test cases for since-cursor incremental ingestion"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = NewsArticleStore(os.path.join(self.tmpdir.name, 'test.db'))
+        self.calls = []
+        self.responses = []
+
+        def fetch(query, page_size, since, search_in):
+            self.calls.append(since)
+            return self.responses.pop(0)
+
+        self.ingestor = NewsIngestor(self.store, fetch)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_fetches_only_after_high_water_mark(self):
+        """Test that repeat ingestion asks only for articles newer than the cursor"""
+        self.responses = [news_payload("Old story", "Newer story")["articles"],
+                          news_payload("Newer story", "Brand new story")["articles"]]
+
+        self.assertEqual(self.ingestor.ingest("general", "markets"), 2)
+        self.assertEqual(self.store.get_cursor("general"), "2023-01-02T00:00:00Z")
+
+        self.assertEqual(self.ingestor.ingest("general", "markets"), 1)
+        self.assertEqual(self.calls, [None, "2023-01-02T00:00:01Z"])
+        self.assertEqual(len(self.store.latest(feed="general")), 3)
+
+    def test_batched_symbols_keep_separate_cursors(self):
+        """Test that a batched symbol query advances each symbol's own cursor"""
+        index = SymbolIndex([("AAPL", "Apple Inc.", "NASDAQ"), ("MSFT", "Microsoft Corporation", "NASDAQ")])
+        terms = {s: symbol_terms(s, index) for s in ("AAPL", "MSFT")}
+        self.responses = [news_payload("Apple event", "Microsoft earnings")["articles"]]
+
+        self.ingestor.ingest_symbols(terms)
+
+        self.assertEqual(self.store.get_cursor("symbol:AAPL"), "2023-01-01T00:00:00Z")
+        self.assertEqual(self.store.get_cursor("symbol:MSFT"), "2023-01-02T00:00:00Z")
+        self.assertEqual([a["title"] for a in self.store.latest(symbol="MSFT")], ["Microsoft earnings"])
+
+
+class SymbolNewsCacheTestCase(unittest.TestCase):
+    """Test cases for per-symbol news caching in the API"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        app_module.cache.clear()
+        app_module.reset_circuits()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        store = NewsArticleStore(os.path.join(self.tmpdir.name, 'test.db'))
+        self.patches = [
+            patch.object(app_module, 'article_store', store),
+            patch.object(app_module, 'news_ingestor', NewsIngestor(store, app_module.fetch_news_articles)),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmpdir.cleanup()
+
+    @patch('app.session')
+    def test_only_missing_symbols_fetched(self, mock_session):
+        """Test that a new symbol set reuses cached per-symbol news"""
+        mock_response = Mock()
+        mock_response.json.return_value = news_payload("Apple unveils new iPhone")
+        mock_session.get.return_value = mock_response
+
+        response = self.client.get('/api/news/AAPL')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_session.get.call_count, 1)
+
+        mock_response.json.return_value = news_payload("Microsoft cloud revenue grows")
+        with patch('app.ThreadPoolExecutor') as mock_executor:
+            mock_executor.return_value.__enter__.return_value.map.return_value = []
+            response = self.client.post('/get_stock_data', json={'symbols': 'AAPL,MSFT'})
+        data = json.loads(response.data)
+
+        self.assertEqual(mock_session.get.call_count, 2)
+        news_url = mock_session.get.call_args[0][0]
+        self.assertIn('MSFT', news_url)
+        self.assertNotIn('AAPL', news_url)
+        self.assertEqual({a['title'] for a in data['news_data']},
+                         {"Apple unveils new iPhone", "Microsoft cloud revenue grows"})
+
+    @patch('app.session')
+    def test_company_name_with_ampersand_stays_in_query(self, mock_session):
+        """Test that '&' in a company alias is encoded rather than splitting the NewsAPI URL"""
+        mock_response = Mock()
+        mock_response.json.return_value = news_payload("Johnson & Johnson raises guidance")
+        mock_session.get.return_value = mock_response
+
+        response = self.client.get('/api/news/JNJ')
+
+        self.assertEqual(response.status_code, 200)
+        params = parse_qs(urlparse(mock_session.get.call_args[0][0]).query)
+        self.assertEqual(params['q'], ['(JNJ OR "Johnson & Johnson") ' + NEWS_TOPIC_TERMS])
+        self.assertEqual(params['apiKey'], [app_module.NEWS_API_KEY])
+        self.assertEqual(params['pageSize'], ['10'])
+
+    @patch('app.session')
+    def test_empty_news_result_is_cached(self, mock_session):
+        """Test that symbols with no news are not re-fetched on every request"""
+        mock_response = Mock()
+        mock_response.json.return_value = news_payload()
+        mock_session.get.return_value = mock_response
+
+        self.client.get('/api/news/AAPL')
+        self.client.get('/api/news/AAPL')
+
+        self.assertEqual(mock_session.get.call_count, 1)
+
+    @patch('app.session')
+    def test_cache_outcome_header(self, mock_session):
+        """Test that X-Cache reports misses, hits and partially cached symbol sets"""
+        mock_response = Mock()
+        mock_response.json.return_value = news_payload("Apple unveils new iPhone")
+        mock_session.get.return_value = mock_response
+
+        self.assertEqual(self.client.get('/api/news/AAPL').headers.get('X-Cache'), 'MISS')
+        self.assertEqual(self.client.get('/api/news/AAPL').headers.get('X-Cache'), 'HIT')
+
+        with patch('app.ThreadPoolExecutor') as mock_executor:
+            mock_executor.return_value.__enter__.return_value.map.return_value = []
+            response = self.client.post('/get_stock_data', json={'symbols': 'AAPL,MSFT'})
+        self.assertEqual(response.headers.get('X-Cache'), 'PARTIAL')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for quote providers and hedged fetching
+"""
+
+import unittest
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+from benchmarks.mock_upstream import MockUpstream
+from providers import AlphaVantageProvider, FinnhubProvider, HedgedQuoteFetcher, QuoteUnavailable
+
+
+class FakeProvider:
+    """Local provider answering after ``delay`` seconds, or raising ``error``."""
+
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def fetch(self, symbol):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"symbol": symbol, "price": "100.0000", "change": "0.0000", "volume": None}
+
+
+class HedgedQuoteFetcherTestCase(unittest.TestCase):
+    """Test cases for hedging, failover and the hedge budget"""
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=8)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def fetcher(self, primary, secondary, **kwargs):
+        kwargs.setdefault("default_delay", 0.02)
+        return HedgedQuoteFetcher(primary, secondary, self.executor, **kwargs)
+
+    def test_slow_primary_is_hedged(self):
+        """Test that the secondary answers when the primary is past its hedge delay"""
+        fetcher = self.fetcher(FakeProvider("primary", delay=0.3), FakeProvider("secondary"))
+        start = time.monotonic()
+        quote, provider = fetcher.fetch("AAPL")
+
+        self.assertEqual(provider, "secondary")
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual(fetcher.snapshot()["hedge_wins"], 1)
+
+    def test_fast_primary_is_not_hedged(self):
+        """Test that a primary answering within the delay never touches the secondary"""
+        secondary = FakeProvider("secondary")
+        fetcher = self.fetcher(FakeProvider("primary"), secondary, default_delay=1.0)
+        self.assertEqual(fetcher.fetch("AAPL")[1], "primary")
+        self.assertEqual(secondary.calls, 0)
+
+    def test_hedge_budget_caps_extra_calls(self):
+        """Test that hedges stop once the burst allowance is spent"""
+        secondary = FakeProvider("secondary")
+        fetcher = self.fetcher(FakeProvider("primary", delay=0.05), secondary, hedge_ratio=0.0, max_burst=2)
+        for _ in range(4):
+            fetcher.fetch("AAPL")
+        self.assertEqual(secondary.calls, 2)
+        self.assertEqual(fetcher.snapshot()["hedged"], 2)
+
+    def test_failover_and_primary_error(self):
+        """Test that a failing primary fails over, and its error surfaces if both fail"""
+        fetcher = self.fetcher(FakeProvider("primary", error=requests.exceptions.ConnectionError("down")),
+                               FakeProvider("secondary"), default_delay=1.0)
+        self.assertEqual(fetcher.fetch("AAPL")[1], "secondary")
+
+        fetcher = self.fetcher(FakeProvider("primary", error=QuoteUnavailable("no quote")),
+                               FakeProvider("secondary", error=QuoteUnavailable("nothing either")),
+                               default_delay=1.0)
+        with self.assertRaisesRegex(QuoteUnavailable, "no quote"):
+            fetcher.fetch("AAPL")
+
+    def test_hedge_delay_follows_p95(self):
+        """Test that the hedge delay tracks the primary's observed p95"""
+        fetcher = self.fetcher(FakeProvider("primary"), FakeProvider("secondary"), min_delay=0.01)
+        for i in range(100):
+            fetcher.latency.record(0.1 if i < 90 else 0.5)
+        self.assertEqual(fetcher.hedge_delay(), 0.5)
+
+
+class MockProvidersTestCase(unittest.TestCase):
+    """Test cases for normalizing both providers against the local mock upstream"""
+
+    def setUp(self):
+        self.mock = MockUpstream("fast", latency_ms=0, jitter_ms=0).start()
+        get = lambda url: requests.get(url, timeout=5)
+        self.alpha_vantage = AlphaVantageProvider(get, self.mock.url, "test")
+        self.finnhub = FinnhubProvider(get, self.mock.url, "test")
+
+    def tearDown(self):
+        self.mock.stop()
+
+    def test_same_quote_shape(self):
+        """Test that both providers produce the same fields and price"""
+        primary = self.alpha_vantage.fetch("AAPL")
+        secondary = self.finnhub.fetch("AAPL")
+
+        self.assertEqual(set(primary), set(secondary))
+        self.assertEqual(primary["price"], secondary["price"])
+        self.assertEqual(self.mock.stats()["finnhub"]["calls"], 1)
+
+
+class HedgedEndpointTestCase(unittest.TestCase):
+    """Test cases for hedged quotes served through the API"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        app_module.cache.clear()
+        app_module.reset_circuits()
+        self.executor = ThreadPoolExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def test_single_stock_failover(self):
+        """Test that /api/stock falls back to the secondary when Alpha Vantage is down"""
+        fetcher = HedgedQuoteFetcher(FakeProvider("alpha_vantage", error=requests.exceptions.ConnectTimeout("slow")),
+                                     FakeProvider("finnhub"), self.executor)
+        with patch.object(app_module, 'quote_fetcher', fetcher, create=True):
+            response = self.client.get('/api/stock/AAPL')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['price'], '100.0000')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the local symbol universe index and /api/symbols autocomplete
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from symbols import SymbolIndex
+from app import app
+
+
+class SymbolIndexTestCase(unittest.TestCase):
+    """Test cases for SymbolIndex lookups"""
+
+    def setUp(self):
+        self.index = SymbolIndex([
+            ("AAPL", "Apple Inc.", "NASDAQ"),
+            ("AMZN", "Amazon.com Inc.", "NASDAQ"),
+            ("BRK.B", "Berkshire Hathaway Inc. Class B", "NYSE"),
+            ("MSFT", "Microsoft Corporation", "NASDAQ"),
+            ("bad symbol!", "Ignored", "NYSE"),
+        ])
+
+    def test_membership(self):
+        """Test that known symbols are found and malformed ones dropped"""
+        self.assertEqual(len(self.index), 4)
+        self.assertIn("AAPL", self.index)
+        self.assertIn("BRK.B", self.index)
+        self.assertNotIn("AAP", self.index)
+        self.assertIsNone(self.index.get("ZZZZ"))
+        self.assertEqual(self.index.name_for("MSFT"), "Microsoft Corporation")
+
+    def test_prefix_search_symbols_then_names(self):
+        """Test that symbol prefix matches rank ahead of company-name matches"""
+        results = [entry["symbol"] for entry in self.index.search("a")]
+        self.assertEqual(results, ["AAPL", "AMZN"])
+
+        results = [entry["symbol"] for entry in self.index.search("micro")]
+        self.assertEqual(results, ["MSFT"])
+
+        self.assertEqual(len(self.index.search("a", limit=1)), 1)
+        self.assertEqual(self.index.search(""), [])
+
+    def test_load_nasdaq_trader_format(self):
+        """Test loading the pipe-delimited NASDAQ Trader listing format"""
+        content = (
+            "Symbol|Security Name|Market Category|Test Issue|Financial Status|Round Lot Size|ETF|NextShares\n"
+            "AAPL|Apple Inc. - Common Stock|Q|N|N|100|N|N\n"
+            "ZXZZT|NASDAQ TEST STOCK|G|Y|N|100|N|N\n"
+            "File Creation Time: 0101202500:00|||||||\n"
+        )
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write(content)
+        try:
+            index = SymbolIndex.load(f.name)
+        finally:
+            os.unlink(f.name)
+
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.get("AAPL")["exchange"], "NASDAQ")
+
+    def test_lookup_speed_with_large_universe(self):
+        """Test that lookups stay in the microseconds with a full-size universe"""
+        index = SymbolIndex((f"S{i:05d}", f"Company {i}", "NYSE") for i in range(100000))
+
+        start = time.perf_counter()
+        for i in range(10000):
+            f"S{i:05d}" in index
+        elapsed = (time.perf_counter() - start) / 10000
+
+        self.assertLess(elapsed, 50e-6)
+
+
+class SymbolEndpointTestCase(unittest.TestCase):
+    """Test cases for the /api/symbols endpoint and symbol pre-validation"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+    def test_autocomplete_endpoint(self):
+        """Test that /api/symbols returns prefix matches from the bundled listing"""
+        response = self.client.get('/api/symbols?prefix=AAP')
+        data = json.loads(response.data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['symbols'][0]['symbol'], 'AAPL')
+        self.assertEqual(data['symbols'][0]['name'], 'Apple Inc.')
+
+    def test_unlisted_symbols_accepted_by_default(self):
+        """Test that without a full listing any well-formed ticker passes validation"""
+        if not os.getenv('SYMBOL_LISTING_PATH'):
+            self.assertEqual(app_module.SYMBOL_VALIDATION, 'syntax')
+        with patch.object(app_module, 'SYMBOL_VALIDATION', 'syntax'):
+            self.assertTrue(app_module.is_valid_symbol('ZZZZ'))
+            self.assertFalse(app_module.is_valid_symbol('NOT A SYMBOL'))
+
+    @patch.object(app_module, 'SYMBOL_VALIDATION', 'strict')
+    def test_unknown_symbols_rejected_before_upstream(self):
+        """Test that unknown symbols never reach the upstream APIs"""
+        response = self.client.post('/get_stock_data',
+                                  json={'symbols': 'NOTAREALSYM'})
+        data = json.loads(response.data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['stock_data'], [])
+        self.assertIn('Unknown symbol: NOTAREALSYM', data['errors'])
+
+        response = self.client.get('/api/stock/NOTAREALSYM')
+        self.assertEqual(response.status_code, 404)
+
+    @patch('app.session')
+    def test_news_for_unknown_symbols_rejected(self, mock_session):
+        """Test that /api/news/<symbol> rejects junk and unlisted symbols without calling NewsAPI"""
+        response = self.client.get('/api/news/NOT%20A%20SYMBOL')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data)['error'], 'Unknown symbol: NOT A SYMBOL')
+
+        with patch.object(app_module, 'SYMBOL_VALIDATION', 'strict'):
+            self.assertEqual(self.client.get('/api/news/NOTAREALSYM').status_code, 400)
+        mock_session.get.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
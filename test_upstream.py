@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for bounded reading and selective decoding of upstream responses
+"""
+
+import unittest
+import io
+import json
+import os
+import sys
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from upstream import ResponseTooLarge, SelectiveDecoder, limit_body
+
+ARTICLE_FIELDS = ("title", "url")
+
+
+def raw_response(body, headers=None):
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body)
+    response.headers.update(headers or {})
+    response.url = "https://upstream.test/v2/everything"
+    return response
+
+
+def news_page(count):
+    return {
+        "status": "ok",
+        "totalResults": count,
+        "articles": [{"title": f"Story {i}", "url": f"https://e.com/{i}", "content": "x" * 100,
+                      "source": {"id": None, "name": "Wire"}} for i in range(count)]
+    }
+
+
+class LimitBodyTestCase(unittest.TestCase):
+    """Test cases for the size-capped response hook"""
+
+    def test_body_within_limit_is_kept(self):
+        """Test that a small body is read once and available as usual"""
+        response = limit_body(1024)(raw_response(b'{"status": "ok"}'))
+        self.assertEqual(response.json(), {"status": "ok"})
+
+    def test_oversized_body_is_abandoned(self):
+        """Test that bodies over the limit fail, whether announced or only discovered while reading"""
+        with self.assertRaises(ResponseTooLarge):
+            limit_body(1024)(raw_response(b"{}", {"Content-Length": "4096"}))
+        with self.assertRaises(ResponseTooLarge):
+            limit_body(1024, chunk_size=256)(raw_response(b" " * 4096))
+
+
+class SelectiveDecoderTestCase(unittest.TestCase):
+    """Test cases for decoding only the fields the app reads"""
+
+    def decode(self, document, **kwargs):
+        return json.loads(document, cls=SelectiveDecoder, **kwargs)
+
+    def test_fields_trimmed_and_array_capped(self):
+        """Test that unwanted keys are dropped and a capped array stops decoding"""
+        data = self.decode(json.dumps(news_page(50)),
+                           fields={"status": None, "articles": ARTICLE_FIELDS}, limits={"articles": 3})
+        self.assertEqual(data["status"], "ok")
+        self.assertEqual(data["articles"], [{"title": f"Story {i}", "url": f"https://e.com/{i}"} for i in range(3)])
+
+    def test_tail_after_cut_off_is_not_parsed(self):
+        """Test that a truncated body still yields the articles before the cut-off"""
+        document = json.dumps(news_page(10))
+        data = self.decode(document[:len(document) // 2],
+                           fields={"status": None, "articles": ARTICLE_FIELDS}, limits={"articles": 2})
+        self.assertEqual(len(data["articles"]), 2)
+
+    def test_matches_full_decode(self):
+        """Test that uncapped selection agrees with json.loads and malformed input still fails"""
+        quote = {"Global Quote": {"01. symbol": "AAPL", "05. price": "190.64", "02. open": "189.33"}, "n": [1, {}]}
+        data = self.decode(json.dumps(quote, indent=2), fields={"Global Quote": ("01. symbol", "05. price"), "n": None})
+        self.assertEqual(data, {"Global Quote": {"01. symbol": "AAPL", "05. price": "190.64"}, "n": [1, {}]})
+        self.assertEqual(self.decode("[1, 2]", fields={}), [1, 2])
+        with self.assertRaises(json.JSONDecodeError):
+            self.decode('{"status": "ok", "articles": [{"title": ', fields={"articles": None})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the bulk watchlist endpoint and its rate-limited refresh queue
+"""
+
+import unittest
+import json
+import os
+import sys
+import threading
+from unittest.mock import patch, Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+from watchlist import TokenBucket, RefreshQueue
+
+
+class RefreshQueueTestCase(unittest.TestCase):
+    """Test cases for the token bucket and chunked refresh queue"""
+
+    def test_token_bucket(self):
+        """Test that the bucket hands out its capacity, then reports the wait for more"""
+        bucket = TokenBucket(rate=10, capacity=5)
+        self.assertEqual(bucket.take(5), 0)
+        self.assertAlmostEqual(bucket.take(2), 0.2, delta=0.05)
+        self.assertAlmostEqual(bucket.eta(10), 1.0, delta=0.05)
+
+    def test_symbols_fetched_in_chunks_once(self):
+        """Test that queued symbols are deduplicated and fetched at most chunk_size at a time"""
+        chunks = []
+        done = threading.Event()
+        submitted = threading.Event()
+
+        def fetch_chunk(symbols):
+            # Hold the first chunk in progress until both submits are in
+            submitted.wait(5)
+            chunks.append(symbols)
+            if sum(len(c) for c in chunks) == 5:
+                done.set()
+
+        queue = RefreshQueue(fetch_chunk, TokenBucket(rate=1000, capacity=2), chunk_size=3)
+        self.assertEqual(queue.submit(["A", "B", "C", "A"]), ["A", "B", "C"])
+        queue.submit(["B", "D", "E"])
+        submitted.set()
+        self.assertTrue(done.wait(5))
+        queue.stop()
+
+        self.assertTrue(all(len(c) <= 2 for c in chunks))
+        self.assertEqual(sorted(s for c in chunks for s in c), ["A", "B", "C", "D", "E"])
+
+
+class WatchlistEndpointTestCase(unittest.TestCase):
+    """Test cases for /api/watchlist"""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        app_module.cache.clear()
+        self.refresher = Mock()
+        self.refresher.eta.return_value = 4.0
+        self.patch = patch.dict(app.extensions, {'watchlist': self.refresher})
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+
+    @patch.object(app_module, 'SYMBOL_VALIDATION', 'strict')
+    @patch('app.session')
+    def test_cached_quotes_now_misses_queued(self, mock_session):
+        """Test that cached quotes return at once and misses go to the refresh queue"""
+        app_module.cache.set('stock_AAPL', {"symbol": "AAPL", "price": "190.00"})
+
+        response = self.client.post('/api/watchlist', json={'symbols': ['AAPL', 'MSFT', 'ZZZZZZ']})
+        data = json.loads(response.data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([q['symbol'] for q in data['quotes']], ['AAPL'])
+        self.assertEqual(data['pending'], ['MSFT'])
+        self.assertEqual(data['unknown'], ['ZZZZZZ'])
+        self.assertEqual(data['retry_after'], 4.0)
+        self.refresher.submit.assert_called_once_with(['MSFT'])
+        mock_session.get.assert_not_called()
+
+    def test_paging_queues_whole_list(self):
+        """Test that a page covers part of the list while every miss is queued"""
+        symbols = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA']
+        response = self.client.post('/api/watchlist?offset=2&limit=2', json={'symbols': ','.join(symbols)})
+        data = json.loads(response.data)
+
+        self.assertEqual(data['pending'], ['GOOGL', 'AMZN'])
+        self.assertEqual(data['next_offset'], 4)
+        self.assertEqual(data['total'], 5)
+        self.refresher.submit.assert_called_once_with(symbols)
+
+    @patch('app.session')
+    def test_refresh_caches_quotes(self, mock_session):
+        """Test that a refreshed chunk is cached for the next poll"""
+        mock_response = Mock()
+        mock_response.json.return_value = {"Global Quote": {"01. symbol": "MSFT", "05. price": "300.00"}}
+        mock_session.get.return_value = mock_response
+
+        app_module.refresh_quotes(app, ['MSFT'])
+        data = json.loads(self.client.post('/api/watchlist', json={'symbols': 'MSFT'}).data)
+        self.assertEqual(data['quotes'][0]['price'], '300.00')
+        self.assertIsNone(data['retry_after'])
+
+    def test_symbol_limit(self):
+        """Test that lists beyond WATCHLIST_MAX_SYMBOLS are rejected"""
+        with patch.object(app_module, 'WATCHLIST_MAX_SYMBOLS', 2):
+            response = self.client.post('/api/watchlist', json={'symbols': 'AAPL,MSFT,GOOGL'})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,126 @@
+"""
+Bounded, selective decoding of upstream JSON responses
+
+Upstream bodies are read in chunks and abandoned as soon as they pass a size
+limit (or announce a larger Content-Length), so a runaway or malicious
+response never sits whole in a worker's memory. Decoding then walks the
+top-level JSON object one value at a time and keeps only the fields the app
+reads: a NewsAPI page stops decoding once the requested number of articles is
+in, and each article is trimmed to the fields build_article uses. Whatever
+follows the cut-off is never parsed, so a truncated or malformed tail does not
+fail the call either.
+
+Both plug into ordinary requests calls:
+    session.get(url, hooks={"response": limit_body(max_bytes)})
+    response.json(cls=SelectiveDecoder, fields={...}, limits={...})
+"""
+
+import json
+from json.decoder import WHITESPACE, scanstring
+
+import requests
+
+
+class ResponseTooLarge(requests.exceptions.RequestException):
+    """An upstream body exceeded the configured size limit."""
+
+
+def limit_body(max_bytes, chunk_size=16384):
+    """Response hook that reads the body in chunks, failing once it passes ``max_bytes``.
+
+    The limit applies to the decoded body, so compressed responses cannot
+    expand past it either.
+    """
+    def hook(response, **kwargs):
+        length = response.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) > max_bytes:
+            response.close()
+            raise ResponseTooLarge(f"{response.url} announced {length} bytes (limit {max_bytes})",
+                                   response=response)
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size):
+            body += chunk
+            if len(body) > max_bytes:
+                response.close()
+                raise ResponseTooLarge(f"{response.url} body exceeded {max_bytes} bytes", response=response)
+        response._content = bytes(body)
+        return response
+    return hook
+
+
+def _trim(value, keys):
+    if keys is None or not isinstance(value, dict):
+        return value
+    return {key: value[key] for key in keys if key in value}
+
+
+class SelectiveDecoder(json.JSONDecoder):
+    """JSONDecoder keeping only ``fields`` of a top-level object.
+
+    ``fields`` maps a key to None (keep the value whole) or a tuple of
+    sub-keys: an object value, or each object in an array value, is trimmed
+    to them. ``limits`` caps arrays by key; decoding ends once a capped array
+    is full, so it should be the last field of interest (as ``articles`` is in
+    NewsAPI responses). Documents that are not objects decode as usual.
+    """
+
+    def __init__(self, *, fields, limits=None, **kwargs):
+        # requests passes simplejson's ``encoding`` through when it is installed
+        kwargs.pop("encoding", None)
+        super().__init__(**kwargs)
+        self.fields = fields
+        self.limits = limits or {}
+
+    def decode(self, s, _w=WHITESPACE.match):
+        idx = _w(s, 0).end()
+        if not s.startswith("{", idx):
+            return super().decode(s)
+        try:
+            return self._decode_object(s, idx + 1)
+        except StopIteration as err:
+            raise json.JSONDecodeError("Expecting value", s, err.value) from None
+
+    @staticmethod
+    def _expect(s, idx, char):
+        if not s.startswith(char, idx):
+            raise json.JSONDecodeError(f"Expecting {char!r}", s, idx)
+        return idx + 1
+
+    def _decode_object(self, s, idx, _w=WHITESPACE.match):
+        result = {}
+        idx = _w(s, idx).end()
+        if s.startswith("}", idx):
+            return result
+        while True:
+            key, idx = scanstring(s, self._expect(s, idx, '"'), self.strict)
+            idx = _w(s, self._expect(s, _w(s, idx).end(), ":")).end()
+            if key in self.fields and s.startswith("[", idx):
+                items, idx, complete = self._decode_array(s, idx + 1, self.fields[key], self.limits.get(key))
+                result[key] = items
+                if not complete:
+                    return result
+            else:
+                # Unwanted values still have to be scanned to find the next key
+                value, idx = self.scan_once(s, idx)
+                if key in self.fields:
+                    result[key] = _trim(value, self.fields[key])
+            idx = _w(s, idx).end()
+            if s.startswith("}", idx):
+                return result
+            idx = _w(s, self._expect(s, idx, ",")).end()
+
+    def _decode_array(self, s, idx, keys, limit, _w=WHITESPACE.match):
+        """Return (items, end, complete); complete is False when ``limit`` cut the array short."""
+        items = []
+        idx = _w(s, idx).end()
+        if s.startswith("]", idx):
+            return items, idx + 1, True
+        while True:
+            if limit is not None and len(items) >= limit:
+                return items, idx, False
+            item, idx = self.scan_once(s, idx)
+            items.append(_trim(item, keys))
+            idx = _w(s, idx).end()
+            if s.startswith("]", idx):
+                return items, idx + 1, True
+            idx = _w(s, self._expect(s, idx, ",")).end()
@@ -0,0 +1,143 @@
+"""
+Chunked background refresh for large watchlists
+
+A watchlist of hundreds of symbols is answered from cache straight away.
+Symbols without a cached quote are queued here and fetched by one background
+thread per worker, a chunk at a time, no faster than the watchlist's share of
+the Alpha Vantage rate budget. Clients poll or page through the watchlist to
+pick up quotes as they land.
+
+Configure through the environment (rates are per worker):
+    WATCHLIST_RATE_PER_MINUTE=30 WATCHLIST_CHUNK_SIZE=5
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second, holding at most ``capacity``."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self, n=1):
+        """Take ``n`` tokens and return 0, or return the seconds to wait before they are available."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= n:
+                self._tokens -= n
+                return 0.0
+            return (n - self._tokens) / self.rate
+
+    def eta(self, n):
+        """Seconds until ``n`` more tokens could have been taken."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (n - self._tokens) / self.rate)
+
+
+class RefreshQueue:
+    """Deduplicated FIFO of symbols whose quotes ``fetch_chunk`` should refresh."""
+
+    def __init__(self, fetch_chunk, bucket, chunk_size=5, max_pending=5000):
+        self.fetch_chunk = fetch_chunk
+        self.bucket = bucket
+        self.chunk_size = min(chunk_size, bucket.capacity)
+        self.max_pending = max_pending
+        self._pending = OrderedDict()
+        self._in_progress = set()
+        self._lock = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def __len__(self):
+        return len(self._pending) + len(self._in_progress)
+
+    def submit(self, symbols):
+        """Queue symbols not already queued or being fetched; returns those accepted."""
+        accepted = []
+        with self._lock:
+            for symbol in symbols:
+                if symbol in self._pending or symbol in self._in_progress:
+                    continue
+                if len(self._pending) >= self.max_pending:
+                    break
+                self._pending[symbol] = None
+                accepted.append(symbol)
+            if accepted:
+                self._lock.notify()
+        if accepted:
+            self.start()
+        return accepted
+
+    def eta(self):
+        """Rough seconds until everything queued now has been fetched."""
+        return self.bucket.eta(len(self))
+
+    def start(self):
+        """Start the fetch thread once per process (forked workers start their own)."""
+        if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="watchlist-refresh", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def after_fork(self):
+        """Reset locks, queue and thread state copied from the parent process."""
+        self._pending = OrderedDict()
+        self._in_progress = set()
+        self._lock = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            self._lock.notify_all()
+
+    def _next_chunk(self):
+        with self._lock:
+            while not self._pending and not self._stop.is_set():
+                self._lock.wait()
+            chunk = []
+            while self._pending and len(chunk) < self.chunk_size:
+                chunk.append(self._pending.popitem(last=False)[0])
+            self._in_progress.update(chunk)
+            return chunk
+
+    def _run(self):
+        while not self._stop.is_set():
+            chunk = self._next_chunk()
+            if not chunk:
+                continue
+            try:
+                wait = self.bucket.take(len(chunk))
+                while wait and not self._stop.wait(wait):
+                    wait = self.bucket.take(len(chunk))
+                if not self._stop.is_set():
+                    self.fetch_chunk(chunk)
+            except Exception as e:
+                print(f"[ERROR] Watchlist refresh failed for {chunk}: {e}")
+            finally:
+                with self._lock:
+                    self._in_progress.difference_update(chunk)